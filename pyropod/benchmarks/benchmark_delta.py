@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+'''Compares the sizes (as JSON) of full task messages and delta messages
+for the updates of a task during its execution: a status change, the
+progress of the current action and the completion of an action.
+The sizes of the whole messages include the message headers.
+
+Usage: python benchmark_delta.py [-n NUM_CALLS]
+'''
+import argparse
+import json
+import os
+import sys
+import timeit
+
+from benchmark_timestamp import make_task_dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.status import ActionStatus, TaskStatus
+from ropod.structs.task import Task
+from ropod.utils.delta import DeltaDecoder
+from ropod.utils.models import RopodMessageFactory
+
+
+def task_updates(task):
+    '''Yields the name of each update after applying it to the task
+    '''
+    task.status.status = TaskStatus.DISPATCHED
+    yield 'status change'
+
+    actions = task.robot_actions['ropod_001']
+    task.status.status = TaskStatus.ONGOING
+    task.status.current_robot_action['ropod_001'] = actions[0].id
+    yield 'current action'
+
+    actions[0].execution_status = ActionStatus.COMPLETED
+    task.status.completed_robot_actions['ropod_001'] = [actions[0].id]
+    task.status.current_robot_action['ropod_001'] = actions[1].id
+    yield 'action completed'
+
+
+def size(message):
+    return len(json.dumps(message, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the delta messages of tasks')
+    parser.add_argument('-n', type=int, default=1000, help='number of calls per measurement')
+    args = parser.parse_args()
+
+    task = Task.from_dict(make_task_dict())
+    message_factory = RopodMessageFactory()
+    decoder = DeltaDecoder()
+
+    message = message_factory.create_delta_message(task)
+    decoder.apply(task.id, message['payload'])
+    print('{0:<24}{1:>16}{2:>16}{3:>16}{4:>16}'.format('update', 'full msg [B]', 'delta msg [B]',
+                                                       'full payload', 'delta payload'))
+    for update in task_updates(task):
+        full_message = message_factory.create_message(task)
+        message = message_factory.create_delta_message(task)
+        task_dict = decoder.apply(task.id, message['payload'])
+        if task_dict != task.to_dict():
+            raise Exception('The decoded task does not match the task')
+        print('{0:<24}{1:>16}{2:>16}{3:>16}{4:>16}'.format(update, size(full_message), size(message),
+                                                           size(full_message['payload']),
+                                                           size(message['payload'])))
+
+    print()
+    measurements = [('full message', lambda: message_factory.create_message(task)),
+                    ('delta message', lambda: message_factory.create_delta_message(task)),
+                    ('full message + JSON', lambda: size(message_factory.create_message(task))),
+                    ('delta message + JSON', lambda: size(message_factory.create_delta_message(task)))]
+    for name, stmt in measurements:
+        time_per_call = min(timeit.repeat(stmt, number=args.n, repeat=3)) / args.n * 1e6
+        print('{0:<24}{1:>16.2f} us'.format(name, time_per_call))
+
+
+if __name__ == '__main__':
+    main()
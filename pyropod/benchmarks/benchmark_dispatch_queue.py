@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+'''Compares a dispatching step that asks every scheduled task whether it
+is executable (Task.is_executable) with popping the due tasks from a
+DispatchQueue, for tasks whose start times are spread over a day.
+
+Usage: python benchmark_dispatch_queue.py [-n NUM_TASKS] [-s NUM_STEPS]
+'''
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.dispatch_queue import DispatchQueue
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+
+
+def make_tasks(n):
+    # the tasks start within the next day, the first ones are due now
+    now = TimeStamp()
+    tasks = []
+    for i in range(n):
+        start_time = now + datetime.timedelta(seconds=86400 * i / n - 60)
+        task = Task(id='task_{0}'.format(i), earliest_start_time=start_time,
+                    latest_start_time=start_time + datetime.timedelta(minutes=5),
+                    estimated_duration=datetime.timedelta(minutes=10), priority=i % 4)
+        task.start_time = start_time
+        tasks.append(task)
+    return tasks
+
+
+def poll_tasks(tasks):
+    executable = [task for task in tasks.values() if task.is_executable()]
+    for task in executable:
+        del tasks[task.id]
+    return executable
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks DispatchQueue')
+    parser.add_argument('-n', type=int, default=10000, help='number of scheduled tasks')
+    parser.add_argument('-s', type=int, default=100, help='number of dispatching steps')
+    args = parser.parse_args()
+
+    tasks = {task.id: task for task in make_tasks(args.n)}
+    start = time.perf_counter()
+    for _ in range(args.s):
+        poll_tasks(tasks)
+    poll_time = (time.perf_counter() - start) / args.s
+
+    queue = DispatchQueue(make_tasks(args.n))
+    start = time.perf_counter()
+    for _ in range(args.s):
+        queue.pop_due_tasks()
+    queue_time = (time.perf_counter() - start) / args.s
+
+    print('{0} tasks, time per dispatching step'.format(args.n))
+    print('{0:<32}{1:>10.3f} ms'.format('Task.is_executable', poll_time * 1e3))
+    print('{0:<32}{1:>10.3f} ms'.format('DispatchQueue.pop_due_tasks', queue_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+'''Counts the elevator trips needed for the elevator requests of a fleet during
+an hour when every request is served by its own trip and when compatible
+requests are batched by an ElevatorRequestManager.
+
+Usage: python benchmark_elevator_manager.py [-n NUM_REQUESTS] [-w WINDOW_SECONDS]
+'''
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.elevator import ElevatorRequest, ElevatorRequestStatus
+from ropod.structs.elevator_manager import ElevatorRequestManager
+from ropod.utils.timestamp import TimeStamp
+
+TRIP_STATUSES = (ElevatorRequestStatus.ACCEPTED, ElevatorRequestStatus.GOING_TO_START,
+                 ElevatorRequestStatus.WAITING_FOR_ROBOT_IN, ElevatorRequestStatus.GOING_TO_GOAL,
+                 ElevatorRequestStatus.WAITING_FOR_ROBOT_OUT, ElevatorRequestStatus.COMPLETED)
+
+
+def make_requests(n, start_time):
+    '''Returns (time, request) pairs of requests between the ground floor and
+    the upper floors, distributed uniformly over an hour
+    '''
+    requests = []
+    for i in range(n):
+        floor = random.randint(1, 4)
+        start_floor, goal_floor = (0, floor) if random.random() < 0.5 else (floor, 0)
+        request = ElevatorRequest('query_{0}'.format(i), start_floor, goal_floor, 'ROBOT_CALL_ELEVATOR',
+                                  robot_id='ropod_{0:03d}'.format(i % 20))
+        requests.append((start_time + datetime.timedelta(seconds=random.uniform(0, 3600)), request))
+    requests.sort(key=lambda item: item[0].ns)
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks ElevatorRequestManager')
+    parser.add_argument('-n', type=int, default=500, help='number of elevator requests in an hour')
+    parser.add_argument('-w', type=float, default=20, help='batching window in seconds')
+    args = parser.parse_args()
+
+    random.seed(0)
+    start_time = TimeStamp.from_str('2019-11-08T07:00:00')
+    requests = make_requests(args.n, start_time)
+    manager = ElevatorRequestManager(batching_window=datetime.timedelta(seconds=args.w))
+
+    trip_ids = set()
+    start = time.perf_counter()
+    for current_time, request in requests:
+        trip = manager.add_request(request, current_time)
+        trip_ids.add(trip.trip_id)
+        # trips are served as soon as they are ready (the trip durations are ignored)
+        for trip in manager.get_ready_trips(current_time):
+            for status in TRIP_STATUSES:
+                manager.set_trip_status(trip.trip_id, status, current_time)
+    elapsed = time.perf_counter() - start
+
+    print('{0} requests, batching window of {1} s'.format(args.n, args.w))
+    print('{0:<32}{1:>10}'.format('trips without batching', args.n))
+    print('{0:<32}{1:>10}'.format('trips with batching', len(trip_ids)))
+    print('{0:<32}{1:>10.2f} us per request'.format('ElevatorRequestManager', elapsed / args.n * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+'''Measures the time needed to decode a realistic task payload with
+Task.from_dict and with LazyTask.from_dict, for consumers that only read
+the status of a task, that read its schedule and that read the whole task.
+
+Usage: python benchmark_lazy_task.py [-n NUM_CALLS]
+'''
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.action import Action
+from ropod.structs.area import Area, SubArea
+from ropod.structs.task import LazyTask, Task
+from ropod.utils.timestamp import TimeStamp
+
+
+def make_area(name, floor_number):
+    area = Area()
+    area.id = name
+    area.name = name
+    area.floor_number = floor_number
+    sub_area = SubArea()
+    sub_area.id = name + '_1'
+    sub_area.name = name + '_1'
+    sub_area.capacity = 1
+    area.sub_areas.append(sub_area)
+    return area
+
+
+def make_task_dict():
+    '''Returns the dictionary of a dispatched task with
+    a GOTO and an elevator action.
+    '''
+    start = TimeStamp.from_str('2019-11-08T10:15:42.351239')
+    pickup_pose = make_area('AMK_D_L-1_C39', -1)
+    delivery_pose = make_area('AMK_B_L4_RoomBU19', 4)
+
+    goto = Action()
+    goto.id = 'c3dd0bc5-e5f0-4e55-a5d4-d8bc1f2b35d8'
+    goto.type = 'GOTO'
+    goto.areas = [pickup_pose, delivery_pose]
+    elevator = Action()
+    elevator.id = '3a1b0e2c-55b8-4ad3-8d26-1b0f4f5d9c17'
+    elevator.type = 'REQUEST_ELEVATOR'
+    elevator.start_floor = -1
+    elevator.goal_floor = 4
+
+    task = Task(id='0d06fb90-a76d-48b4-b64f-857b7388ab70',
+                robot_actions={'ropod_001': [goto, elevator]},
+                team_robot_ids=['ropod_001'],
+                earliest_start_time=start,
+                latest_start_time=start + datetime.timedelta(minutes=5),
+                estimated_duration=datetime.timedelta(minutes=12),
+                pickup_pose=pickup_pose, delivery_pose=delivery_pose,
+                start_time=start + datetime.timedelta(minutes=2, microseconds=18236))
+    task_dict = task.to_dict()
+
+    # Action.to_dict writes the action ID as "_id", but Action.from_dict reads it from "id"
+    for actions in task_dict['robot_actions'].values():
+        for action_dict in actions:
+            action_dict['id'] = action_dict['_id']
+    return task_dict
+
+
+def read_status(task):
+    return task.status.status
+
+
+def read_schedule(task):
+    return task.start_time, task.latest_start_time, task.estimated_duration
+
+
+def read_all(task):
+    return (task.status.status, task.robot_actions, task.pickup_pose, task.delivery_pose,
+            task.earliest_start_time, task.latest_start_time, task.estimated_duration,
+            task.earliest_finish_time, task.latest_finish_time, task.start_time, task.finish_time)
+
+
+def time_per_call(stmt, n):
+    '''Returns the average time (in microseconds) of a call of stmt.
+    '''
+    return min(timeit.repeat(stmt, number=n, repeat=3)) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the lazy decoding of tasks')
+    parser.add_argument('-n', type=int, default=10000, help='number of calls per measurement')
+    args = parser.parse_args()
+
+    task_dict = make_task_dict()
+
+    print('{0:<12}{1:>20}{2:>22}'.format('', 'Task.from_dict', 'LazyTask.from_dict'))
+    for name, read in (('status', read_status), ('schedule', read_schedule), ('all fields', read_all)):
+        eager = time_per_call(lambda: read(Task.from_dict(task_dict)), args.n)
+        lazy = time_per_call(lambda: read(LazyTask.from_dict(task_dict)), args.n)
+        print('{0:<12}{1:>17.2f} us{2:>19.2f} us'.format(name, eager, lazy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+'''Measures the time and memory needed to simulate a fleet of robots with the
+default versions: constructing the robots, encoding them (to_dict) and
+reloading them from their dictionaries (from_dict).
+
+Usage: python benchmark_robot.py [-n NUM_ROBOTS]
+'''
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.robot import Robot
+
+
+def measure(function):
+    '''Returns the result of function, its duration in ms and the memory it allocated in kB
+    (measured in a second call, since tracing the allocations slows the function down)
+    '''
+    gc.collect()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed * 1e3, size / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the construction and (de)serialisation of robots')
+    parser.add_argument('-n', type=int, default=10000, help='number of robots')
+    args = parser.parse_args()
+
+    robot_ids = ['ropod_{0:05d}'.format(i) for i in range(args.n)]
+    robots, construct_time, construct_size = measure(lambda: [Robot(robot_id) for robot_id in robot_ids])
+    robot_dicts, encode_time, encode_size = measure(lambda: [robot.to_dict() for robot in robots])
+    # the dictionaries of a reloaded fleet state do not share any subtrees
+    robot_dicts = json.loads(json.dumps(robot_dicts, default=str))
+    _, decode_time, decode_size = measure(lambda: [Robot.from_dict(robot_dict) for robot_dict in robot_dicts])
+
+    print('{0} robots'.format(args.n))
+    print('{0:<16}{1:>10.1f} ms{2:>12.0f} kB'.format('Robot()', construct_time, construct_size))
+    print('{0:<16}{1:>10.1f} ms{2:>12.0f} kB'.format('to_dict', encode_time, encode_size))
+    print('{0:<16}{1:>10.1f} ms{2:>12.0f} kB'.format('from_dict', decode_time, decode_size))
+
+
+if __name__ == '__main__':
+    main()
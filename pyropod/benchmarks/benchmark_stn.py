@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+'''Measures the time needed to check whether a new task fits into a robot
+schedule of n sequenced tasks with the incremental TemporalNetwork, compared
+with recomputing the minimal network with the dense Floyd-Warshall algorithm.
+
+Usage: python benchmark_stn.py [-n NUM_TASKS]
+'''
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.stn import TemporalNetwork
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+
+
+def make_task(task_id, ztp, start_minutes, window_minutes, duration_minutes):
+    earliest_start_time = ztp + datetime.timedelta(minutes=start_minutes)
+    return Task(id=task_id, earliest_start_time=earliest_start_time,
+                latest_start_time=earliest_start_time + datetime.timedelta(minutes=window_minutes),
+                estimated_duration=datetime.timedelta(minutes=duration_minutes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks TemporalNetwork')
+    parser.add_argument('-n', type=int, default=300, help='number of tasks in the schedule')
+    args = parser.parse_args()
+
+    ztp = TimeStamp.from_str('2019-11-08T07:00:00')
+    travel_time = datetime.timedelta(minutes=2)
+    network = TemporalNetwork(ztp)
+    previous_task_id = None
+    for i in range(args.n):
+        task = make_task('task_{0}'.format(i), ztp, 10 * i, 60, 5)
+        network.add_task(task, previous_task_id, travel_time=travel_time)
+        previous_task_id = task.id
+
+    # a task that has to be inserted in the middle of the schedule
+    middle = args.n // 2
+    task = make_task('new_task', ztp, 10 * middle, 30, 5)
+    start = time.perf_counter()
+    fits = network.fits(task, 'task_{0}'.format(middle - 1), 'task_{0}'.format(middle), travel_time)
+    fits_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    network.recompute(dense=True)
+    dense_time = time.perf_counter() - start
+
+    print('{0} tasks, the new task fits: {1}'.format(args.n, fits))
+    print('{0:<32}{1:>10.3f} ms'.format('TemporalNetwork.fits', fits_time * 1e3))
+    print('{0:<32}{1:>10.3f} ms'.format('dense recomputation', dense_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+'''Measures the memory footprint and the construction, attribute access
+and (de)serialisation times of the structs in ropod.structs.
+
+The slotted structs are compared with dict-based equivalents, which are
+plain classes that share the constructors of the structs, such that
+the only difference is where the instance attributes are stored.
+
+Usage: python benchmark_structs.py [-n NUM_INSTANCES]
+'''
+import argparse
+import datetime
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.action import Action
+from ropod.structs.area import Area, SubArea, SubAreaReservation
+from ropod.structs.elevator import Elevator, ElevatorRequest
+from ropod.structs.robot import Robot
+from ropod.structs.status import TaskStatus
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+
+
+def make_task():
+    return Task(earliest_start_time=TimeStamp(),
+                latest_start_time=TimeStamp(datetime.timedelta(minutes=5)),
+                estimated_duration=datetime.timedelta(minutes=10))
+
+
+def make_reservation():
+    reservation = SubAreaReservation()
+    reservation.start_time = TimeStamp()
+    reservation.end_time = TimeStamp(datetime.timedelta(minutes=5))
+    return reservation
+
+
+# struct class -> (constructor arguments, factory of an instance used for (de)serialisation)
+STRUCTS = [(Task, (), make_task),
+           (TaskStatus, ('task',), lambda: TaskStatus('task')),
+           (Action, (), Action),
+           (Area, (), Area),
+           (SubArea, (), SubArea),
+           (SubAreaReservation, (), make_reservation),
+           (ElevatorRequest, (1, 0, 2, 'ROBOT_CALL'), lambda: ElevatorRequest(1, 0, 2, 'ROBOT_CALL')),
+           (Elevator, (1,), lambda: Elevator(1)),
+           (Robot, ('robot',), lambda: Robot('robot', uuid='uuid'))]
+
+# keys that to_dict writes under a different name than the one from_dict reads
+RENAMED_KEYS = {Action: {'_id': 'id'}}
+
+
+def dict_based(struct_class):
+    '''Returns a class without __slots__ with the constructor, methods
+    and class constants of the given struct.
+    '''
+    namespace = {name: value for name, value in vars(struct_class).items()
+                 if name != '__slots__' and name not in struct_class.__slots__}
+    return type(struct_class.__name__ + 'Dict', (object,), namespace)
+
+
+def instance_size(cls, args, n):
+    '''Returns the average number of bytes allocated for an instance of cls.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    instances = [cls(*args) for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return size / n
+
+
+def time_per_call(stmt, n):
+    '''Returns the average time (in microseconds) of a call of stmt.
+    '''
+    return min(timeit.repeat(stmt, number=n, repeat=3)) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the structs in ropod.structs')
+    parser.add_argument('-n', type=int, default=10000, help='number of instances/calls per measurement')
+    args = parser.parse_args()
+
+    print('{0:<20}{1:>14}{2:>14}{3:>12}{4:>12}{5:>12}{6:>12}{7:>12}{8:>12}'
+          .format('struct', 'bytes (dict)', 'bytes (slots)', 'new (dict)', 'new (slots)',
+                  'get (dict)', 'get (slots)', 'to_dict', 'from_dict'))
+    for struct_class, struct_args, factory in STRUCTS:
+        dict_class = dict_based(struct_class)
+        dict_size = instance_size(dict_class, struct_args, args.n)
+        slots_size = instance_size(struct_class, struct_args, args.n)
+
+        dict_new = time_per_call(lambda: dict_class(*struct_args), args.n)
+        slots_new = time_per_call(lambda: struct_class(*struct_args), args.n)
+
+        attribute = struct_class.__slots__[0]
+        dict_instance = dict_class(*struct_args)
+        slots_instance = struct_class(*struct_args)
+        dict_get = time_per_call(lambda: getattr(dict_instance, attribute), args.n)
+        slots_get = time_per_call(lambda: getattr(slots_instance, attribute), args.n)
+
+        instance = factory()
+        instance_dict = instance.to_dict()
+        for key, from_dict_key in RENAMED_KEYS.get(struct_class, {}).items():
+            instance_dict[from_dict_key] = instance_dict.pop(key)
+        to_dict = time_per_call(instance.to_dict, args.n)
+        from_dict = None
+        if hasattr(struct_class, 'from_dict'):
+            from_dict = time_per_call(lambda: struct_class.from_dict(instance_dict), args.n)
+
+        print('{0:<20}{1:>14.0f}{2:>14.0f}{3:>12.2f}{4:>12.2f}{5:>12.3f}{6:>12.3f}{7:>12.2f}{8:>12}'
+              .format(struct_class.__name__, dict_size, slots_size, dict_new, slots_new,
+                      dict_get, slots_get, to_dict,
+                      '-' if from_dict is None else '{0:.2f}'.format(from_dict)))
+    print('(sizes in bytes per instance, including the attribute values; times in microseconds per call)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+'''Compares the per-task temporal operations of Task and TaskConstraints
+with the vectorised operations of TaskBatch for the preprocessing
+of a planning cycle: postponing the unallocated tasks, recomputing
+the finish times with new duration estimates and converting the
+start times to times relative to a ZTP.
+
+Usage: python benchmark_task_batch.py [-n NUM_TASKS]
+'''
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.status import TaskStatus
+from ropod.structs.task import Task, TaskConstraints
+from ropod.structs.task_batch import TaskBatch
+from ropod.utils.timestamp import TimeStamp
+
+
+def make_tasks(n):
+    start = TimeStamp.from_str('2019-11-08T08:00:00')
+    tasks = []
+    for i in range(n):
+        earliest_start_time = start + datetime.timedelta(seconds=30 * i)
+        task = Task(id='task_{0}'.format(i),
+                    earliest_start_time=earliest_start_time,
+                    latest_start_time=earliest_start_time + datetime.timedelta(minutes=10),
+                    estimated_duration=datetime.timedelta(minutes=5 + i % 20),
+                    priority=i % 4)
+        if i % 3:
+            task.status.status = TaskStatus.ALLOCATED
+        tasks.append(task)
+    return tasks
+
+
+def preprocess_tasks(tasks, ztp, delay, durations):
+    constraints = []
+    for task, duration in zip(tasks, durations):
+        if task.status.status == TaskStatus.UNALLOCATED:
+            task.postpone_task(delay)
+        task.update_task_estimated_duration(duration)
+        constraints.append(TaskConstraints.relative_to_ztp(task, ztp, 'minutes'))
+    return constraints
+
+
+def preprocess_batch(batch, ztp, delay, durations):
+    batch.postpone(delay, batch.statuses == TaskStatus.UNALLOCATED)
+    batch.update_estimated_durations(durations)
+    return batch.relative_to_ztp(ztp, 'minutes')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks TaskBatch')
+    parser.add_argument('-n', type=int, default=10000, help='number of tasks')
+    args = parser.parse_args()
+
+    ztp = TimeStamp.from_str('2019-11-08T07:00:00')
+    delay = datetime.timedelta(minutes=2)
+    durations = [datetime.timedelta(minutes=4 + i % 15) for i in range(args.n)]
+    duration_array = np.array(durations, dtype='timedelta64[us]')
+
+    tasks = make_tasks(args.n)
+    start = time.perf_counter()
+    preprocess_tasks(tasks, ztp, delay, durations)
+    task_time = time.perf_counter() - start
+
+    tasks = make_tasks(args.n)
+    start = time.perf_counter()
+    batch = TaskBatch.from_tasks(tasks)
+    conversion_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    preprocess_batch(batch, ztp, delay, duration_array)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch.to_tasks()
+    write_back_time = time.perf_counter() - start
+
+    print('{0} tasks'.format(args.n))
+    print('{0:<32}{1:>10.2f} ms'.format('Task/TaskConstraints', task_time * 1e3))
+    print('{0:<32}{1:>10.2f} ms'.format('TaskBatch', batch_time * 1e3))
+    print('{0:<32}{1:>10.2f} ms'.format('TaskBatch.from_tasks', conversion_time * 1e3))
+    print('{0:<32}{1:>10.2f} ms'.format('TaskBatch.to_tasks', write_back_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
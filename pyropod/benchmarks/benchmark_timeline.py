@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+'''Measures an auction-style evaluation of a task request against the schedules
+of all robots of a fleet: FleetTimelines.evaluate_request is compared with
+iterating over the sorted task list of each robot to find the first gap
+in which the task fits.
+
+Usage: python benchmark_timeline.py [-r NUM_ROBOTS] [-n NUM_TASKS_PER_ROBOT]
+'''
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.task import Task, TaskRequest
+from ropod.structs.timeline import FleetTimelines, RobotTimeline
+from ropod.utils.timestamp import TimeStamp
+
+MINUTE = datetime.timedelta(minutes=1)
+
+
+def make_schedule(robot_id, ztp, n):
+    tasks = []
+    start_time = ztp + MINUTE * random.randint(0, 30)
+    for i in range(n):
+        duration = MINUTE * random.randint(5, 20)
+        tasks.append(Task(id='{0}_task_{1}'.format(robot_id, i), earliest_start_time=start_time,
+                          latest_start_time=start_time + MINUTE * 10, estimated_duration=duration))
+        start_time += duration + MINUTE * random.randint(0, 20)
+    return tasks
+
+
+def first_gap(tasks, request, duration, travel_time):
+    '''Returns the earliest start of the task in the sorted list of tasks or None
+    '''
+    start_time = request.earliest_pickup_time
+    for task in tasks:
+        if start_time > request.latest_pickup_time:
+            return None
+        if start_time + duration + travel_time <= task.earliest_start_time:
+            return start_time
+        finish_time = task.earliest_start_time + task.estimated_duration + travel_time
+        if finish_time > start_time:
+            start_time = finish_time
+    return start_time if start_time <= request.latest_pickup_time else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks FleetTimelines')
+    parser.add_argument('-r', type=int, default=100, help='number of robots')
+    parser.add_argument('-n', type=int, default=200, help='number of tasks per robot')
+    args = parser.parse_args()
+
+    random.seed(0)
+    ztp = TimeStamp.from_str('2019-11-08T07:00:00')
+    schedules = {'ropod_{0}'.format(i): make_schedule('ropod_{0}'.format(i), ztp, args.n)
+                 for i in range(args.r)}
+    fleet = FleetTimelines([RobotTimeline(robot_id, tasks) for robot_id, tasks in schedules.items()])
+
+    request = TaskRequest()
+    request.earliest_pickup_time = ztp + MINUTE * 10 * args.n
+    request.latest_pickup_time = request.earliest_pickup_time + MINUTE * 30
+    duration = MINUTE * 10
+    travel_time = MINUTE * 2
+
+    start = time.perf_counter()
+    bids = [(robot_id, first_gap(tasks, request, duration, travel_time))
+            for robot_id, tasks in schedules.items()]
+    list_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    insertions = fleet.evaluate_request(request, duration, travel_time)
+    timeline_time = time.perf_counter() - start
+
+    print('{0} robots with {1} tasks, {2} robots can take the task'.format(
+        args.r, args.n, len([bid for bid in bids if bid[1] is not None])))
+    print('{0:<32}{1:>10.3f} ms'.format('task lists', list_time * 1e3))
+    print('{0:<32}{1:>10.3f} ms ({2} insertions)'.format('FleetTimelines', timeline_time * 1e3,
+                                                        len(insertions)))
+
+
+if __name__ == '__main__':
+    main()
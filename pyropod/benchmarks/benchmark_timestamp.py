@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+'''Measures the time needed for parsing and formatting timestamps,
+in isolation and as part of (de)serialising realistic task payloads.
+
+The parsing times of TimeStamp.from_str are compared with
+dateutil.parser.parse, which was previously used for all timestamps.
+
+Usage: python benchmark_timestamp.py [-n NUM_CALLS]
+'''
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+import dateutil.parser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.action import Action
+from ropod.structs.area import Area, SubArea, SubAreaReservation
+from ropod.structs.task import Task, TaskRequest
+from ropod.utils.models import MessageFactoryBase
+from ropod.utils.timestamp import TimeStamp
+
+
+def make_area(name, floor_number):
+    area = Area()
+    area.id = name
+    area.name = name
+    area.floor_number = floor_number
+    sub_area = SubArea()
+    sub_area.id = name + '_1'
+    sub_area.name = name + '_1'
+    sub_area.capacity = 1
+    area.sub_areas.append(sub_area)
+    return area
+
+
+def make_task_dict():
+    '''Returns the dictionary of a task with a GOTO and an elevator action
+    and a start time, i.e. with the six timestamps of a dispatched task.
+    '''
+    start = TimeStamp.from_str('2019-11-08T10:15:42.351239')
+    pickup_pose = make_area('AMK_D_L-1_C39', -1)
+    delivery_pose = make_area('AMK_B_L4_RoomBU19', 4)
+
+    goto = Action()
+    goto.id = 'c3dd0bc5-e5f0-4e55-a5d4-d8bc1f2b35d8'
+    goto.type = 'GOTO'
+    goto.areas = [pickup_pose, delivery_pose]
+    elevator = Action()
+    elevator.id = '3a1b0e2c-55b8-4ad3-8d26-1b0f4f5d9c17'
+    elevator.type = 'REQUEST_ELEVATOR'
+    elevator.start_floor = -1
+    elevator.goal_floor = 4
+
+    task = Task(id='0d06fb90-a76d-48b4-b64f-857b7388ab70',
+                robot_actions={'ropod_001': [goto, elevator]},
+                team_robot_ids=['ropod_001'],
+                earliest_start_time=start,
+                latest_start_time=start + datetime.timedelta(minutes=5),
+                estimated_duration=datetime.timedelta(minutes=12),
+                pickup_pose=pickup_pose, delivery_pose=delivery_pose,
+                start_time=start + datetime.timedelta(minutes=2, microseconds=18236))
+    task_dict = task.to_dict()
+
+    # Action.to_dict writes the action ID as "_id", but Action.from_dict reads it from "id"
+    for actions in task_dict['robot_actions'].values():
+        for action_dict in actions:
+            action_dict['id'] = action_dict['_id']
+    return task_dict
+
+
+def make_reservation_dict():
+    reservation = SubAreaReservation()
+    reservation.sub_area_id = 'AMK_D_L-1_C39_1'
+    reservation.task_id = '0d06fb90-a76d-48b4-b64f-857b7388ab70'
+    reservation.robot_id = 'ropod_001'
+    reservation.start_time = TimeStamp.from_str('2019-11-08T10:15:42.351239')
+    reservation.end_time = reservation.start_time + datetime.timedelta(minutes=3)
+    reservation.status = 'scheduled'
+    reservation.required_capacity = 1
+    return reservation.to_dict()
+
+
+def make_request_dict():
+    return {'id': '5bbd1a7a-4a7b-4a87-97b6-6d6b8f1c2a11',
+            'loadType': 'MobiDik',
+            'loadId': '4800001663',
+            'userId': '1',
+            'earliestPickupTime': '2019-11-08T10:15:42.351239',
+            'latestPickupTime': '2019-11-08T10:20:42.351239',
+            'pickupLocation': 'AMK_D_L-1_C39',
+            'pickupLocationLevel': -1,
+            'deliveryLocation': 'AMK_B_L4_RoomBU19',
+            'deliveryLocationLevel': 4,
+            'priority': 2}
+
+
+def time_per_call(stmt, n):
+    '''Returns the average time (in microseconds) of a call of stmt.
+    '''
+    return min(timeit.repeat(stmt, number=n, repeat=3)) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the parsing and formatting of timestamps')
+    parser.add_argument('-n', type=int, default=10000, help='number of calls per measurement')
+    args = parser.parse_args()
+
+    naive = '2019-11-08T10:15:42.351239'
+    aware = '2019-11-08T10:15:42.351239+01:00'
+    task_dict = make_task_dict()
+    task = Task.from_dict(task_dict)
+    reservation_dict = make_reservation_dict()
+    request_dict = make_request_dict()
+    message_factory = MessageFactoryBase()
+
+    measurements = [('dateutil.parser.parse (naive)', lambda: dateutil.parser.parse(naive)),
+                    ('TimeStamp.from_str (naive)', lambda: TimeStamp.from_str(naive)),
+                    ('dateutil.parser.parse (time zone)', lambda: dateutil.parser.parse(aware)),
+                    ('TimeStamp.from_str (time zone)', lambda: TimeStamp.from_str(aware)),
+                    ('TimeStamp().to_str()', lambda: TimeStamp().to_str()),
+                    ('message header', lambda: message_factory.get_header('TASK')),
+                    ('Task.from_dict', lambda: Task.from_dict(task_dict)),
+                    ('Task.to_dict (decoded task)', task.to_dict),
+                    ('Task.from_dict + to_dict', lambda: Task.from_dict(task_dict).to_dict()),
+                    ('SubAreaReservation.from_dict', lambda: SubAreaReservation.from_dict(reservation_dict)),
+                    ('TaskRequest.from_dict', lambda: TaskRequest.from_dict(request_dict))]
+
+    for name, stmt in measurements:
+        print('{0:<36}{1:>10.2f} us'.format(name, time_per_call(stmt, args.n)))
+
+
+if __name__ == '__main__':
+    main()
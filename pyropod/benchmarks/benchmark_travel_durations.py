@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+'''Measures the estimation of the durations of task requests between the areas
+of a building when a (slow) path planner is called for every request and when
+its estimates are memoized by a TravelDurationEstimator.
+
+Usage: python benchmark_travel_durations.py [-n NUM_REQUESTS] [-a NUM_AREAS] [-d PLANNER_DELAY_MS]
+'''
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ropod.structs.area import Area
+from ropod.utils.travel_durations import TravelDurationEstimator
+
+
+def make_area(i):
+    area = Area()
+    area.id = 'area_{0}'.format(i)
+    area.name = area.id
+    area.floor_number = i % 5
+    return area
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks TravelDurationEstimator')
+    parser.add_argument('-n', type=int, default=2000, help='number of task requests')
+    parser.add_argument('-a', type=int, default=20, help='number of areas')
+    parser.add_argument('-d', type=float, default=1, help='duration of a path planner call in ms')
+    args = parser.parse_args()
+
+    random.seed(0)
+    areas = [make_area(i) for i in range(args.a)]
+    pairs = [tuple(random.sample(areas, 2)) for _ in range(args.n)]
+    calls = [0]
+
+    def plan(pickup_area, delivery_area):
+        calls[0] += 1
+        time.sleep(args.d / 1e3)
+        return datetime.timedelta(seconds=60 * (1 + abs(pickup_area.floor_number - delivery_area.floor_number)))
+
+    start = time.perf_counter()
+    for pickup_area, delivery_area in pairs:
+        plan(pickup_area, delivery_area)
+    planner_time = time.perf_counter() - start
+    planner_calls = calls[0]
+
+    calls[0] = 0
+    estimator = TravelDurationEstimator(plan)
+    start = time.perf_counter()
+    for pickup_area, delivery_area in pairs:
+        estimator.get(pickup_area, delivery_area)
+    estimator_time = time.perf_counter() - start
+
+    print('{0} requests between {1} areas'.format(args.n, args.a))
+    print('{0:<32}{1:>10.1f} ms ({2} planner calls)'.format('path planner', planner_time * 1e3, planner_calls))
+    print('{0:<32}{1:>10.1f} ms ({2} planner calls)'.format('TravelDurationEstimator', estimator_time * 1e3,
+                                                           calls[0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import copy
+import threading
+import time
+
+
+class ComponentSpecCache(object):
+    '''Cache of the component specification documents in a robot store.
+    The first lookup loads the specifications of all components in a single
+    query, so that the components started in a process do not each need
+    a separate round trip to the robot store; components whose specification
+    is not in the cache are looked up individually.
+
+    The cache is invalidated when the robot store reports that
+    a specification has changed (if the store supports such notifications)
+    and can be invalidated explicitly with "invalidate"; every invalidation
+    increments the cache version, so that specifications read from the store
+    before an invalidation are not cached afterwards. For stores that cannot
+    report changes, cached specifications are reloaded once they are older
+    than max_age.
+
+    A single cache is shared by all components that use
+    the same robot store (see ComponentSpecCache.get_cache).
+    '''
+    __caches = {}
+    __caches_lock = threading.Lock()
+
+    def __init__(self, robot_store, max_age=60.):
+        '''Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+        max_age: float -- time (in seconds) after which a cached specification
+                          is reloaded on the next lookup (never if None)
+
+        '''
+        self.robot_store = robot_store
+        self.max_age = max_age
+        self.version = 0
+
+        # (spec, load_time) tuples indexed by component name
+        self.__specs = {}
+        self.__load_time = None
+        self.__lock = threading.Lock()
+
+        self.robot_store.add_spec_listener(self.invalidate)
+
+    @classmethod
+    def get_cache(cls, robot_store):
+        '''Returns the specification cache of the given robot store,
+        creating it if it doesn't exist yet.
+
+        Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+
+        '''
+        with cls.__caches_lock:
+            if robot_store not in cls.__caches:
+                cls.__caches[robot_store] = ComponentSpecCache(robot_store)
+            return cls.__caches[robot_store]
+
+    def load(self):
+        '''Loads the specifications of all components in a single query.
+        Can be called at process start so that the specifications are
+        available before the components are created.
+        '''
+        with self.__lock:
+            version = self.version
+        load_time = time.monotonic()
+        specs = self.robot_store.get_component_specs()
+
+        with self.__lock:
+            # the specifications may be outdated if the cache
+            # was invalidated while they were being read
+            if self.version == version:
+                self.__specs = {spec['component_name']: (spec, load_time) for spec in specs}
+                self.__load_time = load_time
+
+    def get_spec(self, component_name):
+        '''Returns (a copy of) the specification document of the given component
+        or None if the component has no specification.
+
+        Keyword arguments:
+        component_name: str -- name of a component
+
+        '''
+        now = time.monotonic()
+        with self.__lock:
+            loaded = self.__load_time is not None and not self.__is_expired(self.__load_time, now)
+        if not loaded:
+            self.load()
+
+        with self.__lock:
+            entry = self.__specs.get(component_name)
+            version = self.version
+
+        if entry is not None and not self.__is_expired(entry[1], now):
+            return copy.deepcopy(entry[0])
+
+        spec = self.robot_store.get_component_spec(component_name)
+        if spec is None:
+            return None
+
+        with self.__lock:
+            if self.version == version:
+                self.__specs[component_name] = (spec, now)
+        return copy.deepcopy(spec)
+
+    def invalidate(self, component_name=None):
+        '''Removes the specification of the given component from the cache
+        or clears the whole cache if no component name is given.
+
+        Keyword arguments:
+        component_name: str -- name of a component
+
+        '''
+        with self.__lock:
+            if component_name is None:
+                self.__specs = {}
+                self.__load_time = None
+            else:
+                self.__specs.pop(component_name, None)
+            self.version += 1
+
+    def __is_expired(self, load_time, now):
+        return self.max_age is not None and now - load_time > self.max_age
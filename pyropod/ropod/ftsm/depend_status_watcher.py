@@ -0,0 +1,171 @@
+import threading
+import pymongo as pm
+
+
+class DependStatusWatcher(object):
+    '''Keeps track of the status documents of the components that the components
+    in the current process depend on and calls the callbacks subscribed to
+    a component whenever its status changes. Each status document is
+    retrieved once, regardless of how many callbacks are subscribed to it.
+
+    A status stream is used if the store supports it (for MongoDB stores,
+    change streams are only available on replica sets); otherwise, the
+    statuses need to be polled, in which case only documents that have
+    changed are reported.
+
+    The watcher does not run on its own; "refresh" and "poll" are called
+    by the MonitoringScheduler.
+    '''
+    def __init__(self, robot_store, max_await_time_ms=100):
+        '''Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+        max_await_time_ms: int -- maximum time a status stream waits for new changes
+
+        '''
+        self.robot_store = robot_store
+        self.max_await_time_ms = max_await_time_ms
+
+        # lists of callbacks subscribed to the statuses of each component
+        self.__subscriptions = {}
+
+        # the last reported status document of each component
+        self.__last_docs = {}
+
+        self.__stream = None
+        self.__subscriptions_changed = False
+        self.__lock = threading.RLock()
+
+    @property
+    def has_stream(self):
+        return self.__stream is not None
+
+    def subscribe(self, component_ids, callback):
+        '''Subscribes the callback to the statuses of the given components.
+        The callback is immediately called with the already known statuses
+        of the components.
+
+        Keyword arguments:
+        component_ids: list[str] -- component IDs
+        callback: Callable[[dict], None] -- called with every new or changed status document
+
+        '''
+        with self.__lock:
+            for component_id in component_ids:
+                if component_id not in self.__subscriptions:
+                    self.__subscriptions[component_id] = []
+                    self.__subscriptions_changed = True
+                self.__subscriptions[component_id].append(callback)
+
+                if component_id in self.__last_docs:
+                    self.__call(callback, self.__last_docs[component_id])
+
+    def unsubscribe(self, callback):
+        '''Removes all subscriptions of the given callback.
+        '''
+        with self.__lock:
+            for component_id in list(self.__subscriptions.keys()):
+                callbacks = self.__subscriptions[component_id]
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    del self.__subscriptions[component_id]
+                    self.__last_docs.pop(component_id, None)
+                    self.__subscriptions_changed = True
+
+    def refresh(self):
+        '''(Re)opens the status stream if the set of watched components
+        has changed and processes at most one status change from the stream;
+        blocks for at most self.max_await_time_ms if a stream is open.
+        '''
+        if self.__subscriptions_changed:
+            self.__open_stream()
+
+        if self.__stream is None:
+            return
+
+        try:
+            status_doc = self.__stream.try_next()
+        except pm.errors.PyMongoError as exc:
+            print('[depend_status_watcher] {0}'.format(exc))
+            self.__close_stream()
+            with self.__lock:
+                self.__subscriptions_changed = True
+            return
+
+        if status_doc is not None:
+            self.__report(status_doc)
+
+    def poll(self):
+        '''Reads the statuses of all watched components in a single query,
+        reporting only those that have changed since the last read.
+        '''
+        with self.__lock:
+            component_ids = list(self.__subscriptions.keys())
+
+        if not component_ids:
+            return
+
+        try:
+            for status_doc in self.robot_store.get_statuses(component_ids):
+                self.__report(status_doc)
+        except pm.errors.PyMongoError as exc:
+            print('[depend_status_watcher] {0}'.format(exc))
+
+    def __open_stream(self):
+        '''Opens a status stream for the currently watched components and
+        reads their current statuses. The stream is opened before the statuses
+        are read so that no change that happens in between is lost.
+        '''
+        self.__close_stream()
+        with self.__lock:
+            self.__subscriptions_changed = False
+            component_ids = list(self.__subscriptions.keys())
+
+        if not component_ids:
+            return
+
+        try:
+            self.__stream = self.robot_store.watch_statuses(component_ids,
+                                                            self.max_await_time_ms)
+        except pm.errors.PyMongoError as exc:
+            print('[depend_status_watcher] {0}'.format(exc))
+
+        if self.__stream is None:
+            print('[depend_status_watcher] Status streams not available; polling statuses instead')
+        self.poll()
+
+    def __close_stream(self):
+        if self.__stream is not None:
+            self.__stream.close()
+            self.__stream = None
+
+    def __report(self, status_doc):
+        '''Calls the callbacks subscribed to the component of the given
+        status document if the document differs from the one
+        last reported for the component.
+        '''
+        with self.__lock:
+            component_id = status_doc.get('component_id')
+            if component_id not in self.__subscriptions:
+                return
+
+            last_doc = self.__last_docs.get(component_id)
+            if last_doc is not None and last_doc.get('modes') == status_doc.get('modes'):
+                return
+
+            self.__last_docs[component_id] = status_doc
+            callbacks = list(self.__subscriptions[component_id])
+
+        for callback in callbacks:
+            self.__call(callback, status_doc)
+
+    def __call(self, callback, status_doc):
+        '''Calls a subscribed callback with the given status document; errors
+        are printed instead of raised, so that an error in the callback of one
+        component does not stop the status updates of the other components.
+        '''
+        try:
+            callback(status_doc)
+        except Exception as exc:
+            print('[depend_status_watcher] Error in status callback {0}: {1!r}'.format(
+                getattr(callback, '__qualname__', callback), exc))
@@ -3,6 +3,11 @@ import time
 import threading
 import pymongo as pm
 from pyftsm.ftsm import FTSM, FTSMStates, FTSMTransitions
+from ropod.ftsm.component_spec_cache import ComponentSpecCache
+from ropod.ftsm.monitoring_scheduler import MonitoringScheduler
+from ropod.ftsm.robot_store import MongoRobotStore
+from ropod.ftsm.shared_status_table import SharedMemoryRobotStore
+from ropod.ftsm.stats import FTSMStats
 
 class DependMonitorTypes(object):
     HEARTBEAT = 'heartbeat'
@@ -26,6 +31,12 @@ class FTSMBase(FTSM):
                  robot_store_component_collection='components',
                  robot_store_status_collection='status',
                  robot_store_sm_state_collection='component_sm_states',
+                 depend_status_poll_interval=0.5,
+                 process_depend_statuses_on_change=False,
+                 sm_state_heartbeat_interval=5.,
+                 robot_store=None,
+                 persist_stats=False,
+                 status_table_name=None,
                  debug=False):
         if not dependencies:
             dependencies = []
@@ -33,6 +44,21 @@ class FTSMBase(FTSM):
         if not dependency_monitors:
             dependency_monitors = {}
 
+        # the state is written to the robot store on every state transition;
+        # the state document is additionally refreshed every
+        # sm_state_heartbeat_interval seconds (no refreshes if None)
+        self.sm_state_heartbeat_interval = sm_state_heartbeat_interval
+        self.state_transition_time = None
+        self.__monitoring_scheduler = None
+
+        # notified whenever self.depend_statuses changes or the component is stopped
+        self.depend_status_condition = threading.Condition()
+
+        # transition statistics of the component, which are
+        # written with the state documents if persist_stats is set
+        self.stats = FTSMStats(max_recovery_attempts, FTSMStates.RUNNING, FTSMStates.RECOVERING)
+        self.persist_stats = persist_stats
+
         super(FTSMBase, self).__init__(name, dependencies, max_recovery_attempts)
         self.dependency_monitors = dependency_monitors
 
@@ -42,6 +68,32 @@ class FTSMBase(FTSM):
         self.status_collection_name = robot_store_status_collection
         self.sm_state_collection_name = robot_store_sm_state_collection
 
+        # the robot store backend; by default, the MongoDB robot store
+        # with the above database name, port and collections is used
+        # (no store is created in debug mode, in which the store is not used)
+        if robot_store is None and not debug:
+            robot_store = MongoRobotStore.get_store(self.db_name, self.db_port,
+                                                    self.component_collection_name,
+                                                    self.status_collection_name,
+                                                    self.sm_state_collection_name)
+
+        # if a shared-memory status table (published by a status collector
+        # process) is used, the dependency statuses are read from the table
+        # instead of from the robot store
+        if status_table_name is not None and not debug:
+            robot_store = SharedMemoryRobotStore.get_store(status_table_name, robot_store)
+        self.robot_store = robot_store
+
+        # polling period for the dependency statuses, which is only used
+        # if the robot store does not support change streams (such as
+        # a store that reads the statuses from a shared-memory status table)
+        self.depend_status_poll_interval = depend_status_poll_interval
+
+        # if set, self.process_depend_statuses is called every time
+        # the status of a dependency changes and the transitions returned
+        # by it are passed to self.handle_depend_status_transition
+        self.process_depend_statuses_on_change = process_depend_statuses_on_change
+
         # we check whether the dependencies match the dependencies in the specification
         # and raise an AssertionError if they don't
         if not debug:
@@ -60,16 +112,49 @@ class FTSMBase(FTSM):
                                      .format(self.name, spec_dependency_monitors))
 
             self.depend_statuses = {}
-            self.depend_status_thread = threading.Thread(target=self.get_dependency_statuses)
-            self.depend_status_thread.daemon = True
-            self.depend_status_thread.start()
+            self.__monitor_index = self.__compile_dependency_monitors()
 
-            self.sm_state_thread = threading.Thread(target=self.write_sm_state)
-            self.sm_state_thread.daemon = True
-            self.sm_state_thread.start()
+            # the dependency statuses and the component state are
+            # managed by a scheduler shared by all components in the process
+            self.__monitoring_scheduler = MonitoringScheduler.get_scheduler(self.robot_store)
+            self.get_dependency_statuses()
+            self.write_sm_state()
         else:
             print('[ftsm_base] Running {0} in debug mode; component monitoring not initialised'.format(self.name))
 
+    @property
+    def current_state(self):
+        return self.__current_state
+
+    @current_state.setter
+    def current_state(self, state):
+        '''Sets the current state of the state machine; if the state changes,
+        saves the time of the transition and writes the new state to the robot store.
+        Setting the "recovering" state again (i.e. a repeated recovery attempt) is
+        only recorded in the statistics.
+        '''
+        previous_state = getattr(self, '_FTSMBase__current_state', None)
+        refresh_time = None
+        if self.__monitoring_scheduler is not None:
+            refresh_time = self.__monitoring_scheduler.last_status_refresh_time
+
+        if state == previous_state:
+            if state == FTSMStates.RECOVERING:
+                self.stats.record_transition(previous_state, state, time.time(), refresh_time)
+            return
+
+        self.__current_state = state
+        self.state_transition_time = time.time()
+        self.stats.record_transition(previous_state, state, self.state_transition_time, refresh_time)
+        self.write_sm_state()
+
+        if state == FTSMStates.STOPPED:
+            if self.__monitoring_scheduler is not None:
+                self.__monitoring_scheduler.unsubscribe_statuses(self.__update_depend_statuses)
+
+            with self.depend_status_condition:
+                self.depend_status_condition.notify_all()
+
     def init(self):
         '''Method for component initialisation; returns FTSMTransitions.INITIALISED by default
         '''
@@ -105,6 +190,23 @@ class FTSMBase(FTSM):
         '''Processes the statuses of the component dependencies and returns
         a state transition string from FTSMTransitions (or None if no transition
         needs to take place.) The default implementation simply returns None.
+
+        If self.process_depend_statuses_on_change is set, the method is also called
+        on every dependency status change by the monitoring scheduler, whose thread
+        is shared by all components in the process; it must therefore not block.
+        '''
+        return None
+
+    def handle_depend_status_transition(self, transition):
+        '''Handles a transition returned by self.process_depend_statuses when it is
+        called because of a dependency status change (see process_depend_statuses_on_change),
+        e.g. by interrupting the behaviour of the current state. Like process_depend_statuses,
+        this runs on the thread of the monitoring scheduler and must not block.
+        The default implementation does nothing.
+
+        Keyword arguments:
+        transition: str -- a transition string from FTSMTransitions
+
         '''
         return None
 
@@ -122,7 +224,7 @@ class FTSMBase(FTSM):
         return None
 
     def get_dependency_statuses(self):
-        '''Returns a dictionary representing the statuses
+        '''Starts updating self.depend_statuses, a dictionary representing the statuses
         of the components that the current component depends on,
         such that the dependencies are read from the robot store database.
         Since monitors can be of different types (e.g. existence, functional)
@@ -144,55 +246,148 @@ class FTSMBase(FTSM):
             }
         }
 
-        Throws a pm.errors.OperationFailure error in case of exceptions.
+        The statuses are updated by the process' MonitoringScheduler as soon as
+        they change in the robot store if the store supports change streams;
+        otherwise, the statuses are polled every self.depend_status_poll_interval
+        seconds. The updates stop once the component is stopped.
+
+        '''
+        self.__monitoring_scheduler.subscribe_statuses(self.__monitor_index.keys(),
+                                                       self.__update_depend_statuses,
+                                                       self.depend_status_poll_interval)
+
+    def __compile_dependency_monitors(self):
+        '''Creates the entries of self.depend_statuses for all dependency
+        monitors and returns an index of the monitors of the form
+
+        {
+            "component_id":
+            {
+                "monitor_name": [(monitor_statuses, monitor_specs), ...]
+            }
+        }
+
+        where "monitor_statuses" is the self.depend_statuses[monitor_type][depend_comp]
+        dictionary in which the status of the monitor "component_id/monitor_name"
+        is stored under the "monitor_specs" key. The index is used for
+        mapping status documents to dependency statuses without parsing
+        the monitor specifications on every update.
+        '''
+        monitor_index = {}
+        for monitor_type, monitors in self.dependency_monitors.items():
+            self.depend_statuses[monitor_type] = {}
+            for depend_comp, monitor_specs in monitors.items():
+                if monitor_specs == MonitorConstants.NONE:
+                    continue
+
+                self.depend_statuses[monitor_type][depend_comp] = {}
+                monitor_statuses = self.depend_statuses[monitor_type][depend_comp]
+
+                component_name, monitor_name = monitor_specs.split('/')
+                component_monitors = monitor_index.setdefault(component_name, {})
+                component_monitors.setdefault(monitor_name, []).append((monitor_statuses,
+                                                                        monitor_specs))
+        return monitor_index
+
+    def __update_depend_statuses(self, status_doc):
+        '''Updates self.depend_statuses with the monitor statuses in the given
+        status document and, if self.process_depend_statuses_on_change is set,
+        calls self.process_depend_statuses.
 
         Keyword arguments:
-        component_name: str -- name of a component
+        status_doc: dict -- a status document from the robot store
 
         '''
-        while not self.is_running:
-            time.sleep(0.5)
+        component_monitors = self.__monitor_index.get(status_doc['component_id'])
+        if not component_monitors:
+            return
 
-        while self.current_state != FTSMStates.STOPPED and self.is_running:
-            try:
-                collection = self.__get_collection(self.status_collection_name)
+        with self.depend_status_condition:
+            for monitor_data in status_doc.get('modes', []):
+                monitor_statuses = component_monitors.get(monitor_data['monitorName'])
+                if not monitor_statuses:
+                    continue
 
-                # we look for the statuses of all dependency monitors that we are interested in
-                # and save them depending on the monitor type
-                for monitor_type, monitors in self.dependency_monitors.items():
-                    if monitor_type not in self.depend_statuses:
-                        self.depend_statuses[monitor_type] = {}
+                for statuses, monitor_specs in monitor_statuses:
+                    statuses[monitor_specs] = monitor_data['healthStatus']
+            self.depend_status_condition.notify_all()
+        self.stats.record_depend_status_update(time.time())
 
-                    for depend_comp, monitor_specs in monitors.items():
-                        if monitor_specs == MonitorConstants.NONE:
-                            continue
+        if self.process_depend_statuses_on_change:
+            transition = self.process_depend_statuses()
+            if transition is not None:
+                self.handle_depend_status_transition(transition)
 
-                        if depend_comp not in self.depend_statuses[monitor_type]:
-                            self.depend_statuses[monitor_type][depend_comp] = {}
+    def wait_for_depend_statuses(self, predicate, timeout=None):
+        '''Blocks until predicate(self.depend_statuses) returns True, the timeout
+        expires or the component is stopped. The predicate is evaluated
+        whenever the dependency statuses change. Returns the last
+        value of the predicate.
 
-                        component_name, monitor_name = monitor_specs.split('/')
-                        status_doc = collection.find_one({'component_id': component_name})
-                        for monitor_data in status_doc['modes']:
-                            if monitor_name != monitor_data['monitorName']:
-                                continue
+        Keyword arguments:
+        predicate: Callable[[dict], bool] -- condition on self.depend_statuses
+        timeout: float -- maximum waiting time in seconds (no timeout if None)
 
-                            self.depend_statuses[monitor_type][depend_comp][monitor_specs] = \
-                                monitor_data['healthStatus']
-                time.sleep(0.5)
-            except pm.errors.OperationFailure as exc:
-                print('[ftms_base, get_dependency_statuses] {0}'.format(exc))
+        '''
+        def is_satisfied():
+            if self.current_state == FTSMStates.STOPPED:
+                return True
+            try:
+                return predicate(self.depend_statuses)
+            except KeyError:
+                # the statuses that the predicate needs are not known yet
+                return False
 
-    def write_sm_state(self):
-        while self.current_state != FTSMStates.STOPPED:
+        with self.depend_status_condition:
+            self.depend_status_condition.wait_for(is_satisfied, timeout)
             try:
-                collection = self.__get_collection(self.sm_state_collection_name)
-                collection.replace_one({'component_name': self.name},
-                                       {'component_name': self.name,
-                                        'state': self.current_state},
-                                       upsert=True)
-                time.sleep(0.1)
-            except pm.errors.OperationFailure as exc:
-                print('[ftms_base, write_sm_state] {0}'.format(exc))
+                return bool(predicate(self.depend_statuses))
+            except KeyError:
+                return False
+
+    def wait_for_dependency(self, depend_comp,
+                            monitor_type=DependMonitorTypes.HEARTBEAT,
+                            timeout=None):
+        '''Blocks until all monitors of the given type for the dependency
+        "depend_comp" report a healthy status (i.e. a "status" that evaluates
+        to True), the timeout expires or the component is stopped.
+        Returns True if the dependency is healthy and False otherwise.
+
+        Keyword arguments:
+        depend_comp: str -- name of a component dependency
+        monitor_type: str -- monitor type (a DependMonitorTypes constant)
+        timeout: float -- maximum waiting time in seconds (no timeout if None)
+
+        '''
+        def is_healthy(depend_statuses):
+            monitor_statuses = depend_statuses[monitor_type][depend_comp]
+            return bool(monitor_statuses) and \
+                   all(status['status'] for status in monitor_statuses.values())
+        return self.wait_for_depend_statuses(is_healthy, timeout)
+
+    def write_sm_state(self):
+        '''Schedules a write of the current state of the state machine
+        to the robot store. The state is written automatically on
+        every state transition, so this only needs to be called
+        for forcing an update of the state document.
+        '''
+        if self.__monitoring_scheduler is None:
+            return
+
+        stats = None
+        if self.persist_stats:
+            stats = self.stats.to_dict(time.time())
+
+        if self.current_state == FTSMStates.STOPPED:
+            self.__monitoring_scheduler.update_state(self.name, self.current_state,
+                                                     self.state_transition_time,
+                                                     stats=stats)
+            self.__monitoring_scheduler.unregister_state(self.name)
+        else:
+            self.__monitoring_scheduler.update_state(self.name, self.current_state,
+                                                     self.state_transition_time,
+                                                     self.sm_state_heartbeat_interval,
+                                                     stats)
 
     def recover_from_possible_dead_rosmaster(self):
         '''For ROS components that have "roscore" listed as a **heartbeat** dependency,
@@ -212,13 +407,13 @@ class FTSMBase(FTSM):
 
         self.tear_down_ros()
         print('[{0}] Waiting for ROS master'.format(self.name))
-        while not master_available:
-            master_available = self.depend_statuses[DependMonitorTypes.HEARTBEAT]\
+        master_available = self.wait_for_depend_statuses(
+            lambda depend_statuses: depend_statuses[DependMonitorTypes.HEARTBEAT]\
                                                    ['roscore']\
                                                    ['ros/ros_master_monitor']\
-                                                   ['status']
-            time.sleep(0.1)
-        self.setup_ros()
+                                                   ['status'])
+        if master_available:
+            self.setup_ros()
 
     def shutdown_action_server(self, server):
         '''Stops the action server, and unregisters all its publishers and subscribers.
@@ -258,8 +453,8 @@ class FTSMBase(FTSM):
 
         '''
         try:
-            collection = self.__get_collection(self.component_collection_name)
-            component_doc = collection.find_one({'component_name': component_name})
+            spec_cache = ComponentSpecCache.get_cache(self.robot_store)
+            component_doc = spec_cache.get_spec(component_name)
 
             dependencies = component_doc['dependencies']
             return dependencies
@@ -281,24 +476,11 @@ class FTSMBase(FTSM):
 
         '''
         try:
-            collection = self.__get_collection(self.component_collection_name)
-            component_doc = collection.find_one({'component_name': component_name})
+            spec_cache = ComponentSpecCache.get_cache(self.robot_store)
+            component_doc = spec_cache.get_spec(component_name)
 
             dependency_monitors = component_doc['dependency_monitors']
             return dependency_monitors
         except pm.errors.OperationFailure as exc:
             print('[ftms_base] {0}'.format(exc))
             raise
-
-    def __get_collection(self, collection_name):
-        '''Returns a MongoDB collection with the given name
-        from the "self.db" database.
-
-        Keyword arguments:
-        collection_name: str -- name of a MongoDB collection
-
-        '''
-        client = pm.MongoClient(port=self.db_port)
-        db = client[self.db_name]
-        collection = db[collection_name]
-        return collection
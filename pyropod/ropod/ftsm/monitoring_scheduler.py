@@ -0,0 +1,161 @@
+import time
+import threading
+
+from ropod.ftsm.depend_status_watcher import DependStatusWatcher
+from ropod.ftsm.sm_state_writer import SMStateWriter
+
+
+class MonitoringScheduler(object):
+    '''Runs the dependency status updates and state persistence of all
+    FTSM components in the current process that use the same robot store
+    on a single thread. Components register their status callbacks
+    and state updates with the scheduler, which
+
+    * watches the statuses of all monitored components through one status
+      stream (or polls them with one query per polling period if the store
+      does not support status streams); each status is retrieved once,
+      even if several components monitor it
+    * writes state changes and heartbeat refreshes of all components
+      in bulk when they are due
+
+    A single scheduler is shared by all components that use
+    the same robot store (see MonitoringScheduler.get_scheduler).
+    '''
+    __schedulers = {}
+    __schedulers_lock = threading.Lock()
+
+    def __init__(self, robot_store, max_wait_time=0.1):
+        '''Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+        max_wait_time: float -- maximum time (in seconds) that the scheduler
+                                waits for status changes from a status stream;
+                                state writes are delayed by at most this time
+
+        '''
+        self.robot_store = robot_store
+        self.max_wait_time = max_wait_time
+        self.depend_status_watcher = DependStatusWatcher(robot_store,
+                                                         int(max_wait_time * 1000))
+        self.sm_state_writer = SMStateWriter(robot_store)
+
+        # polling periods requested by the registered components;
+        # the shortest one is used if statuses need to be polled
+        self.__poll_intervals = {}
+        self.__next_poll_time = 0.
+
+        # time of the last successful refresh (or poll) of the statuses, i.e. the
+        # time up to which the statuses are known to be up to date, even if none changed
+        self.last_status_refresh_time = None
+
+        self.__wakeup = threading.Event()
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    @classmethod
+    def get_scheduler(cls, robot_store):
+        '''Returns the scheduler for the given robot store, creating it
+        if it doesn't exist yet.
+
+        Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+
+        '''
+        with cls.__schedulers_lock:
+            if robot_store not in cls.__schedulers:
+                cls.__schedulers[robot_store] = MonitoringScheduler(robot_store)
+            return cls.__schedulers[robot_store]
+
+    def subscribe_statuses(self, component_ids, callback, poll_interval=0.5):
+        '''Subscribes the callback to the statuses of the given components.
+
+        Keyword arguments:
+        component_ids: list[str] -- component IDs
+        callback: Callable[[dict], None] -- called with every new or changed status document
+        poll_interval: float -- polling period (in seconds) used if
+                               status streams are not available
+
+        '''
+        with self.__lock:
+            self.__poll_intervals[callback] = poll_interval
+        self.depend_status_watcher.subscribe(component_ids, callback)
+        self.__wakeup.set()
+
+    def unsubscribe_statuses(self, callback):
+        '''Removes all status subscriptions of the given callback.
+        '''
+        with self.__lock:
+            self.__poll_intervals.pop(callback, None)
+        self.depend_status_watcher.unsubscribe(callback)
+
+    def update_state(self, component_name, state, transition_time,
+                     heartbeat_interval=None, stats=None):
+        '''Schedules a write of the state of the given component
+        (see SMStateWriter.update_state).
+        '''
+        self.sm_state_writer.update_state(component_name, state, transition_time,
+                                          heartbeat_interval, stats)
+        self.__wakeup.set()
+
+    def unregister_state(self, component_name):
+        '''Stops the heartbeat refreshes of the given component's state document.
+        '''
+        self.sm_state_writer.unregister(component_name)
+
+    def __run(self):
+        while True:
+            self.__wakeup.clear()
+
+            now = time.time()
+            next_write_time = self.sm_state_writer.next_write_time()
+            if next_write_time is not None and next_write_time <= now:
+                self.__dispatch(self.sm_state_writer.write_states, now)
+                next_write_time = self.sm_state_writer.next_write_time()
+
+            # with a status stream, the refresh blocks until
+            # a status changes or self.max_wait_time passes
+            refreshed = self.__dispatch(self.depend_status_watcher.refresh)
+            if self.depend_status_watcher.has_stream:
+                if refreshed:
+                    self.last_status_refresh_time = time.time()
+                else:
+                    # we don't retry a failing stream without waiting
+                    self.__wakeup.wait(self.max_wait_time)
+                continue
+
+            now = time.time()
+            with self.__lock:
+                poll_interval = None
+                if self.__poll_intervals:
+                    poll_interval = min(self.__poll_intervals.values())
+
+            wakeup_times = []
+            if poll_interval is not None:
+                if self.__next_poll_time <= now:
+                    if self.__dispatch(self.depend_status_watcher.poll):
+                        self.last_status_refresh_time = time.time()
+                    self.__next_poll_time = now + poll_interval
+                wakeup_times.append(self.__next_poll_time)
+
+            if next_write_time is not None:
+                wakeup_times.append(next_write_time)
+
+            # we sleep until the next write or poll is due
+            # or until new state updates or subscriptions arrive
+            timeout = None
+            if wakeup_times:
+                timeout = max(min(wakeup_times) - time.time(), 0.)
+            self.__wakeup.wait(timeout)
+
+    def __dispatch(self, function, *args):
+        '''Calls function with the given arguments and returns True if it succeeds.
+        Errors are printed instead of raised, since an error would otherwise stop
+        the thread that serves all components in the process.
+        '''
+        try:
+            function(*args)
+            return True
+        except Exception as exc:
+            print('[monitoring_scheduler] Error in {0}: {1!r}'.format(function.__name__, exc))
+            return False
@@ -0,0 +1,310 @@
+from abc import ABCMeta, abstractmethod
+import copy
+import queue
+import threading
+import pymongo as pm
+
+# only the fields of the status documents that are needed
+# for updating the dependency statuses are retrieved
+STATUS_PROJECTION = {'_id': 0,
+                     'component_id': 1,
+                     'modes.monitorName': 1,
+                     'modes.healthStatus': 1}
+
+
+class RobotStoreBase(metaclass=ABCMeta):
+    '''Interface of the robot store backends used by FTSMBase for reading
+    component specifications and statuses and for writing
+    the state machine states of the components.
+    '''
+    @abstractmethod
+    def get_component_spec(self, component_name):
+        '''Returns the specification document of the given component
+        (containing its "dependencies" and "dependency_monitors")
+        or None if the component has no specification.
+
+        Keyword arguments:
+        component_name: str -- name of a component
+
+        '''
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_component_specs(self):
+        '''Returns a list with the specification documents of all components.
+        '''
+        raise NotImplementedError()
+
+    def add_spec_listener(self, callback):
+        '''Registers a callback that is called with the name of a component
+        whenever the component's specification changes. Stores that cannot
+        notify about specification changes ignore the callback.
+
+        Keyword arguments:
+        callback: Callable[[str], None] -- specification change callback
+
+        '''
+        return None
+
+    @abstractmethod
+    def get_statuses(self, component_ids):
+        '''Returns a list with the status documents of the given components.
+
+        Keyword arguments:
+        component_ids: list[str] -- component IDs
+
+        '''
+        raise NotImplementedError()
+
+    def watch_statuses(self, component_ids, max_await_time_ms=500):
+        '''Returns a status stream (an object with "try_next" and "close" methods)
+        through which changes of the status documents of the given components
+        are received, or None if the store cannot notify about status changes.
+        "try_next" returns the next changed status document or None if no change
+        arrives within max_await_time_ms milliseconds.
+
+        Keyword arguments:
+        component_ids: list[str] -- component IDs
+        max_await_time_ms: int -- maximum time to wait for a change in "try_next"
+
+        '''
+        return None
+
+    @abstractmethod
+    def write_sm_states(self, state_docs):
+        '''Writes (upserts) the given state machine state documents,
+        each of which is identified by its "component_name".
+
+        Keyword arguments:
+        state_docs: list[dict] -- state documents
+
+        '''
+        raise NotImplementedError()
+
+
+class MongoRobotStore(RobotStoreBase):
+    '''Robot store backed by a MongoDB database. Stores should be obtained
+    through MongoRobotStore.get_store so that the components in a process
+    share a single client for the same database.
+    '''
+    __stores = {}
+    __stores_lock = threading.Lock()
+
+    def __init__(self, db_name='robot_store', db_port=27017,
+                 component_collection='components',
+                 status_collection='status',
+                 sm_state_collection='component_sm_states'):
+        self.db_name = db_name
+        self.db_port = db_port
+
+        self.client = pm.MongoClient(port=self.db_port)
+        db = self.client[self.db_name]
+        self.component_collection = db[component_collection]
+        self.status_collection = db[status_collection]
+        self.sm_state_collection = db[sm_state_collection]
+
+        self.__spec_listeners = []
+        self.__spec_thread = None
+        self.__spec_lock = threading.Lock()
+
+    @classmethod
+    def get_store(cls, *args, **kwargs):
+        '''Returns the store for the given database and collections
+        (see MongoRobotStore.__init__), creating it if it doesn't exist yet.
+        '''
+        key = (args, tuple(sorted(kwargs.items())))
+        with cls.__stores_lock:
+            if key not in cls.__stores:
+                cls.__stores[key] = MongoRobotStore(*args, **kwargs)
+            return cls.__stores[key]
+
+    def get_component_spec(self, component_name):
+        return self.component_collection.find_one({'component_name': component_name})
+
+    def get_component_specs(self):
+        return list(self.component_collection.find({}))
+
+    def add_spec_listener(self, callback):
+        '''Registers a specification change callback (see RobotStoreBase.add_spec_listener).
+        The listeners are notified by a thread that follows the component collection
+        through a change stream, which is started when the first listener is added;
+        no notifications are sent if change streams are not supported by the database.
+        '''
+        with self.__spec_lock:
+            self.__spec_listeners.append(callback)
+            if self.__spec_thread is None:
+                self.__spec_thread = threading.Thread(target=self.__watch_specs)
+                self.__spec_thread.daemon = True
+                self.__spec_thread.start()
+
+    def get_statuses(self, component_ids):
+        return list(self.status_collection.find({'component_id': {'$in': list(component_ids)}},
+                                                STATUS_PROJECTION))
+
+    def watch_statuses(self, component_ids, max_await_time_ms=500):
+        '''Returns a MongoStatusStream or None if change streams are not
+        supported by the database (they are only available on replica sets).
+        '''
+        pipeline = [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace']},
+                                'fullDocument.component_id': {'$in': list(component_ids)}}},
+                    {'$project': {'fullDocument.{0}'.format(field): 1
+                                  for field in STATUS_PROJECTION if field != '_id'}}]
+        try:
+            change_stream = self.status_collection.watch(pipeline, full_document='updateLookup',
+                                                         max_await_time_ms=max_await_time_ms)
+        except pm.errors.OperationFailure as exc:
+            print('[robot_store] Change streams not available: {0}'.format(exc))
+            return None
+        return MongoStatusStream(change_stream)
+
+    def write_sm_states(self, state_docs):
+        requests = [pm.ReplaceOne({'component_name': state_doc['component_name']},
+                                  state_doc, upsert=True)
+                    for state_doc in state_docs]
+        if requests:
+            self.sm_state_collection.bulk_write(requests, ordered=False)
+
+
+    def __watch_specs(self):
+        '''Calls the specification listeners with the name of every changed
+        component specification, or with None if the name is not known
+        (e.g. for deleted specifications, after which all specifications
+        should be considered outdated).
+        '''
+        try:
+            with self.component_collection.watch(full_document='updateLookup') as change_stream:
+                for change in change_stream:
+                    spec = change.get('fullDocument')
+                    component_name = spec.get('component_name') if spec else None
+                    with self.__spec_lock:
+                        spec_listeners = list(self.__spec_listeners)
+                    for callback in spec_listeners:
+                        callback(component_name)
+        except pm.errors.OperationFailure as exc:
+            print('[robot_store] Specification change streams not available: {0}'.format(exc))
+        except pm.errors.PyMongoError as exc:
+            print('[robot_store] {0}'.format(exc))
+
+
+class MongoStatusStream(object):
+    '''Status stream over a MongoDB change stream.
+    '''
+    def __init__(self, change_stream):
+        self.change_stream = change_stream
+
+    def try_next(self):
+        while self.change_stream.alive:
+            change = self.change_stream.try_next()
+            if change is None:
+                return None
+
+            status_doc = change.get('fullDocument')
+            if status_doc is not None:
+                return status_doc
+        return None
+
+    def close(self):
+        self.change_stream.close()
+
+
+class InMemoryRobotStore(RobotStoreBase):
+    '''Robot store that keeps all documents in memory, such that
+    components can be run, tested and benchmarked without a database.
+    Component specifications and statuses are set with "add_component_spec"
+    and "update_status"; status changes are pushed to all open status streams.
+    '''
+    def __init__(self):
+        self.component_specs = {}
+        self.statuses = {}
+        self.sm_states = {}
+
+        self.__streams = []
+        self.__spec_listeners = []
+        self.__lock = threading.Lock()
+
+    def add_component_spec(self, component_spec):
+        '''Adds (or replaces) the given component specification document,
+        which is identified by its "component_name", and notifies
+        the specification listeners about the change.
+        '''
+        component_name = component_spec['component_name']
+        with self.__lock:
+            self.component_specs[component_name] = copy.deepcopy(component_spec)
+            spec_listeners = list(self.__spec_listeners)
+
+        for callback in spec_listeners:
+            callback(component_name)
+
+    def add_spec_listener(self, callback):
+        with self.__lock:
+            self.__spec_listeners.append(callback)
+
+    def update_status(self, status_doc):
+        '''Sets the given status document, which is identified by its "component_id",
+        and notifies the status streams that watch the component about the change.
+        '''
+        status_doc = copy.deepcopy(status_doc)
+        with self.__lock:
+            self.statuses[status_doc['component_id']] = status_doc
+            for stream in self.__streams:
+                if status_doc['component_id'] in stream.component_ids:
+                    stream.put(status_doc)
+
+    def get_sm_state(self, component_name):
+        '''Returns the last written state document of the given component
+        or None if no state has been written for it.
+        '''
+        with self.__lock:
+            return self.sm_states.get(component_name)
+
+    def get_component_spec(self, component_name):
+        with self.__lock:
+            return copy.deepcopy(self.component_specs.get(component_name))
+
+    def get_component_specs(self):
+        with self.__lock:
+            return copy.deepcopy(list(self.component_specs.values()))
+
+    def get_statuses(self, component_ids):
+        with self.__lock:
+            return [copy.deepcopy(self.statuses[component_id])
+                    for component_id in component_ids
+                    if component_id in self.statuses]
+
+    def watch_statuses(self, component_ids, max_await_time_ms=500):
+        stream = InMemoryStatusStream(self, component_ids, max_await_time_ms)
+        with self.__lock:
+            self.__streams.append(stream)
+        return stream
+
+    def write_sm_states(self, state_docs):
+        with self.__lock:
+            for state_doc in state_docs:
+                self.sm_states[state_doc['component_name']] = dict(state_doc)
+
+    def remove_stream(self, stream):
+        with self.__lock:
+            if stream in self.__streams:
+                self.__streams.remove(stream)
+
+
+class InMemoryStatusStream(object):
+    '''Status stream of an InMemoryRobotStore.
+    '''
+    def __init__(self, store, component_ids, max_await_time_ms):
+        self.store = store
+        self.component_ids = set(component_ids)
+        self.timeout = max_await_time_ms / 1000.
+        self.__changes = queue.Queue()
+
+    def put(self, status_doc):
+        self.__changes.put(status_doc)
+
+    def try_next(self):
+        try:
+            return self.__changes.get(timeout=self.timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.store.remove_stream(self)
@@ -0,0 +1,375 @@
+'''Shared-memory table of the component monitor statuses for deployments in which
+the components run in separate processes. A single status collector process
+watches the statuses of all monitored components in the robot store and
+publishes them in the table; the components read their dependency statuses
+from the table (through a SharedMemoryRobotStore) instead of querying
+the robot store.
+
+The table has a fixed layout: a header followed by "num_slots" slots,
+each of which holds the health status of one monitor:
+
+header: magic (8s), layout version (I), number of slots (I), key size (I),
+        payload size (I), number of used slots (I), generation (Q)
+slot:   sequence number (Q), update time (d), payload length (I),
+        key (key size bytes; "component_id/monitor_name"),
+        payload (payload size bytes; JSON-encoded health status)
+
+Each slot is protected by a seqlock: the collector (the only writer) makes
+the slot's sequence number odd while writing the slot and even afterwards,
+and readers retry until they read the same even sequence number before and
+after copying the slot. The generation is incremented after every write,
+so readers can cheaply detect that something has changed.
+'''
+import argparse
+import json
+import struct
+import time
+import threading
+from multiprocessing import shared_memory, resource_tracker
+
+from ropod.ftsm.monitoring_scheduler import MonitoringScheduler
+from ropod.ftsm.robot_store import RobotStoreBase, MongoRobotStore
+from ropod.utils.delta import copy_document
+
+TABLE_MAGIC = b'RPSTATUS'
+TABLE_LAYOUT_VERSION = 1
+
+HEADER_FORMAT = struct.Struct('<8sIIIIIQ')
+NUM_USED_OFFSET = struct.calcsize('<8sIIII')
+GENERATION_OFFSET = struct.calcsize('<8sIIIII')
+
+SEQ_FORMAT = struct.Struct('<Q')
+
+# names of the tables created by the current process
+_created_tables = set()
+
+
+class SharedStatusTable(object):
+    '''Fixed-layout, seqlock-protected table of monitor statuses
+    in shared memory (see the module documentation for the layout).
+    Tables are created by the status collector with SharedStatusTable.create
+    and opened by the components with SharedStatusTable.attach.
+    '''
+    def __init__(self, shm, num_slots, key_size, payload_size):
+        self.shm = shm
+        self.buf = shm.buf
+        self.num_slots = num_slots
+        self.key_size = key_size
+        self.payload_size = payload_size
+
+        self.slot_body_format = struct.Struct('<dI{0}s{1}s'.format(key_size, payload_size))
+        self.slot_size = SEQ_FORMAT.size + self.slot_body_format.size
+
+        # slot indices of the monitor keys, indexed by key
+        self.__slots = {}
+        self.__num_indexed_slots = 0
+
+        # the last decoded contents of each slot, indexed by slot; the entries
+        # are (seq, key, health_status, update_time) tuples and are reused
+        # as long as the sequence number of the slot does not change
+        self.__decoded_slots = {}
+        self.__write_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, name, num_slots=256, key_size=128, payload_size=512):
+        '''Creates a new (empty) table in a shared memory block with the given name.
+
+        Keyword arguments:
+        name: str -- name of the shared memory block
+        num_slots: int -- maximum number of monitors in the table
+        key_size: int -- maximum length of a "component_id/monitor_name" key in bytes
+        payload_size: int -- maximum length of a JSON-encoded health status in bytes
+
+        '''
+        slot_size = SEQ_FORMAT.size + struct.calcsize('<dI{0}s{1}s'.format(key_size, payload_size))
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=HEADER_FORMAT.size + num_slots * slot_size)
+        shm.buf[:len(shm.buf)] = bytes(len(shm.buf))
+        HEADER_FORMAT.pack_into(shm.buf, 0, TABLE_MAGIC, TABLE_LAYOUT_VERSION,
+                                num_slots, key_size, payload_size, 0, 0)
+        _created_tables.add(name)
+        return cls(shm, num_slots, key_size, payload_size)
+
+    @classmethod
+    def attach(cls, name):
+        '''Opens an existing table with the given name.
+        Raises a FileNotFoundError if the table does not exist
+        and a ValueError if the shared memory block is not a status table.
+
+        Keyword arguments:
+        name: str -- name of the shared memory block
+
+        '''
+        shm = shared_memory.SharedMemory(name=name)
+
+        # the table is owned by the collector, so it should not be removed
+        # by the resource tracker when an attached process exits
+        if name not in _created_tables:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+
+        magic, version, num_slots, key_size, payload_size, _, _ = HEADER_FORMAT.unpack_from(shm.buf, 0)
+        if magic != TABLE_MAGIC or version != TABLE_LAYOUT_VERSION:
+            shm.close()
+            raise ValueError('{0} is not a status table with layout version {1}'
+                             .format(name, TABLE_LAYOUT_VERSION))
+        return cls(shm, num_slots, key_size, payload_size)
+
+    @property
+    def generation(self):
+        return SEQ_FORMAT.unpack_from(self.buf, GENERATION_OFFSET)[0]
+
+    @property
+    def num_used_slots(self):
+        return struct.unpack_from('<I', self.buf, NUM_USED_OFFSET)[0]
+
+    def write(self, component_id, monitor_name, health_status, update_time=None):
+        '''Writes the health status of the given monitor to the table,
+        adding the monitor to the table if it is not in it yet.
+        Raises a ValueError if the key or encoded status do not fit
+        in a slot or if the table is full.
+
+        Keyword arguments:
+        component_id: str -- ID of the monitored component
+        monitor_name: str -- name of the monitor
+        health_status: dict -- health status of the monitor
+        update_time: float -- time of the update in seconds since the epoch
+
+        '''
+        key = '{0}/{1}'.format(component_id, monitor_name).encode('utf-8')
+        payload = json.dumps(health_status).encode('utf-8')
+        if len(key) > self.key_size:
+            raise ValueError('Monitor key {0} is longer than {1} bytes'.format(key, self.key_size))
+        if len(payload) > self.payload_size:
+            raise ValueError('Status of {0} is longer than {1} bytes'.format(key, self.payload_size))
+        if update_time is None:
+            update_time = time.time()
+
+        with self.__write_lock:
+            slot = self.__get_slot(key)
+            if slot is None:
+                slot = self.num_used_slots
+                if slot >= self.num_slots:
+                    raise ValueError('The status table is full ({0} slots)'.format(self.num_slots))
+
+            offset = HEADER_FORMAT.size + slot * self.slot_size
+            seq = SEQ_FORMAT.unpack_from(self.buf, offset)[0]
+            SEQ_FORMAT.pack_into(self.buf, offset, seq + 1)
+            self.slot_body_format.pack_into(self.buf, offset + SEQ_FORMAT.size,
+                                            update_time, len(payload), key, payload)
+            SEQ_FORMAT.pack_into(self.buf, offset, seq + 2)
+
+            # new slots are only published once they are written
+            if slot == self.num_used_slots:
+                struct.pack_into('<I', self.buf, NUM_USED_OFFSET, slot + 1)
+            SEQ_FORMAT.pack_into(self.buf, GENERATION_OFFSET, self.generation + 1)
+
+    def read(self, component_id, monitor_name):
+        '''Returns a (health_status, update_time) tuple for the given monitor
+        or None if the monitor is not in the table; the health status
+        is a copy that can be modified by the caller.
+
+        Keyword arguments:
+        component_id: str -- ID of the monitored component
+        monitor_name: str -- name of the monitor
+
+        '''
+        key = '{0}/{1}'.format(component_id, monitor_name).encode('utf-8')
+        slot = self.__get_slot(key)
+        if slot is None:
+            return None
+        _, health_status, update_time = self.__read_slot(slot)
+        return copy_document(health_status), update_time
+
+    def read_all(self):
+        '''Returns a list of (component_id, monitor_name, health_status, update_time)
+        tuples with the statuses of all monitors in the table; the health
+        statuses are copies that can be modified by the caller.
+        '''
+        statuses = []
+        for slot in range(self.num_used_slots):
+            key, health_status, update_time = self.__read_slot(slot)
+            component_id, monitor_name = key.split('/', 1)
+            statuses.append((component_id, monitor_name, copy_document(health_status), update_time))
+        return statuses
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        '''Removes the table; should only be called by the table's creator.
+        '''
+        self.shm.unlink()
+
+    def __get_slot(self, key):
+        '''Returns the slot index of the given key or None if the key is not
+        in the table. The key index is updated only when new slots have been used.
+        '''
+        slot = self.__slots.get(key)
+        if slot is None and self.__num_indexed_slots < self.num_used_slots:
+            for new_slot in range(self.__num_indexed_slots, self.num_used_slots):
+                slot_key = self.__read_slot(new_slot)[0].encode('utf-8')
+                self.__slots[slot_key] = new_slot
+                self.__num_indexed_slots = new_slot + 1
+            slot = self.__slots.get(key)
+        return slot
+
+    def __read_slot(self, slot):
+        '''Returns a (key, health_status, update_time) tuple with
+        a consistent copy of the given slot's contents. The slot is only
+        decoded if it has changed since it was last read; otherwise,
+        the previously decoded contents (which must not be modified) are returned.
+        '''
+        offset = HEADER_FORMAT.size + slot * self.slot_size
+        while True:
+            seq_before = SEQ_FORMAT.unpack_from(self.buf, offset)[0]
+            if seq_before % 2:
+                continue
+
+            decoded_slot = self.__decoded_slots.get(slot)
+            if decoded_slot is not None and decoded_slot[0] == seq_before:
+                return decoded_slot[1:]
+
+            update_time, payload_length, key, payload = \
+                self.slot_body_format.unpack_from(self.buf, offset + SEQ_FORMAT.size)
+            seq_after = SEQ_FORMAT.unpack_from(self.buf, offset)[0]
+            if seq_before == seq_after:
+                break
+
+        key = key.rstrip(b'\0').decode('utf-8')
+        health_status = json.loads(payload[:payload_length].decode('utf-8'))
+        self.__decoded_slots[slot] = (seq_before, key, health_status, update_time)
+        return key, health_status, update_time
+
+
+class SharedMemoryRobotStore(RobotStoreBase):
+    '''Robot store that reads the component statuses from a SharedStatusTable
+    and delegates everything else (component specifications and state writes)
+    to another robot store. Stores should be obtained through
+    SharedMemoryRobotStore.get_store so that the components in a process
+    share a single store (and thus a single MonitoringScheduler and
+    ComponentSpecCache) for the same table.
+
+    The store does not provide status streams, since the collector cannot
+    notify the processes that read the table; the statuses are instead
+    polled with the components' polling period. Since a poll only reads
+    the table from local memory, short polling periods are cheap.
+    '''
+    __stores = {}
+    __stores_lock = threading.Lock()
+
+    def __init__(self, table, robot_store):
+        '''Keyword arguments:
+        table: SharedStatusTable -- status table
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- store used
+                     for the component specifications and state writes
+
+        '''
+        self.table = table
+        self.robot_store = robot_store
+
+    @classmethod
+    def get_store(cls, table_name, robot_store):
+        '''Returns the store for the status table with the given name and the given
+        backing robot store, attaching to the table if no such store exists yet.
+
+        Keyword arguments:
+        table_name: str -- name of the shared memory block of the status table
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- store used
+                     for the component specifications and state writes
+
+        '''
+        key = (table_name, robot_store)
+        with cls.__stores_lock:
+            if key not in cls.__stores:
+                cls.__stores[key] = SharedMemoryRobotStore(SharedStatusTable.attach(table_name),
+                                                           robot_store)
+            return cls.__stores[key]
+
+    def get_component_spec(self, component_name):
+        return self.robot_store.get_component_spec(component_name)
+
+    def get_component_specs(self):
+        return self.robot_store.get_component_specs()
+
+    def add_spec_listener(self, callback):
+        return self.robot_store.add_spec_listener(callback)
+
+    def get_statuses(self, component_ids):
+        component_ids = set(component_ids)
+        status_docs = {}
+        for component_id, monitor_name, health_status, _ in self.table.read_all():
+            if component_id not in component_ids:
+                continue
+
+            if component_id not in status_docs:
+                status_docs[component_id] = {'component_id': component_id, 'modes': []}
+            status_docs[component_id]['modes'].append({'monitorName': monitor_name,
+                                                       'healthStatus': health_status})
+        return list(status_docs.values())
+
+    def write_sm_states(self, state_docs):
+        self.robot_store.write_sm_states(state_docs)
+
+
+class StatusCollector(object):
+    '''Publishes the statuses of all monitors used by the components
+    in the robot store's specifications in a SharedStatusTable.
+    '''
+    def __init__(self, robot_store, table):
+        '''Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+        table: SharedStatusTable -- status table
+
+        '''
+        self.robot_store = robot_store
+        self.table = table
+
+    def start(self):
+        '''Starts watching the statuses of all monitored components; the statuses
+        are updated by the MonitoringScheduler of the robot store.
+        '''
+        component_ids = set()
+        for component_spec in self.robot_store.get_component_specs():
+            for monitors in component_spec.get('dependency_monitors', {}).values():
+                for monitor_specs in monitors.values():
+                    if '/' in monitor_specs:
+                        component_ids.add(monitor_specs.split('/')[0])
+
+        scheduler = MonitoringScheduler.get_scheduler(self.robot_store)
+        scheduler.subscribe_statuses(component_ids, self.__publish_status)
+
+    def __publish_status(self, status_doc):
+        update_time = time.time()
+        for monitor_data in status_doc.get('modes', []):
+            try:
+                self.table.write(status_doc['component_id'], monitor_data['monitorName'],
+                                 monitor_data['healthStatus'], update_time)
+            except ValueError as exc:
+                print('[status_collector] {0}'.format(exc))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publishes the component monitor statuses '
+                                                 'in a shared-memory status table')
+    parser.add_argument('--table-name', type=str, default='ropod_status_table')
+    parser.add_argument('--num-slots', type=int, default=256)
+    parser.add_argument('--db-name', type=str, default='robot_store')
+    parser.add_argument('--db-port', type=int, default=27017)
+    args = parser.parse_args()
+
+    table = SharedStatusTable.create(args.table_name, num_slots=args.num_slots)
+    collector = StatusCollector(MongoRobotStore.get_store(args.db_name, args.db_port), table)
+    collector.start()
+    try:
+        while True:
+            time.sleep(1.)
+    except (KeyboardInterrupt, SystemExit):
+        print('[status_collector] Exiting...')
+    finally:
+        table.close()
+        table.unlink()
+
+
+if __name__ == '__main__':
+    main()
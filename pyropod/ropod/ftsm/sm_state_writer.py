@@ -0,0 +1,138 @@
+import heapq
+import threading
+import pymongo as pm
+
+
+class SMStateWriter(object):
+    '''Persists the state machine states of the components running in
+    the current process. States are written when a component changes its state;
+    the state documents of all registered components are additionally refreshed
+    with a (low) per-component heartbeat rate. Writes that are pending at
+    the same time are coalesced into a single bulk write, such that only
+    the latest state of each component is written.
+
+    The writer does not run on its own; writes are performed whenever
+    "write_states" is called, which is done by the MonitoringScheduler.
+    '''
+    def __init__(self, robot_store):
+        '''Keyword arguments:
+        robot_store: ropod.ftsm.robot_store.RobotStoreBase -- robot store backend
+
+        '''
+        self.robot_store = robot_store
+
+        # state documents waiting to be written, indexed by component name
+        self.__pending_docs = {}
+
+        # the registered components, indexed by component name; the values
+        # are lists of the form [state_doc, heartbeat_interval, next_heartbeat_time]
+        self.__components = {}
+
+        # heap of (next_heartbeat_time, component_name) tuples; entries whose time
+        # does not match the component's next_heartbeat_time are outdated
+        self.__heartbeats = []
+
+        # time before which failed writes are not retried
+        self.__retry_time = 0.
+        self.retry_interval = 1.
+
+        self.__lock = threading.Lock()
+
+    def update_state(self, component_name, state, transition_time,
+                     heartbeat_interval=None, stats=None):
+        '''Schedules a write of the state of the given component. If heartbeat_interval
+        is given, the state document is also refreshed every heartbeat_interval seconds
+        until the component is unregistered; otherwise, the previously set
+        heartbeat interval of the component (if any) is kept.
+
+        Keyword arguments:
+        component_name: str -- name of the component
+        state: str -- current state of the component
+        transition_time: float -- time (in seconds since the epoch) at which
+                                  the component entered the state
+        heartbeat_interval: float -- state document refresh period in seconds
+        stats: dict -- optional component statistics that are written with the state
+
+        '''
+        state_doc = {'component_name': component_name,
+                     'state': state,
+                     'transition_time': transition_time}
+        if stats is not None:
+            state_doc['stats'] = stats
+        with self.__lock:
+            if component_name in self.__components:
+                component_data = self.__components[component_name]
+                component_data[0] = state_doc
+                if heartbeat_interval is not None:
+                    component_data[1] = heartbeat_interval
+            elif heartbeat_interval is not None:
+                self.__components[component_name] = [state_doc, heartbeat_interval, None]
+
+            self.__pending_docs[component_name] = state_doc
+
+    def unregister(self, component_name):
+        '''Stops the heartbeat refreshes of the given component's state document.
+        Writes that are already scheduled are still performed.
+
+        Keyword arguments:
+        component_name: str -- name of the component
+
+        '''
+        with self.__lock:
+            self.__components.pop(component_name, None)
+
+    def next_write_time(self):
+        '''Returns the time at which "write_states" should be called next
+        or None if nothing needs to be written.
+        '''
+        with self.__lock:
+            if self.__pending_docs:
+                return self.__retry_time
+
+            while self.__heartbeats:
+                heartbeat_time, component_name = self.__heartbeats[0]
+                component_data = self.__components.get(component_name)
+                if component_data is not None and component_data[2] == heartbeat_time:
+                    return heartbeat_time
+                heapq.heappop(self.__heartbeats)
+            return None
+
+    def write_states(self, now):
+        '''Writes all pending state documents and the documents of the components
+        whose heartbeat refresh is due in a single bulk write.
+
+        Keyword arguments:
+        now: float -- current time in seconds since the epoch
+
+        '''
+        with self.__lock:
+            while self.__heartbeats and self.__heartbeats[0][0] <= now:
+                heartbeat_time, component_name = heapq.heappop(self.__heartbeats)
+                component_data = self.__components.get(component_name)
+                if component_data is not None and component_data[2] == heartbeat_time:
+                    self.__pending_docs.setdefault(component_name, component_data[0])
+
+            state_docs = self.__pending_docs
+            self.__pending_docs = {}
+            for component_name in state_docs:
+                if component_name in self.__components:
+                    component_data = self.__components[component_name]
+                    component_data[2] = now + component_data[1]
+                    heapq.heappush(self.__heartbeats, (component_data[2], component_name))
+
+        if not state_docs:
+            return
+
+        try:
+            self.robot_store.write_sm_states([dict(state_doc, update_time=now)
+                                              for state_doc in state_docs.values()])
+            self.__retry_time = 0.
+        except pm.errors.PyMongoError as exc:
+            print('[sm_state_writer] {0}'.format(exc))
+
+            # we retry the failed writes unless there are newer
+            # states of the components that should be written instead
+            with self.__lock:
+                self.__retry_time = now + self.retry_interval
+                for component_name, state_doc in state_docs.items():
+                    self.__pending_docs.setdefault(component_name, state_doc)
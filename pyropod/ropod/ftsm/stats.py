@@ -0,0 +1,188 @@
+import bisect
+import threading
+
+# the names of the states of pyftsm.ftsm.FTSMStates used by the statistics
+RUNNING = 'running'
+RECOVERING = 'recovering'
+
+
+class DurationHistogram(object):
+    '''Histogram of durations (in seconds) with fixed bucket upper bounds;
+    durations above the last bound are counted in an overflow bucket.
+    '''
+    BUCKET_BOUNDS = (0.001, 0.01, 0.1, 0.5, 1., 5., 10., 30., 60., 300.)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.min = None
+        self.max = None
+        self.bucket_counts = [0] * (len(self.BUCKET_BOUNDS) + 1)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if self.min is None or duration < self.min:
+            self.min = duration
+        if self.max is None or duration > self.max:
+            self.max = duration
+        self.bucket_counts[bisect.bisect_left(self.BUCKET_BOUNDS, duration)] += 1
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def to_dict(self):
+        # the upper bound of the overflow bucket is None
+        buckets = [{'upper_bound': bound, 'count': count}
+                   for bound, count in zip(self.BUCKET_BOUNDS + (None,), self.bucket_counts)]
+        return {'count': self.count,
+                'total': self.total,
+                'mean': self.mean,
+                'min': self.min,
+                'max': self.max,
+                'buckets': buckets}
+
+
+class FTSMStats(object):
+    '''Transition statistics of a fault-tolerant state machine. Records
+
+    * the time spent in each state (in total and per visit, as a histogram)
+    * the number of transitions between each pair of states
+    * the number of recovery attempts (transitions to "recovering", including
+      repeated attempts from "recovering") and how often they exceeded
+      the maximum number of recovery attempts
+    * the recovery latency, i.e. the time between entering the "recovering"
+      state from another state and getting back to "running"
+    * the time between the last dependency status change and a transition
+      to "recovering" (an upper bound of the fault detection latency
+      for faults detected through dependency monitors)
+    * the staleness of the dependency statuses at the time of each transition,
+      i.e. the time since the statuses were last refreshed from the robot store
+      (whether or not they changed)
+
+    Keyword arguments:
+    max_recovery_attempts: int -- maximum number of consecutive recovery attempts
+    running_state: str -- name of the "running" state
+    recovering_state: str -- name of the "recovering" state
+
+    '''
+    def __init__(self, max_recovery_attempts=1, running_state=RUNNING, recovering_state=RECOVERING):
+        self.max_recovery_attempts = max_recovery_attempts
+        self.running_state = running_state
+        self.recovering_state = recovering_state
+
+        self.current_state = None
+        self.state_entry_time = None
+        self.time_in_state = {}
+        self.state_durations = {}
+        self.transition_counts = {}
+
+        self.recovery_attempts = 0
+        self.consecutive_recovery_attempts = 0
+        self.exceeded_recovery_attempts = 0
+        self.recovery_start_time = None
+        self.recovery_latencies = DurationHistogram()
+
+        self.depend_status_update_time = None
+        self.depend_status_to_recovery = DurationHistogram()
+        self.depend_status_staleness = DurationHistogram()
+
+        self.__lock = threading.Lock()
+
+    def record_transition(self, old_state, new_state, transition_time, depend_status_refresh_time=None):
+        '''Records a transition from old_state to new_state; a repeated recovery
+        attempt is recorded as a transition from "recovering" to "recovering".
+
+        Keyword arguments:
+        old_state: str -- previous state (None for the initial state)
+        new_state: str -- new state
+        transition_time: float -- time of the transition in seconds since the epoch
+        depend_status_refresh_time: float -- time at which the dependency statuses
+                                            were last refreshed (None if unknown)
+
+        '''
+        with self.__lock:
+            if old_state is not None and self.state_entry_time is not None:
+                duration = transition_time - self.state_entry_time
+                self.time_in_state[old_state] = self.time_in_state.get(old_state, 0.) + duration
+                if old_state not in self.state_durations:
+                    self.state_durations[old_state] = DurationHistogram()
+                self.state_durations[old_state].add(duration)
+
+                transition = (old_state, new_state)
+                self.transition_counts[transition] = self.transition_counts.get(transition, 0) + 1
+
+            self.current_state = new_state
+            self.state_entry_time = transition_time
+
+            if depend_status_refresh_time is not None:
+                self.depend_status_staleness.add(transition_time - depend_status_refresh_time)
+
+            if new_state == self.recovering_state:
+                self.recovery_attempts += 1
+                self.consecutive_recovery_attempts += 1
+                if self.consecutive_recovery_attempts > self.max_recovery_attempts:
+                    self.exceeded_recovery_attempts += 1
+
+                if self.recovery_start_time is None:
+                    self.recovery_start_time = transition_time
+                    if self.depend_status_update_time is not None:
+                        self.depend_status_to_recovery.add(transition_time -
+                                                           self.depend_status_update_time)
+            elif new_state == self.running_state:
+                if self.recovery_start_time is not None:
+                    self.recovery_latencies.add(transition_time - self.recovery_start_time)
+                self.recovery_start_time = None
+                self.consecutive_recovery_attempts = 0
+
+    def record_depend_status_update(self, update_time):
+        '''Records that the dependency statuses changed at the given time.
+        '''
+        with self.__lock:
+            self.depend_status_update_time = update_time
+
+    def get_time_in_state(self, state, now):
+        '''Returns the total time (in seconds) spent in the given state,
+        including the time spent in the state so far if it is the current state.
+
+        Keyword arguments:
+        state: str -- a state of the state machine
+        now: float -- current time in seconds since the epoch
+
+        '''
+        with self.__lock:
+            time_in_state = self.time_in_state.get(state, 0.)
+            if state == self.current_state and self.state_entry_time is not None:
+                time_in_state += now - self.state_entry_time
+            return time_in_state
+
+    def to_dict(self, now):
+        '''Returns a dictionary representation of the statistics.
+
+        Keyword arguments:
+        now: float -- current time in seconds since the epoch
+
+        '''
+        states = set(self.time_in_state.keys())
+        if self.current_state is not None:
+            states.add(self.current_state)
+        time_in_state = {state: self.get_time_in_state(state, now) for state in states}
+
+        with self.__lock:
+            return {'current_state': self.current_state,
+                    'state_entry_time': self.state_entry_time,
+                    'time_in_state': time_in_state,
+                    'state_durations': {state: histogram.to_dict()
+                                        for state, histogram in self.state_durations.items()},
+                    'transition_counts': {'{0}->{1}'.format(*transition): count
+                                          for transition, count in self.transition_counts.items()},
+                    'recovery_attempts': self.recovery_attempts,
+                    'consecutive_recovery_attempts': self.consecutive_recovery_attempts,
+                    'max_recovery_attempts': self.max_recovery_attempts,
+                    'exceeded_recovery_attempts': self.exceeded_recovery_attempts,
+                    'recovery_latencies': self.recovery_latencies.to_dict(),
+                    'depend_status_to_recovery': self.depend_status_to_recovery.to_dict(),
+                    'depend_status_staleness': self.depend_status_staleness.to_dict()}
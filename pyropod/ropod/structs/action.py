@@ -1,7 +1,23 @@
-from ropod.structs.area import Area, SubArea
+from ropod.structs.area import Area, SubArea, area_registry
+from ropod.structs.codec import Field, Interned, ListOf, struct_codec
 
 
+@struct_codec
 class Action(object):
+    __slots__ = ('id', 'type', 'areas', 'subareas', 'start_floor', 'goal_floor',
+                 'level', 'elevator_id', 'execution_status', 'eta')
+    # the ID is written as "_id" but read from "id"
+    FIELDS = (Field('id', key='_id', decode_key='id'),
+              Field('type'),
+              Field('start_floor'),
+              Field('goal_floor'),
+              Field('level'),
+              Field('elevator_id'),
+              Field('execution_status'),
+              Field('eta'),
+              Field('areas', type=ListOf(Interned(Area, area_registry.intern_area_dict))),
+              Field('subareas', type=ListOf(Interned(SubArea, area_registry.intern_sub_area_dict))))
+
     def __init__(self):
         self.id = ''
         self.type = ''
@@ -21,53 +37,3 @@ class Action(object):
         # pending, in progress, etc.
         self.execution_status = ''
         self.eta = -1.
-
-    def to_dict(self):
-        action_dict = dict()
-
-        action_dict['_id'] = self.id
-        action_dict["type"] = self.type
-        action_dict["start_floor"] = self.start_floor
-        action_dict["goal_floor"] = self.goal_floor
-        action_dict["level"] = self.level
-        action_dict["elevator_id"] = self.elevator_id
-        action_dict["execution_status"] = self.execution_status
-        action_dict["eta"] = self.eta
-
-        action_dict['areas'] = list()
-        for area in self.areas:
-            area_dict = area.to_dict()
-            action_dict['areas'].append(area_dict)
-
-        action_dict['subareas'] = list()
-        for subarea in self.subareas:
-            subarea_dict = subarea.to_dict()
-            action_dict['subareas'].append(subarea_dict)
-
-        return action_dict
-
-    @staticmethod
-    def from_dict(action_dict):
-        action = Action()
-
-        action.id = action_dict['id']
-        action.type = action_dict['type']
-
-        action.start_floor = action_dict['start_floor']
-        action.goal_floor = action_dict['goal_floor']
-
-        action.level = action_dict['level']
-        action.elevator_id = action_dict['elevator_id']
-
-        action.execution_status = action_dict['execution_status']
-        action.eta = action_dict['eta']
-
-        for area_dict in action_dict['areas']:
-            area = Area.from_dict(area_dict)
-            action.areas.append(area)
-
-        for subarea_dict in action_dict['subareas']:
-            subarea = SubArea.from_dict(subarea_dict)
-            action.subareas.append(subarea)
-
-        return action
@@ -1,36 +1,40 @@
+import threading
+import weakref
+
+from ropod.structs.codec import Field, ListOf, struct_codec
+from ropod.utils.delta import copy_document
 from ropod.utils.timestamp import TimeStamp
 
 
+@struct_codec
 class SubArea(object):
+    __slots__ = ('id', 'name', 'type', 'capacity')
+    FIELDS = (Field('name'),
+              Field('id'),
+              Field('type', optional=True, omit_empty=True),
+              Field('capacity', optional=True, omit_empty=True))
+
     def __init__(self):
         self.id = None
         self.name = None
         self.type = None
         self.capacity = None
 
-    def to_dict(self):
-        sub_area_dict = dict()
-        sub_area_dict['name'] = self.name
-        sub_area_dict['id'] = self.id
-        if self.type:
-            sub_area_dict['type'] = self.type
-
-        if self.capacity:
-            sub_area_dict['capacity'] = self.capacity
-
-        return sub_area_dict
-
-    @staticmethod
-    def from_dict(sub_area_dict):
-        sub_area = SubArea()
-        sub_area.name = sub_area_dict['name']
-        sub_area.id = sub_area_dict['id']
-        sub_area.type = sub_area_dict.get('type')
-        sub_area.capacity = sub_area_dict.get('capacity')
-        return sub_area
-
 
+@struct_codec
 class SubAreaReservation(object):
+    __slots__ = ('start_time', 'end_time', 'sub_area_id', 'task_id', 'robot_id',
+                 'reservation_start_time', 'reservation_end_time', 'status', 'required_capacity')
+    FIELDS = (Field('sub_area_id', key='subAreaId'),
+              Field('task_id', key='taskId'),
+              Field('robot_id', key='robotId'),
+              Field('start_time', key='startTime', type=TimeStamp),
+              Field('end_time', key='endTime', type=TimeStamp),
+              Field('status'),
+              Field('required_capacity', key='requiredCapacity'),
+              Field('reservation_start_time', default='', encode=False, decode=False),
+              Field('reservation_end_time', default='', encode=False, decode=False))
+
     def __init__(self):
         self.start_time = None
         self.end_time = None
@@ -42,29 +46,6 @@ class SubAreaReservation(object):
         self.status = 'unknown'    # unknown or scheduled or cancelled
         self.required_capacity = -1
 
-    def to_dict(self):
-        sub_area_reservation_dict = dict()
-        sub_area_reservation_dict['subAreaId'] = self.sub_area_id
-        sub_area_reservation_dict['taskId'] = self.task_id
-        sub_area_reservation_dict['robotId'] = self.robot_id
-        sub_area_reservation_dict['startTime'] = self.start_time.to_str()
-        sub_area_reservation_dict['endTime'] = self.end_time.to_str()
-        sub_area_reservation_dict['status'] = self.status
-        sub_area_reservation_dict['requiredCapacity'] = self.required_capacity
-        return sub_area_reservation_dict
-
-    @staticmethod
-    def from_dict(sub_area_reservation_dict):
-        sub_area_reservation = SubAreaReservation()
-        sub_area_reservation.sub_area_id = sub_area_reservation_dict['subAreaId']
-        sub_area_reservation.task_id = sub_area_reservation_dict['taskId']
-        sub_area_reservation.robot_id = sub_area_reservation_dict['robotId']
-        sub_area_reservation.start_time = TimeStamp.from_str(sub_area_reservation_dict['startTime'])
-        sub_area_reservation.end_time = TimeStamp.from_str(sub_area_reservation_dict['endTime'])
-        sub_area_reservation.status = sub_area_reservation_dict['status']
-        sub_area_reservation.required_capacity = sub_area_reservation_dict['requiredCapacity']
-        return sub_area_reservation
-
     def __repr__(self):
         return "<SubArea id:%(sub_area_id)s Robot id:%(robot_id)s Task id:%(task_id)s Start time:,\
          %(start_time)s End time:%(end_time)s Status:%(status)s>"%{
@@ -73,7 +54,17 @@ class SubAreaReservation(object):
          }
 
 
+@struct_codec
 class Area(object):
+    __slots__ = ('id', 'name', 'sub_areas', 'floor_number', 'type')
+    # floor_number and sub_areas are written in snake case but read in camel case
+    FIELDS = (Field('id'),
+              Field('name'),
+              Field('floor_number', optional=True, omit_empty=True, decode_key='floorNumber'),
+              Field('type', optional=True, omit_empty=True),
+              Field('sub_areas', key='subareas', type=ListOf(SubArea), optional=True,
+                    omit_empty=True, decode_key='subAreas', default=list))
+
     def __init__(self):
         self.id = None
         self.name = None
@@ -81,31 +72,185 @@ class Area(object):
         self.floor_number = None
         self.type = None
 
-    def to_dict(self):
-        area_dict = dict()
-        area_dict['id'] = self.id
-        area_dict['name'] = self.name
 
-        if self.floor_number:
-            area_dict['floor_number'] = self.floor_number
+class _Frozen(object):
+    """Base of the immutable Area and SubArea instances shared through an AreaRegistry;
+    their equality and hash are based on their values
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise Exception("Interned {0} objects cannot be modified; "
+                        "use thaw() to get a modifiable copy".format(self.BASE.__name__))
+
+    def __delattr__(self, name):
+        raise Exception("Interned {0} objects cannot be modified".format(self.BASE.__name__))
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.values() == other.values()
+
+    def __hash__(self):
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return _make_frozen, (type(self), self.values())
+
+    def values(self):
+        """Returns the attribute values in the order of the slots"""
+        return tuple(getattr(self, name) for name in self.BASE.__slots__)
+
+
+def _make_frozen(cls, values):
+    obj = cls.__new__(cls)
+    for name, value in zip(cls.BASE.__slots__, values):
+        object.__setattr__(obj, name, value)
+    object.__setattr__(obj, '_hash', hash(values))
+    return obj
+
 
-        if self.type:
-            area_dict['type'] = self.type
+class FrozenSubArea(_Frozen, SubArea):
+    """Immutable SubArea shared through an AreaRegistry"""
+    __slots__ = ('_hash', '__weakref__')
+    BASE = SubArea
+
+    def thaw(self):
+        """Returns a modifiable SubArea with the same values"""
+        sub_area = SubArea()
+        sub_area.id = self.id
+        sub_area.name = self.name
+        sub_area.type = self.type
+        sub_area.capacity = self.capacity
+        return sub_area
 
-        if self.sub_areas:
-            area_dict['subareas'] = list()
-            for sub_area in self.sub_areas:
-                area_dict['subareas'].append(sub_area.to_dict())
-        return area_dict
 
-    @staticmethod
-    def from_dict(area_dict):
+class FrozenArea(_Frozen, Area):
+    """Immutable Area shared through an AreaRegistry; its sub-areas are a tuple of FrozenSubAreas"""
+    __slots__ = ('_hash', '__weakref__')
+    BASE = Area
+
+    def thaw(self):
+        """Returns a modifiable Area (with modifiable sub-areas) with the same values"""
         area = Area()
-        area.id = area_dict['id']
-        area.name = area_dict['name']
-        area.floor_number = area_dict.get('floorNumber')
-        area.type = area_dict.get('type')
-        for sub_areas_dict in area_dict.get('subAreas', list()):
-            sub_area = SubArea.from_dict(sub_areas_dict)
-            area.sub_areas.append(sub_area)
+        area.id = self.id
+        area.name = self.name
+        area.sub_areas = [sub_area.thaw() for sub_area in self.sub_areas]
+        area.floor_number = self.floor_number
+        area.type = self.type
         return area
+
+
+class AreaRegistry(object):
+    """Interning registry of areas and sub-areas: each distinct area (or sub-area)
+    is represented by a single immutable FrozenArea (FrozenSubArea) instance, which
+    is shared by all structs referring to it. Since the shared instances are
+    hashable, they can also be used as keys of area-based caches.
+
+    Areas are interned by their values rather than by their IDs only, such that
+    an area whose values change (e.g. the capacity of a sub-area) results in a new
+    instance; get returns the last interned area with a given ID (areas without
+    an ID, such as the areas of task requests, are not indexed by their ID).
+    Up to MAX_DICTS_PER_AREA distinct dictionaries of each area are kept as well,
+    so that an area that is received again is found by comparing the dictionaries.
+
+    The registry only holds weak references to the interned instances, so areas
+    that are no longer referred to by any struct are removed from it. The registry
+    can be used from several threads.
+    """
+    MAX_DICTS_PER_AREA = 4
+
+    def __init__(self):
+        self.__areas = weakref.WeakValueDictionary()
+        self.__sub_areas = weakref.WeakValueDictionary()
+        self.__areas_by_id = weakref.WeakValueDictionary()
+        self.__area_dicts = weakref.WeakKeyDictionary()
+        self.__lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.__areas)
+
+    def get(self, area_id):
+        """Returns the last interned area with the given ID or None"""
+        if area_id is None:
+            return None
+        return self.__areas_by_id.get(area_id)
+
+    def intern_area_dict(self, area_dict):
+        """Returns the shared area for a dictionary in the format read by Area.from_dict"""
+        area_id = area_dict['id']
+        with self.__lock:
+            area = self.__areas_by_id.get(area_id) if area_id is not None else None
+            if area is not None:
+                area_dicts = self.__area_dicts.get(area)
+                if area_dicts is not None:
+                    for known_dict in area_dicts:
+                        if known_dict == area_dict:
+                            return area
+
+            sub_area_dicts = area_dict.get('subAreas')
+            if sub_area_dicts:
+                sub_areas = tuple([self.intern_sub_area_dict(sub_area_dict) for sub_area_dict in sub_area_dicts])
+            else:
+                sub_areas = ()
+            area = self.__intern_area((area_id, area_dict['name'], sub_areas,
+                                       area_dict.get('floorNumber'), area_dict.get('type')))
+            if area_id is not None:
+                area_dicts = self.__area_dicts.get(area)
+                if area_dicts is None:
+                    area_dicts = self.__area_dicts[area] = list()
+                if len(area_dicts) < self.MAX_DICTS_PER_AREA:
+                    area_dicts.append(copy_document(area_dict))
+            return area
+
+    def intern_sub_area_dict(self, sub_area_dict):
+        """Returns the shared sub-area for a dictionary in the format read by SubArea.from_dict"""
+        return self.__intern_sub_area((sub_area_dict['id'], sub_area_dict['name'],
+                                       sub_area_dict.get('type'), sub_area_dict.get('capacity')))
+
+    def intern(self, area):
+        """Returns the shared area with the values of the given Area"""
+        if isinstance(area, FrozenArea):
+            return self.__intern_area(area.values())
+        sub_areas = tuple([self.intern_sub_area(sub_area) for sub_area in area.sub_areas])
+        return self.__intern_area((area.id, area.name, sub_areas, area.floor_number, area.type))
+
+    def intern_sub_area(self, sub_area):
+        """Returns the shared sub-area with the values of the given SubArea"""
+        return self.__intern_sub_area((sub_area.id, sub_area.name, sub_area.type, sub_area.capacity))
+
+    def clear(self):
+        """Removes all interned areas and sub-areas (the instances remain valid)"""
+        with self.__lock:
+            self.__areas.clear()
+            self.__sub_areas.clear()
+            self.__areas_by_id.clear()
+            self.__area_dicts.clear()
+
+    def __intern_area(self, values):
+        with self.__lock:
+            area = self.__areas.get(values)
+            if area is None:
+                area = self.__areas[values] = _make_frozen(FrozenArea, values)
+                if area.id is not None:
+                    self.__areas_by_id[area.id] = area
+            return area
+
+    def __intern_sub_area(self, values):
+        with self.__lock:
+            sub_area = self.__sub_areas.get(values)
+            if sub_area is None:
+                sub_area = self.__sub_areas[values] = _make_frozen(FrozenSubArea, values)
+            return sub_area
+
+
+# registry through which Task, TaskRequest and Action resolve their areas
+area_registry = AreaRegistry()
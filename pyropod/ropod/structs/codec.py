@@ -0,0 +1,297 @@
+"""Declarative field specifications and generated dictionary codecs for the structs.
+
+A struct lists its fields in a FIELDS tuple and is decorated with struct_codec,
+which generates specialised encode (to_dict) and decode (from_dict) functions
+from the field specifications once, when the struct's module is imported.
+The wire names and conversions of all fields are resolved at generation time,
+so that encoding and decoding only read and write attributes and keys.
+
+Example:
+
+    @struct_codec
+    class SubArea(object):
+        __slots__ = ('id', 'name')
+        FIELDS = (Field('id'), Field('name'))
+
+A subclass of a struct decorated with lazy_struct_codec decodes the fields
+listed in its LAZY_FIELDS only when they are first accessed.
+"""
+import copy
+import datetime
+
+from ropod.utils.timestamp import TimeStamp
+
+# marker for a wire value that is converted to/from a timedelta in minutes
+MINUTES = 'minutes'
+
+# marker for a wire value that is (shallow) copied when encoding
+COPY = 'copy'
+
+
+class ListOf(object):
+    """Field type of a list whose items have the given type"""
+    def __init__(self, item_type):
+        self.item_type = item_type
+
+
+class DictOf(object):
+    """Field type of a dictionary whose values have the given type"""
+    def __init__(self, value_type):
+        self.value_type = value_type
+
+
+class Interned(object):
+    """Field type of a struct whose decoded instances are shared between the structs
+    referring to them; intern is a function returning the instance for a dictionary
+    """
+    def __init__(self, struct_type, intern):
+        self.struct_type = struct_type
+        self.intern = intern
+
+
+class Field(object):
+    """Specification of a struct field
+
+    Args:
+        name (str): name of the struct attribute
+        key (str): key of the field in the dictionary; defaults to the attribute name
+        type: None for values that are used as they are, COPY, MINUTES, TimeStamp,
+              a struct class, an Interned struct class, or a ListOf/DictOf of these
+        optional (bool): whether the field may be missing in the dictionary; missing
+                         and empty values are decoded as the default and empty values
+                         are encoded without conversion
+        omit_empty (bool): whether the key is left out of the dictionary if the value is empty
+        decode_key (str): key from which the field is decoded if it differs from the encoded key
+        default: value (or factory, if callable) of the attribute if the field is
+                 not decoded or is optional and missing in the dictionary
+        encode (bool): whether the field is written to the dictionary
+        decode (bool): whether the field is read from the dictionary
+    """
+    def __init__(self, name, key=None, type=None, optional=False, omit_empty=False,
+                 decode_key=None, default=None, encode=True, decode=True):
+        self.name = name
+        self.key = key if key is not None else name
+        self.type = type
+        self.optional = optional
+        self.omit_empty = omit_empty
+        self.decode_key = decode_key if decode_key is not None else self.key
+        self.default = default
+        self.encode = encode
+        self.decode = decode
+
+
+class StructCodec(object):
+    """Encoder and decoder of a struct class generated from its field specifications
+
+    Attributes:
+        encode: function that returns the dictionary representation of a struct instance
+        decode: function that creates a struct instance from its dictionary representation
+        attributes: dictionary mapping the keys and attribute names of the encoded
+                    fields to the attribute names
+    """
+    def __init__(self, cls, fields):
+        field_names = set(field.name for field in fields)
+        missing = [name for name in cls.__slots__ if name not in field_names]
+        if missing:
+            raise ValueError('No field specification for {0}.{1}'.format(cls.__name__,
+                                                                          ', '.join(missing)))
+
+        self.cls = cls
+        self.fields = tuple(fields)
+        self.attributes = dict()
+        for field in self.fields:
+            if field.encode:
+                self.attributes[field.key] = field.name
+                self.attributes[field.name] = field.name
+
+        self.__namespace = {'copy': copy, 'timedelta': datetime.timedelta, 'cls': cls}
+        self.__num_globals = 0
+        self.encode = self.__generate('encode', self.__encode_lines())
+        self.decode = self.__generate('decode', self.__decode_lines())
+
+    def __generate(self, name, lines):
+        source = '\n'.join(lines)
+        exec(compile(source, '<{0} {1}>'.format(self.cls.__name__, name), 'exec'), self.__namespace)
+        return self.__namespace.pop(name)
+
+    def __add_global(self, prefix, value):
+        name = '_{0}{1}'.format(prefix, self.__num_globals)
+        self.__num_globals += 1
+        self.__namespace[name] = value
+        return name
+
+    def __encode_expression(self, field_type, value, depth=0):
+        if field_type is None:
+            return value
+        if field_type == COPY:
+            return 'copy.copy({0})'.format(value)
+        if field_type == MINUTES:
+            return '({0}.total_seconds() / 60 if isinstance({0}, timedelta) else {0})'.format(value)
+        if field_type is TimeStamp:
+            return '{0}.to_str()'.format(value)
+        if isinstance(field_type, ListOf):
+            item = 'x{0}'.format(depth)
+            return '[{0} for {1} in {2}]'.format(
+                self.__encode_expression(field_type.item_type, item, depth + 1), item, value)
+        if isinstance(field_type, DictOf):
+            item = 'x{0}'.format(depth)
+            return '{{k{0}: {1} for k{0}, {2} in {3}.items()}}'.format(
+                depth, self.__encode_expression(field_type.value_type, item, depth + 1), item, value)
+        if isinstance(field_type, Interned):
+            return self.__encode_expression(field_type.struct_type, value, depth)
+        return '{0}({1})'.format(self.__add_global('encode', field_type.CODEC.encode), value)
+
+    def __decode_expression(self, field_type, value, depth=0):
+        if field_type in (None, COPY):
+            return value
+        if field_type == MINUTES:
+            return 'timedelta(minutes={0})'.format(value)
+        if field_type is TimeStamp:
+            return '{0}({1})'.format(self.__add_global('from_str', TimeStamp.from_str), value)
+        if isinstance(field_type, ListOf):
+            item = 'x{0}'.format(depth)
+            return '[{0} for {1} in {2}]'.format(
+                self.__decode_expression(field_type.item_type, item, depth + 1), item, value)
+        if isinstance(field_type, DictOf):
+            item = 'x{0}'.format(depth)
+            return '{{k{0}: {1} for k{0}, {2} in {3}.items()}}'.format(
+                depth, self.__decode_expression(field_type.value_type, item, depth + 1), item, value)
+        if isinstance(field_type, Interned):
+            return '{0}({1})'.format(self.__add_global('intern', field_type.intern), value)
+        return '{0}({1})'.format(self.__add_global('decode', field_type.CODEC.decode), value)
+
+    def __default_expression(self, field):
+        if callable(field.default):
+            return '{0}()'.format(self.__add_global('default', field.default))
+        return self.__add_global('default', field.default)
+
+    def __encode_lines(self):
+        # fields whose value is converted by an expression that reads
+        # the attribute once are put in a dictionary display; once a field needs
+        # a statement, the remaining fields are assigned in order to preserve the key order
+        items = []
+        statements = []
+        for field in self.fields:
+            if not field.encode:
+                continue
+
+            attribute = 'obj.{0}'.format(field.name)
+            expression = self.__encode_expression(field.type, attribute)
+            if not field.omit_empty and \
+                    (expression == attribute or (not field.optional and expression.count(attribute) == 1)):
+                if statements:
+                    statements.append('    d[{0!r}] = {1}'.format(field.key, expression))
+                else:
+                    items.append('{0!r}: {1}'.format(field.key, expression))
+                continue
+
+            expression = self.__encode_expression(field.type, 'v')
+            if field.optional and expression != 'v':
+                expression = '{0} if v else v'.format(expression)
+
+            statements.append('    v = {0}'.format(attribute))
+            if field.omit_empty:
+                statements.append('    if v:')
+                statements.append('        d[{0!r}] = {1}'.format(field.key, expression))
+            else:
+                statements.append('    d[{0!r}] = {1}'.format(field.key, expression))
+
+        lines = ['def encode(obj):']
+        if not statements:
+            lines.append('    return {{{0}}}'.format(', '.join(items)))
+            return lines
+
+        lines.append('    d = {{{0}}}'.format(', '.join(items)))
+        lines.extend(statements)
+        lines.append('    return d')
+        return lines
+
+    def __decode_lines(self, cls_name='cls', lazy_names=()):
+        lines = ['def decode(d):', '    obj = {0}.__new__({0})'.format(cls_name)]
+        if lazy_names:
+            lines.append('    obj._dict = d')
+        for field in self.fields:
+            if field.name not in lazy_names:
+                lines.extend(self.__decode_field_lines(field))
+        lines.append('    return obj')
+        return lines
+
+    def __decode_field_lines(self, field):
+        """Returns the lines that decode the given field from the dictionary d into obj"""
+        if not field.decode:
+            return ['    obj.{0} = {1}'.format(field.name, self.__default_expression(field))]
+
+        if not field.optional:
+            value = 'd[{0!r}]'.format(field.decode_key)
+            expression = self.__decode_expression(field.type, value)
+            if expression.count(value) == 1:
+                return ['    obj.{0} = {1}'.format(field.name, expression)]
+            return ['    v = {0}'.format(value),
+                    '    obj.{0} = {1}'.format(field.name, self.__decode_expression(field.type, 'v'))]
+
+        expression = self.__decode_expression(field.type, 'v')
+        if expression == 'v' and field.default is None:
+            return ['    obj.{0} = d.get({1!r})'.format(field.name, field.decode_key)]
+        if expression == 'v':
+            return ['    v = d.get({0!r})'.format(field.decode_key),
+                    '    obj.{0} = {1} if v is None else v'.format(field.name,
+                                                                  self.__default_expression(field))]
+        return ['    v = d.get({0!r})'.format(field.decode_key),
+                '    obj.{0} = {1} if v else ({2} if v is None else v)'.format(
+                    field.name, expression, self.__default_expression(field))]
+
+    def lazy_decoders(self, lazy_cls, lazy_names):
+        """Generates the decoders of a lazy subclass of the struct (see lazy_struct_codec)
+
+        Returns: decode, a function creating a lazy_cls instance that only decodes
+                 the fields that are not in lazy_names, and a dictionary mapping each
+                 name in lazy_names to a function decode_field(d, obj) decoding the field
+        """
+        cls_name = self.__add_global('cls', lazy_cls)
+        decode = self.__generate('decode', self.__decode_lines(cls_name, lazy_names))
+
+        field_decoders = dict()
+        for field in self.fields:
+            if field.name in lazy_names:
+                lines = ['def decode_field(d, obj):'] + self.__decode_field_lines(field)
+                field_decoders[field.name] = self.__generate('decode_field', lines)
+        return decode, field_decoders
+
+
+def struct_codec(cls):
+    """Class decorator that generates the codec of a struct from its FIELDS
+    and adds it to the class as CODEC, together with the methods
+    to_dict (encoding an instance) and from_dict (a static method decoding an instance)
+    """
+    cls.CODEC = StructCodec(cls, cls.FIELDS)
+    cls.to_dict = cls.CODEC.encode
+    cls.from_dict = staticmethod(cls.CODEC.decode)
+    return cls
+
+
+def lazy_struct_codec(cls):
+    """Class decorator for a subclass of a struct whose from_dict only decodes the fields
+    that are not listed in the subclass's LAZY_FIELDS. The subclass keeps the dictionary
+    in its _dict slot and leaves the slots of the lazy fields unset; a lazy field is
+    decoded (once) by __getattr__ when it is first accessed, after which it is read
+    from its slot like any other attribute.
+    Since the dictionary is read later, it must not be modified after from_dict.
+    """
+    base = cls.__mro__[1]
+    unknown = [name for name in cls.LAZY_FIELDS if name not in base.__slots__]
+    if unknown:
+        raise ValueError('No field specification for {0}.{1}'.format(base.__name__, ', '.join(unknown)))
+
+    decode, field_decoders = base.CODEC.lazy_decoders(cls, cls.LAZY_FIELDS)
+
+    # only called for the slots that are not set yet
+    def __getattr__(obj, name):
+        decode_field = field_decoders.get(name)
+        if decode_field is None:
+            raise AttributeError("'{0}' object has no attribute '{1}'".format(cls.__name__, name))
+        decode_field(obj._dict, obj)
+        return object.__getattribute__(obj, name)
+
+    cls.__getattr__ = __getattr__
+    cls.from_dict = staticmethod(decode)
+    return cls
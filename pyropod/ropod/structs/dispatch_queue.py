@@ -0,0 +1,176 @@
+import heapq
+import itertools
+import threading
+import time
+
+from ropod.utils.timestamp import TimeStamp
+
+
+class DispatchQueue(object):
+    """Queue of the tasks that have to be dispatched, ordered by their start times.
+
+    The queue is a binary heap of (start time, priority) entries, so that the tasks
+    that are due at a given time are popped in O(k log n) time instead of asking
+    every task whether it is executable (see Task.is_executable). A task is due once
+    its start time (or its earliest start time if it has no start time yet) is before
+    the current time. The tasks that are due at the same time are returned ordered by
+    their priority (see TaskPriority), such that emergency tasks come first.
+
+    Changing the start time or priority of a queued task (e.g. with postpone) replaces
+    its heap entry; the replaced entry is invalidated and skipped when it reaches the
+    top of the heap. wait_for_due_tasks blocks until the next task is due or the queue
+    changes, so that a dispatcher does not need to poll the queue.
+
+    The start times of the queued tasks must either all have a time zone or all be
+    wall-clock times (the time zone of the first task is kept as the tz of the queue),
+    since the heap compares their nanoseconds.
+    """
+    def __init__(self, tasks=None):
+        self.tz = None
+        self.__tz_set = False
+        self.__heap = list()
+        self.__entries = dict()
+        self.__tasks = dict()
+        self.__counter = itertools.count()
+        self.__condition = threading.Condition()
+
+        for task in tasks or list():
+            self.add(task)
+
+    def __len__(self):
+        return len(self.__tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self.__tasks
+
+    def add(self, task):
+        """Adds a task to the queue or updates its position if it is queued already"""
+        start_time = task.start_time
+        if not isinstance(start_time, TimeStamp):
+            start_time = task.earliest_start_time
+
+        with self.__condition:
+            if not self.__tz_set:
+                self.tz = start_time.tz
+                self.__tz_set = True
+            else:
+                self.__check_tz(start_time)
+            self.__invalidate(task.id)
+            # entries are lists, so that they can be invalidated in place
+            entry = [start_time.ns, task.priority, next(self.__counter), task.id]
+            self.__entries[task.id] = entry
+            self.__tasks[task.id] = task
+            heapq.heappush(self.__heap, entry)
+            self.__condition.notify_all()
+
+    def update(self, task):
+        """Updates the position of a queued task after its start time or priority has changed"""
+        self.add(task)
+
+    def remove(self, task_id):
+        """Removes a task from the queue and returns it (None if it is not queued)"""
+        with self.__condition:
+            self.__invalidate(task_id)
+            task = self.__tasks.pop(task_id, None)
+            self.__condition.notify_all()
+        return task
+
+    def postpone(self, task_id, delta):
+        """Postpones a queued task (see Task.postpone_task); the start time
+        of the task is postponed as well if it is already set
+
+        Args:
+            task_id: ID of the task
+            delta (timedelta): time by which the task is postponed
+        """
+        with self.__condition:
+            task = self.__tasks[task_id]
+            task.postpone_task(delta)
+            if isinstance(task.start_time, TimeStamp):
+                task.start_time += delta
+            self.add(task)
+
+    def peek_next_due_time(self):
+        """Returns the start time (TimeStamp) of the next task or None if the queue is empty"""
+        with self.__condition:
+            entry = self.__top()
+            if entry is None:
+                return None
+            return TimeStamp.from_ns(entry[0], self.tz)
+
+    def pop_due_tasks(self, current_time=None):
+        """Removes and returns the tasks whose start time is before the current time,
+        ordered by their priority and start time
+
+        Args:
+            current_time (TimeStamp): the current time; the current time in
+                                      the time zone of the queue if not given
+        """
+        with self.__condition:
+            if current_time is None:
+                current_time = TimeStamp.now(self.tz)
+            else:
+                self.__check_tz(current_time)
+            now = current_time.ns
+
+            due = list()
+            while True:
+                entry = self.__top()
+                if entry is None or entry[0] >= now:
+                    break
+                heapq.heappop(self.__heap)
+                del self.__entries[entry[3]]
+                due.append((entry[1], entry[0], entry[2], self.__tasks.pop(entry[3])))
+        due.sort(key=lambda item: item[:3])
+        return [item[3] for item in due]
+
+    def wait_for_due_tasks(self, timeout=None):
+        """Blocks until at least one task is due and returns the due tasks (see
+        pop_due_tasks); returns an empty list if no task is due within the timeout
+
+        Args:
+            timeout (float): maximum waiting time in seconds; no limit if None
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        with self.__condition:
+            while True:
+                # the time zone of the queue is only known once a task is added
+                now = TimeStamp.now(self.tz)
+                entry = self.__top()
+                if entry is not None and entry[0] < now.ns:
+                    return self.pop_due_tasks(now)
+
+                # a task is due 1 ns after its start time
+                wait_time = (entry[0] + 1 - now.ns) / 1e9 if entry is not None else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return list()
+                    wait_time = remaining if wait_time is None else min(wait_time, remaining)
+                # woken up by changes of the queue
+                self.__condition.wait(wait_time)
+
+    def __check_tz(self, timestamp):
+        if (timestamp.tz is None) != (self.tz is None):
+            raise TypeError("can't compare TimeStamps with and without a time zone: "
+                            "{0!r} and the tasks of the queue".format(timestamp))
+
+    def __top(self):
+        """Returns the valid entry at the top of the heap, discarding invalidated entries"""
+        heap = self.__heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def __invalidate(self, task_id):
+        entry = self.__entries.pop(task_id, None)
+        if entry is not None:
+            entry[3] = None
+            # invalidated entries that are not at the top of the heap are only
+            # removed when the heap is rebuilt
+            if len(self.__heap) > 2 * len(self.__entries) + 64:
+                self.__heap = [valid for valid in self.__heap if valid[3] is not None]
+                heapq.heapify(self.__heap)
@@ -1,7 +1,9 @@
-import inflection
+from ropod.structs.codec import Field, struct_codec
 
 
 class ElevatorRequests(object):
+    __slots__ = ('current_floor', 'number_of_active_requests')
+
     def __init__(self):
         self.current_floor = -1
         self.number_of_active_requests = -1
@@ -19,7 +21,21 @@ class ElevatorRequestStatus:
     FAILED = 7
 
 
+@struct_codec
 class ElevatorRequest(object):
+    __slots__ = ('query_id', 'command', 'elevator_id', 'start_floor', 'goal_floor',
+                 'operational_mode', 'task_id', 'load', 'robot_id', 'status')
+    # the operational mode is written, but not read
+    FIELDS = (Field('elevator_id', key='elevatorId', optional=True),
+              Field('operational_mode', key='operationalMode', default='ROBOT', decode=False),
+              Field('start_floor', key='startFloor'),
+              Field('goal_floor', key='goalFloor'),
+              Field('query_id', key='queryId'),
+              Field('command'),
+              Field('load', optional=True),
+              Field('robot_id', key='robotId', optional=True),
+              Field('status', optional=True, default=ElevatorRequestStatus.PENDING),
+              Field('task_id', key='taskId', optional=True))
 
     def __init__(self, query_id, start_floor, goal_floor, command, elevator_id=1, **kwargs):
 
@@ -35,36 +51,6 @@ class ElevatorRequest(object):
         self.robot_id = kwargs.get('robot_id', None)
         self.status = ElevatorRequestStatus.PENDING
 
-    def to_dict(self):
-        request_dict = dict()
-        request_dict['elevatorId'] = self.elevator_id
-        request_dict['operationalMode'] = self.operational_mode
-        request_dict['startFloor'] = self.start_floor
-        request_dict['goalFloor'] = self.goal_floor
-        request_dict['queryId'] = self.query_id
-        request_dict['command'] = self.command
-        request_dict['load'] = self.load
-        request_dict['robotId'] = self.robot_id
-        request_dict['status'] = self.status
-        request_dict['taskId'] = self.task_id
-        return request_dict
-
-    @staticmethod
-    def from_dict(request):
-        query_id = request['queryId']
-        command = request['command']
-        start_floor = request['startFloor']
-        goal_floor = request['goalFloor']
-        elevator_id = request.get('elevatorId')
-
-        robot_request = ElevatorRequest(query_id, start_floor, goal_floor, command, elevator_id)
-
-        robot_request.task_id = request.get('taskId')
-        robot_request.load = request.get('load')
-        robot_request.robot_id = request.get('robotId')
-        robot_request.status = request.get('status', ElevatorRequestStatus.PENDING)
-        return robot_request
-
     def __str__(self):
         return "ElevatorRequest(query_id=%s, command=%s, start_floor=%s, goal_floor=%s, elevator_id=%s, task_id=%s, " \
                "load=%s, robot_id=%s, status=%s)" % (self.query_id, self.command, self.start_floor, self.goal_floor,
@@ -72,7 +58,16 @@ class ElevatorRequest(object):
                                                      self.status)
 
 
+@struct_codec
 class Elevator(object):
+    __slots__ = ('elevator_id', 'floor', 'calls', 'is_available',
+                 'door_open_at_goal_floor', 'door_open_at_start_floor')
+    FIELDS = (Field('elevator_id', key='elevatorId'),
+              Field('floor'),
+              Field('calls'),
+              Field('is_available', key='isAvailable'),
+              Field('door_open_at_goal_floor', key='doorOpenAtGoalFloor'),
+              Field('door_open_at_start_floor', key='doorOpenAtStartFloor'))
 
     def __init__(self, elevator_id):
         self.elevator_id = elevator_id
@@ -82,32 +77,15 @@ class Elevator(object):
         self.door_open_at_goal_floor = False
         self.door_open_at_start_floor = False
 
-    def to_dict(self):
-        elevator_dict = dict()
-        elevator_dict['elevatorId'] = self.elevator_id
-        elevator_dict['floor'] = self.floor
-        elevator_dict['calls'] = self.calls
-        elevator_dict['isAvailable'] = self.is_available
-        elevator_dict['doorOpenAtGoalFloor'] = self.door_open_at_goal_floor
-        elevator_dict['doorOpenAtStartFloor'] = self.door_open_at_start_floor
-        return elevator_dict
-
-    @staticmethod
-    def from_dict(elevator_dict):
-        elevator = Elevator(elevator_dict['elevatorId'])
-        elevator.elevator_id = elevator_dict['elevatorId']
-        elevator.floor = elevator_dict['floor']
-        elevator.calls = elevator_dict['calls']
-        elevator.is_available = elevator_dict['isAvailable']
-        elevator.door_open_at_goal_floor = elevator_dict['doorOpenAtGoalFloor']
-        elevator.door_open_at_start_floor = elevator_dict['doorOpenAtStartFloor']
-        return elevator
-
     def update(self, status):
+        """Updates the elevator attributes from a status message with camel case keys;
+        keys that do not correspond to an elevator attribute are ignored
+        """
+        attributes = Elevator.CODEC.attributes
         for k, v in status.items():
-            if k != 'metamodel':
-                key = inflection.underscore(k)
-                self.__dict__[key] = v
+            attribute = attributes.get(k)
+            if attribute is not None:
+                setattr(self, attribute, v)
 
     def at_goal_floor(self):
         if self.door_open_at_goal_floor:
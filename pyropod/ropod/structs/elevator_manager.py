@@ -0,0 +1,246 @@
+import collections
+import datetime
+import itertools
+
+from ropod.structs.elevator import ElevatorRequestStatus
+from ropod.utils.timestamp import TimeStamp
+
+# status transitions of an elevator trip; a trip can also be canceled
+# or fail in any status that is not final
+_TRANSITIONS = {ElevatorRequestStatus.PENDING: (ElevatorRequestStatus.ACCEPTED,),
+                ElevatorRequestStatus.ACCEPTED: (ElevatorRequestStatus.GOING_TO_START,),
+                ElevatorRequestStatus.GOING_TO_START: (ElevatorRequestStatus.WAITING_FOR_ROBOT_IN,),
+                ElevatorRequestStatus.WAITING_FOR_ROBOT_IN: (ElevatorRequestStatus.GOING_TO_START,
+                                                             ElevatorRequestStatus.GOING_TO_GOAL),
+                ElevatorRequestStatus.GOING_TO_GOAL: (ElevatorRequestStatus.WAITING_FOR_ROBOT_OUT,),
+                ElevatorRequestStatus.WAITING_FOR_ROBOT_OUT: (ElevatorRequestStatus.GOING_TO_GOAL,
+                                                              ElevatorRequestStatus.COMPLETED)}
+
+_FINAL = (ElevatorRequestStatus.COMPLETED, ElevatorRequestStatus.CANCELED, ElevatorRequestStatus.FAILED)
+
+
+def _direction(request):
+    return (request.goal_floor > request.start_floor) - (request.goal_floor < request.start_floor)
+
+
+class ElevatorTrip(object):
+    """A trip of an elevator shared by compatible ElevatorRequests, i.e. requests
+    for the same elevator going in the same direction
+
+    Attributes:
+        trip_id (int): ID of the trip
+        elevator_id: ID of the elevator
+        direction (int): 1 if the trip goes up, -1 if it goes down
+        requests (list): the ElevatorRequests served by the trip
+        load (int): the capacity of the elevator used by the requests
+        status (int): status of the trip (see ElevatorRequestStatus),
+                      which is also set as the status of its requests
+        created_time (TimeStamp): time at which the trip was created
+        status_history (list): (status, TimeStamp) pairs of the status changes
+    """
+    __slots__ = ('trip_id', 'elevator_id', 'direction', 'requests', 'load', 'status',
+                 'created_time', 'status_history')
+
+    def __init__(self, trip_id, elevator_id, direction, created_time):
+        self.trip_id = trip_id
+        self.elevator_id = elevator_id
+        self.direction = direction
+        self.requests = list()
+        self.load = 0
+        self.status = ElevatorRequestStatus.PENDING
+        self.created_time = created_time
+        self.status_history = [(ElevatorRequestStatus.PENDING, created_time)]
+
+    @property
+    def stops(self):
+        """Returns the floors at which the elevator stops in the order of the trip"""
+        floors = set()
+        for request in self.requests:
+            floors.add(request.start_floor)
+            floors.add(request.goal_floor)
+        return sorted(floors, reverse=self.direction < 0)
+
+    @property
+    def floor_span(self):
+        """Returns the (lowest, highest) floor of the trip"""
+        floors = [floor for request in self.requests for floor in (request.start_floor, request.goal_floor)]
+        return min(floors), max(floors)
+
+    @property
+    def start_floors(self):
+        """Returns the floors at which robots enter the elevator in the order of the trip"""
+        return sorted(set(request.start_floor for request in self.requests), reverse=self.direction < 0)
+
+    @property
+    def goal_floors(self):
+        """Returns the floors at which robots leave the elevator in the order of the trip"""
+        return sorted(set(request.goal_floor for request in self.requests), reverse=self.direction < 0)
+
+    def is_final(self):
+        return self.status in _FINAL
+
+
+class ElevatorRequestManager(object):
+    """Aggregates the ElevatorRequests of the robots into shared elevator trips.
+
+    A request is merged into the last pending trip of its elevator if the trip goes in
+    the same direction, was created less than batching_window ago, the floors of the
+    request overlap the floors of the trip (or are at most max_floor_distance floors
+    away from them) and the elevator's capacity is not exceeded by the load of the
+    request; otherwise a new trip is queued.
+    Each elevator serves its trips one at a time in the order of its queue: a trip is
+    ready to be dispatched when its batching window has elapsed (or it is full), no other
+    trip of the elevator is active and the elevator is available.
+
+    Args:
+        batching_window (timedelta): time during which a trip accepts new requests
+        capacity (int): default capacity of the elevators
+        load_size: function returning the capacity that a request needs; 1 per request if None
+        max_floor_distance (int): maximum number of floors by which a request
+                                  may extend the floors of the trip it is merged into
+    """
+    def __init__(self, batching_window=datetime.timedelta(seconds=10), capacity=2, load_size=None,
+                 max_floor_distance=0):
+        self.batching_window = batching_window
+        self.capacity = capacity
+        self.max_floor_distance = max_floor_distance
+        self.load_size = load_size if load_size is not None else (lambda request: 1)
+
+        self.__elevators = dict()
+        self.__capacities = dict()
+        self.__queues = dict()
+        self.__trips = dict()
+        self.__request_trips = dict()
+        self.__trip_ids = itertools.count(1)
+
+    def add_elevator(self, elevator, capacity=None):
+        """Registers an Elevator, whose availability is considered when dispatching trips"""
+        self.__elevators[elevator.elevator_id] = elevator
+        if capacity is not None:
+            self.__capacities[elevator.elevator_id] = capacity
+
+    def get_capacity(self, elevator_id):
+        return self.__capacities.get(elevator_id, self.capacity)
+
+    def get_trip(self, trip_id):
+        """Returns the trip with the given ID or None"""
+        return self.__trips.get(trip_id)
+
+    def get_request_trip(self, query_id):
+        """Returns the trip serving the request with the given query ID or None"""
+        return self.__request_trips.get(query_id)
+
+    def get_queue(self, elevator_id):
+        """Returns the trips of the given elevator that are not finished, in the order of service"""
+        return list(self.__queues.get(elevator_id, ()))
+
+    def add_request(self, request, current_time=None):
+        """Adds a request to a compatible pending trip or to a new trip
+
+        Args:
+            request (ElevatorRequest): the request of a robot
+            current_time (TimeStamp): the current time; TimeStamp() if not given
+
+        Returns: the ElevatorTrip that serves the request
+        """
+        if current_time is None:
+            current_time = TimeStamp()
+        if request.query_id in self.__request_trips:
+            raise Exception("Request {0} has already been added".format(request.query_id))
+
+        direction = _direction(request)
+        load = self.load_size(request)
+        queue = self.__queues.setdefault(request.elevator_id, collections.deque())
+
+        trip = queue[-1] if queue else None
+        if trip is None or not self.__accepts(trip, request, direction, load, current_time):
+            trip = ElevatorTrip(next(self.__trip_ids), request.elevator_id, direction, current_time)
+            self.__trips[trip.trip_id] = trip
+            queue.append(trip)
+
+        trip.requests.append(request)
+        trip.load += load
+        request.status = trip.status
+        self.__request_trips[request.query_id] = trip
+        return trip
+
+    def cancel_request(self, query_id, current_time=None):
+        """Removes a request from its trip if the trip has not been dispatched yet;
+        a trip without requests is canceled
+
+        Returns: True if the request was removed, False otherwise
+        """
+        trip = self.__request_trips.get(query_id)
+        if trip is None or trip.status != ElevatorRequestStatus.PENDING:
+            return False
+
+        request = next(request for request in trip.requests if request.query_id == query_id)
+        trip.requests.remove(request)
+        trip.load -= self.load_size(request)
+        request.status = ElevatorRequestStatus.CANCELED
+        del self.__request_trips[query_id]
+        if not trip.requests:
+            self.set_trip_status(trip.trip_id, ElevatorRequestStatus.CANCELED, current_time)
+        return True
+
+    def get_ready_trips(self, current_time=None):
+        """Returns the trips that can be dispatched to their elevators now"""
+        if current_time is None:
+            current_time = TimeStamp()
+
+        ready = list()
+        for elevator_id, queue in self.__queues.items():
+            if not queue or queue[0].status != ElevatorRequestStatus.PENDING:
+                continue
+            elevator = self.__elevators.get(elevator_id)
+            if elevator is not None and not elevator.is_available:
+                continue
+
+            trip = queue[0]
+            if trip.load >= self.get_capacity(elevator_id) or \
+                    current_time >= trip.created_time + self.batching_window:
+                ready.append(trip)
+        return ready
+
+    def set_trip_status(self, trip_id, status, current_time=None):
+        """Sets the status of a trip and of its requests; finished trips
+        are removed from the queue of their elevator
+
+        Raises an exception if the status transition is not valid
+        """
+        if current_time is None:
+            current_time = TimeStamp()
+        trip = self.__trips[trip_id]
+        if trip.is_final() or (status not in _TRANSITIONS.get(trip.status, ()) and
+                               status not in (ElevatorRequestStatus.CANCELED, ElevatorRequestStatus.FAILED)):
+            raise Exception("Invalid status transition of elevator trip {0}: {1} -> {2}".format(
+                trip_id, trip.status, status))
+
+        trip.status = status
+        trip.status_history.append((status, current_time))
+        for request in trip.requests:
+            request.status = status
+
+        if trip.is_final():
+            self.__queues[trip.elevator_id].remove(trip)
+            del self.__trips[trip_id]
+            for request in trip.requests:
+                del self.__request_trips[request.query_id]
+
+    def update_request_status(self, query_id, status, current_time=None):
+        """Sets the status of the trip serving the request with the given query ID,
+        e.g. when the elevator reports the status of a request
+        """
+        self.set_trip_status(self.__request_trips[query_id].trip_id, status, current_time)
+
+    def __accepts(self, trip, request, direction, load, current_time):
+        if trip.status != ElevatorRequestStatus.PENDING or trip.direction != direction or \
+                trip.load + load > self.get_capacity(trip.elevator_id) or \
+                current_time >= trip.created_time + self.batching_window:
+            return False
+
+        # the floors of the request must overlap the floors of the trip
+        # (up to max_floor_distance), so that the trip is not prolonged
+        lowest, highest = trip.floor_span
+        return min(request.start_floor, request.goal_floor) <= highest + self.max_floor_distance and \
+            max(request.start_floor, request.goal_floor) >= lowest - self.max_floor_distance
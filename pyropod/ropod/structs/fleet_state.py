@@ -0,0 +1,193 @@
+import collections
+import threading
+
+from ropod.structs.robot import Robot, attributes
+from ropod.utils.timestamp import TimeStamp
+
+# wire keys of the robot attributes (as in Robot.to_dict)
+_KEYS = {field.name: field.key for field in Robot.FIELDS}
+
+# attributes whose changes are tracked; the update times in last_update
+# are reported together with the changed attributes
+_CHANGE_ATTRIBUTES = tuple(attribute for attribute in Robot.__slots__ if attribute != 'last_update')
+
+
+class FleetSnapshot(object):
+    """Consistent snapshot of the state of a fleet
+
+    Attributes:
+        version (int): version of the fleet state store when the snapshot was taken
+        states (dict): robot ID -> dictionary with the values of the robot attributes
+                       (the dictionaries must not be modified)
+    """
+    __slots__ = ('version', 'states')
+
+    def __init__(self, version, states):
+        self.version = version
+        self.states = states
+
+    def get_robot(self, robot_id):
+        """Returns a Robot with the state of the given robot in the snapshot"""
+        robot = Robot.__new__(Robot)
+        for attribute, value in self.states[robot_id].items():
+            setattr(robot, attribute, value)
+        return robot
+
+    def to_dict(self):
+        """Returns a dictionary with the Robot.to_dict representation of each robot"""
+        return {robot_id: self.get_robot(robot_id).to_dict() for robot_id in self.states}
+
+
+class FleetStateStore(object):
+    """Store of the states of the robots in a fleet that applies partial updates
+    attribute by attribute and keeps track of the changed attributes.
+
+    Each update stamps the changed attributes with the update time
+    (in the robot's last_update dictionary) and increments the version of the store.
+    get_changes returns only the attributes that changed after a given version,
+    such that republishing or persisting the fleet state costs proportional
+    to the number of changes; it takes time proportional to the number of
+    attributes that changed after the version.
+
+    The state of each robot is kept in a dictionary that is replaced instead of
+    modified on updates, so that snapshots only copy the references to the
+    robot states. The Robot objects returned by get_robot are kept up to date
+    with the store, but must not be modified directly.
+
+    Args:
+        robots (list): Robot objects with the initial state of the fleet
+    """
+    def __init__(self, robots=None):
+        self.version = 0
+
+        self.__robots = dict()
+        self.__states = dict()
+        # (robot ID, attribute) -> version of the last change, ordered by the
+        # versions; the attribute None marks the removal of a robot
+        self.__changes = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+        for robot in robots or list():
+            self.add_robot(robot)
+
+    def __len__(self):
+        return len(self.__robots)
+
+    def __contains__(self, robot_id):
+        return robot_id in self.__robots
+
+    def add_robot(self, robot):
+        """Adds (or replaces) a robot; all its attributes are reported as changed"""
+        state = {attribute: getattr(robot, attribute) for attribute in Robot.__slots__}
+        state['last_update'] = dict(state['last_update'])
+        with self.__lock:
+            self.version += 1
+            self.__robots[robot.robot_id] = robot
+            self.__states[robot.robot_id] = state
+            self.__changes.pop((robot.robot_id, None), None)
+            for attribute in _CHANGE_ATTRIBUTES:
+                self.__record_change(robot.robot_id, attribute)
+
+    def remove_robot(self, robot_id):
+        """Removes a robot from the store and returns it"""
+        with self.__lock:
+            self.version += 1
+            robot = self.__robots.pop(robot_id)
+            del self.__states[robot_id]
+            for attribute in _CHANGE_ATTRIBUTES:
+                self.__changes.pop((robot_id, attribute), None)
+            self.__record_change(robot_id, None)
+        return robot
+
+    def get_robot(self, robot_id):
+        """Returns the Robot object with the current state of the given robot"""
+        return self.__robots.get(robot_id)
+
+    def get_robot_ids(self):
+        """Returns the IDs of the robots in the store"""
+        return list(self.__robots.keys())
+
+    def update(self, robot_id, robot_attributes, update_time=None):
+        """Updates the given attributes of a robot; only attributes whose
+        value differs from the current value are changed and stamped
+        with the update time
+
+        Args:
+            robot_id (str): robot ID
+            robot_attributes (dict): attribute name -> new value; the names must
+                                     be in ropod.structs.robot.attributes or "nickname"
+            update_time (TimeStamp): time of the update; TimeStamp() if not given
+
+        Returns: dictionary with the changed attributes and their new values
+        """
+        for attribute in robot_attributes:
+            if attribute not in attributes and attribute != 'nickname':
+                raise Exception("Unknown robot attribute: {0}".format(attribute))
+
+        with self.__lock:
+            state = self.__states[robot_id]
+            changed = {attribute: value for attribute, value in robot_attributes.items()
+                       if state[attribute] != value}
+            if not changed:
+                return changed
+
+            if update_time is None:
+                update_time = TimeStamp()
+            update_time = update_time.to_str()
+
+            self.version += 1
+            state = dict(state)
+            state.update(changed)
+            last_update = dict(state['last_update'])
+            robot = self.__robots[robot_id]
+            for attribute, value in changed.items():
+                last_update[attribute] = update_time
+                setattr(robot, attribute, value)
+                self.__record_change(robot_id, attribute)
+            state['last_update'] = last_update
+            robot.last_update = last_update
+            self.__states[robot_id] = state
+        return changed
+
+    def get_changes(self, since_version=0):
+        """Returns the attributes that changed after the given version
+
+        Args:
+            since_version (int): version of the store after which the changes are
+                                 returned (e.g. the version returned by the previous call)
+
+        Returns: (version, changes), where version is the current version of the store
+                 and changes maps the ID of each robot with changes to a dictionary
+                 with the changed attributes (with the keys of Robot.to_dict, including
+                 "lastUpdate" with the update times of the changed attributes), or to None
+                 if the robot was removed
+        """
+        with self.__lock:
+            changes = dict()
+            for (robot_id, attribute), version in reversed(self.__changes.items()):
+                if version <= since_version:
+                    break
+
+                if attribute is None:
+                    changes[robot_id] = None
+                    continue
+
+                state = self.__states[robot_id]
+                robot_changes = changes.get(robot_id)
+                if robot_changes is None:
+                    robot_changes = changes[robot_id] = {'robotId': robot_id, 'lastUpdate': dict()}
+
+                robot_changes[_KEYS[attribute]] = state[attribute]
+                if attribute in state['last_update']:
+                    robot_changes['lastUpdate'][attribute] = state['last_update'][attribute]
+            return self.version, changes
+
+    def snapshot(self):
+        """Returns a FleetSnapshot with the current state of all robots"""
+        with self.__lock:
+            return FleetSnapshot(self.version, dict(self.__states))
+
+    def __record_change(self, robot_id, attribute):
+        key = (robot_id, attribute)
+        self.__changes.pop(key, None)
+        self.__changes[key] = self.version
@@ -0,0 +1,231 @@
+import datetime
+import itertools
+
+from sortedcontainers import SortedList
+
+from ropod.utils.timestamp import TimeStamp
+
+
+class _SubAreaReservations(object):
+    """The reservations of a sub-area, sorted by their start times.
+
+    Since reservations are only sorted by their start times, a reservation
+    overlapping a window can start at most max_duration before the window;
+    max_duration is the longest duration of the current reservations of the
+    sub-area, which is kept in a sorted list of the durations so that it
+    decreases again when long reservations are removed.
+    """
+    __slots__ = ('entries', 'durations')
+
+    def __init__(self):
+        self.entries = SortedList()
+        self.durations = SortedList()
+
+    @property
+    def max_duration(self):
+        return self.durations[-1] if self.durations else 0
+
+    def add(self, entry):
+        self.entries.add(entry)
+        self.durations.add(entry[1] - entry[0])
+
+    def remove(self, entry):
+        self.entries.remove(entry)
+        self.durations.remove(entry[1] - entry[0])
+
+    def overlapping(self, start, end):
+        """Returns the (start, end, key, reservation) entries overlapping [start, end)"""
+        return [entry for entry in self.entries.irange((start - self.max_duration,), (end,),
+                                                       inclusive=(True, False))
+                if entry[1] > start]
+
+
+class ReservationBook(object):
+    """Book of SubAreaReservations that keeps the reservations of each sub-area
+    sorted by their start times, such that overlapping reservations, capacity
+    checks and the earliest feasible slot of a new reservation are found in
+    O(log n + k) time for k reservations in the queried window.
+
+    The capacity of a sub-area is taken from its SubArea.capacity; sub-areas
+    that are not registered with add_sub_area or have no capacity have
+    a capacity of 1. Reservations without a required capacity require 1.
+
+    Args:
+        sub_areas (list): SubArea objects whose capacities are used
+    """
+    CANCELLED = 'cancelled'
+    SCHEDULED = 'scheduled'
+
+    def __init__(self, sub_areas=None):
+        self.__capacities = dict()
+        self.__sub_areas = dict()
+        self.__keys = dict()
+        self.__task_reservations = dict()
+        self.__next_key = itertools.count()
+
+        for sub_area in sub_areas or list():
+            self.add_sub_area(sub_area)
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def add_sub_area(self, sub_area):
+        """Registers a sub-area (or updates its capacity)"""
+        self.__capacities[sub_area.id] = sub_area.capacity if sub_area.capacity else 1
+
+    def get_capacity(self, sub_area_id):
+        """Returns the capacity of the given sub-area"""
+        return self.__capacities.get(sub_area_id, 1)
+
+    def add(self, reservation):
+        """Adds a reservation without checking the capacity of its sub-area;
+        cancelled reservations are ignored
+        """
+        if reservation.status == self.CANCELLED or id(reservation) in self.__keys:
+            return
+
+        start = reservation.start_time.ns
+        end = reservation.end_time.ns
+        key = next(self.__next_key)
+
+        sub_area = self.__sub_areas.get(reservation.sub_area_id)
+        if sub_area is None:
+            sub_area = self.__sub_areas[reservation.sub_area_id] = _SubAreaReservations()
+        sub_area.add((start, end, key, reservation))
+
+        self.__keys[id(reservation)] = (start, end, key, reservation)
+        self.__task_reservations.setdefault(reservation.task_id, dict())[key] = reservation
+
+    def reserve(self, reservation):
+        """Adds a reservation if the capacity of its sub-area is not exceeded
+        during the reservation and marks it as scheduled
+
+        Returns: True if the reservation was added, False otherwise
+        """
+        if not self.has_capacity(reservation.sub_area_id, reservation.start_time,
+                                 reservation.end_time, reservation.required_capacity):
+            return False
+
+        reservation.status = self.SCHEDULED
+        self.add(reservation)
+        return True
+
+    def cancel(self, reservation):
+        """Removes a reservation from the book and marks it as cancelled"""
+        entry = self.__keys.pop(id(reservation), None)
+        reservation.status = self.CANCELLED
+        if entry is None:
+            return
+
+        self.__sub_areas[reservation.sub_area_id].remove(entry)
+        task_reservations = self.__task_reservations[reservation.task_id]
+        del task_reservations[entry[2]]
+        if not task_reservations:
+            del self.__task_reservations[reservation.task_id]
+
+    def cancel_task_reservations(self, task_id):
+        """Cancels all reservations of the given task"""
+        for reservation in list(self.__task_reservations.get(task_id, dict()).values()):
+            self.cancel(reservation)
+
+    def get_task_reservations(self, task_id):
+        """Returns the reservations of the given task"""
+        return list(self.__task_reservations.get(task_id, dict()).values())
+
+    def get_overlapping(self, sub_area_id, start_time, end_time):
+        """Returns the reservations of the sub-area that overlap
+        the window [start_time, end_time), sorted by their start times
+        """
+        sub_area = self.__sub_areas.get(sub_area_id)
+        if sub_area is None:
+            return list()
+        return [entry[3] for entry in sub_area.overlapping(start_time.ns, end_time.ns)]
+
+    def get_usage(self, sub_area_id, start_time, end_time):
+        """Returns the maximum capacity of the sub-area that is
+        reserved at any time in the window [start_time, end_time)
+        """
+        steps = self.__usage_steps(sub_area_id, start_time.ns, end_time.ns)
+        return max((usage for _, usage in steps), default=0)
+
+    def has_capacity(self, sub_area_id, start_time, end_time, required_capacity=1):
+        """Returns True if the required capacity is available in the sub-area
+        during the whole window [start_time, end_time)
+        """
+        available = self.get_capacity(sub_area_id) - self.get_usage(sub_area_id, start_time, end_time)
+        return max(required_capacity, 1) <= available
+
+    def find_earliest_slot(self, sub_area_id, duration, earliest_start_time,
+                           latest_start_time=None, required_capacity=1):
+        """Returns the earliest start time (as a TimeStamp) at or after earliest_start_time
+        at which the required capacity is available in the sub-area for the given
+        duration, or None if there is no such start time before latest_start_time
+
+        Args:
+            sub_area_id: ID of the sub-area
+            duration (timedelta): duration of the reservation
+            earliest_start_time (TimeStamp): earliest start of the reservation
+            latest_start_time (TimeStamp): latest start of the reservation;
+                                           no limit if None
+            required_capacity (int): capacity needed during the reservation
+        """
+        duration = duration // datetime.timedelta(microseconds=1) * 1000
+        limit = self.get_capacity(sub_area_id) - max(required_capacity, 1)
+        if limit < 0:
+            return None
+
+        earliest_start = earliest_start_time.ns
+        if latest_start_time is not None:
+            latest_start = latest_start_time.ns
+            steps = self.__usage_steps(sub_area_id, earliest_start, latest_start + duration)
+        else:
+            latest_start = None
+            steps = self.__usage_steps(sub_area_id, earliest_start, None)
+
+        # the usage is constant between two steps; a slot can start at the
+        # earliest start or at the end of a step in which the usage exceeds the limit
+        candidate = earliest_start
+        for time, usage in steps:
+            if candidate is not None and time >= candidate + duration:
+                break
+            if usage > limit:
+                candidate = None
+            elif candidate is None:
+                candidate = time
+
+        if candidate is None or (latest_start is not None and candidate > latest_start):
+            return None
+        return TimeStamp.from_ns(candidate, earliest_start_time.tz)
+
+    def __usage_steps(self, sub_area_id, start, end):
+        """Returns a list of (time, usage) pairs in which usage is the capacity of the
+        sub-area that is reserved from time until the time of the next pair; the first
+        pair is at start and the last pair has a usage of 0 (unless end is reached first)
+        """
+        sub_area = self.__sub_areas.get(sub_area_id)
+        if sub_area is None:
+            return [(start, 0)]
+
+        if end is None:
+            entries = sub_area.entries.irange((start - sub_area.max_duration,))
+            entries = [entry for entry in entries if entry[1] > start]
+        else:
+            entries = sub_area.overlapping(start, end)
+
+        changes = dict()
+        for entry_start, entry_end, _, reservation in entries:
+            required = max(reservation.required_capacity, 1)
+            entry_start = max(entry_start, start)
+            changes[entry_start] = changes.get(entry_start, 0) + required
+            if end is None or entry_end < end:
+                changes[entry_end] = changes.get(entry_end, 0) - required
+
+        steps = [(start, 0)]
+        usage = 0
+        for time in sorted(changes):
+            usage += changes[time]
+            if time == start:
+                steps[0] = (start, usage)
+            else:
+                steps.append((time, usage))
+        return steps
@@ -1,19 +1,256 @@
-import inflection
+import weakref
 
+from ropod.structs.codec import Field, struct_codec
 from ropod.utils.uuid import generate_uuid
 from ropod.utils.datasets import flatten_dict, keep_entry
+from ropod.utils.delta import copy_document
 
 attributes = ['position', 'availability', 'component_status', 'schedule', 'current_task',
               'version']
 
 
+def _read_only(*args, **kwargs):
+    raise Exception("The default versions are shared between robots and cannot be modified")
+
+
+class _FrozenDict(dict):
+    """A dictionary of the default versions, which is shared between robots;
+    copies of it (copy.copy, copy.deepcopy) are plain dictionaries that can be modified
+    """
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy_document(self)
+
+    def __reduce__(self):
+        return _FrozenDict, (dict(self),)
+
+
+class _FrozenList(list):
+    """A list of the default versions (see _FrozenDict)"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return copy_document(self)
+
+    def __reduce__(self):
+        return _FrozenList, (list(self),)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_freeze(item) for item in value)
+    return value
+
+
+def _view(parent, key, value):
+    """Returns the copy-on-write view of a shared default version (value) that is the
+    item of parent with the given key; while a view is alive, reading the item again
+    returns the same view
+    """
+    views = parent._views
+    if views is None:
+        views = parent._views = dict()
+    ref = views.get(key)
+    view = ref() if ref is not None else None
+    if view is None or view._source is not value:
+        view = _VIEW_TYPES[type(value)](value)
+        view._parent = parent
+        view._key = key
+        view._source = value
+        views[key] = weakref.ref(view)
+    return view
+
+
+def _detached(value):
+    """Returns a modifiable version of a shared default version that was removed from its parent"""
+    if type(value) in _VIEW_TYPES:
+        return _VIEW_TYPES[type(value)](value)
+    return value
+
+
+def _attach(view):
+    """Replaces the shared default version of a view by the view in its parent (and
+    the parent by its own view, and so on), before the view is modified; a view whose
+    shared version was removed from its parent in the meantime remains detached
+    """
+    parent = view._parent
+    if parent is None:
+        return
+    source = view._source
+    view._parent = view._source = None
+    _attach(parent)
+
+    key = view._key
+    if isinstance(parent, list):
+        if key >= len(parent) or list.__getitem__(parent, key) is not source:
+            key = next((index for index, item in enumerate(list.__iter__(parent)) if item is source), None)
+        if key is not None:
+            list.__setitem__(parent, key, view)
+    elif key in parent and dict.__getitem__(parent, key) is source:
+        dict.__setitem__(parent, key, view)
+
+
+def _mutator(method):
+    def mutate(self, *args, **kwargs):
+        if self._parent is not None:
+            _attach(self)
+        return method(self, *args, **kwargs)
+    mutate.__name__ = method.__name__
+    return mutate
+
+
+class _CopyOnWriteDict(dict):
+    """A dictionary of the version of a robot whose items may be shared default versions.
+
+    Reading a shared item returns a view of it, i.e. a modifiable _CopyOnWriteDict
+    (or _CopyOnWriteList) that is only stored in its parent, instead of the shared
+    version, when it is modified; the shared versions are thus only copied for a robot
+    when they are actually written to, and reading the version (e.g. to serialise it)
+    leaves them shared.
+    """
+    # the attributes of views are set per instance, such that creating
+    # a dictionary does not need a Python __init__
+    _parent = _key = _source = _views = None
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) in _VIEW_TYPES:
+            return _view(self, key, value)
+        return value
+
+    # overriding __iter__ makes dict(), {**version} and update() read the items through __getitem__
+    def __iter__(self):
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def copy(self):
+        return dict(self)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if self._parent is not None:
+            _attach(self)
+        return _detached(dict.pop(self, key, *default))
+
+    def popitem(self):
+        if self._parent is not None:
+            _attach(self)
+        key, value = dict.popitem(self)
+        return key, _detached(value)
+
+    __setitem__ = _mutator(dict.__setitem__)
+    __delitem__ = _mutator(dict.__delitem__)
+    __ior__ = _mutator(dict.__ior__)
+    clear = _mutator(dict.clear)
+    update = _mutator(dict.update)
+
+    def __reduce__(self):
+        return dict, (copy_document(self),)
+
+
+class _CopyOnWriteList(list):
+    """A list of the version of a robot (see _CopyOnWriteDict)"""
+    _parent = _key = _source = _views = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = list.__getitem__(self, index)
+        if type(value) in _VIEW_TYPES:
+            return _view(self, index if index >= 0 else index + len(self), value)
+        return value
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def copy(self):
+        return list(self)
+
+    def pop(self, index=-1):
+        if self._parent is not None:
+            _attach(self)
+        return _detached(list.pop(self, index))
+
+    __setitem__ = _mutator(list.__setitem__)
+    __delitem__ = _mutator(list.__delitem__)
+    __iadd__ = _mutator(list.__iadd__)
+    __imul__ = _mutator(list.__imul__)
+    append = _mutator(list.append)
+    extend = _mutator(list.extend)
+    insert = _mutator(list.insert)
+    remove = _mutator(list.remove)
+    clear = _mutator(list.clear)
+    sort = _mutator(list.sort)
+    reverse = _mutator(list.reverse)
+
+    def __reduce__(self):
+        return list, (copy_document(self),)
+
+
+_VIEW_TYPES = {_FrozenDict: _CopyOnWriteDict, _FrozenList: _CopyOnWriteList}
+
+
+def default_version():
+    """Returns the version of a robot whose versions are unknown. The hardware and software
+    subtrees are the DEFAULT_VERSIONS, which are only copied for a robot when they are
+    modified (see _CopyOnWriteDict); only the black box, which has a uuid per robot, is created
+    """
+    return _CopyOnWriteDict(hardware=DEFAULT_VERSIONS['hardware'],
+                            software=DEFAULT_VERSIONS['software'],
+                            black_box=BlackBox.full_version())
+
+
+@struct_codec
 class Robot(object):
+    __slots__ = ('robot_id', 'uuid', 'last_update', 'position', 'availability', 'component_status',
+                 'schedule', 'current_task', 'nickname', 'version')
+    FIELDS = (Field('robot_id', key='robotId'),
+              Field('uuid', optional=True),
+              Field('last_update', key='lastUpdate', default=dict, decode=False),
+              Field('position', optional=True),
+              Field('availability', decode=False),
+              Field('component_status', key='componentStatus', decode=False),
+              Field('schedule'),
+              Field('current_task', key='currentTask', decode=False),
+              Field('nickname', optional=True),
+              Field('version', optional=True))
+
     def __init__(self, robot_id, uuid=None, **kwargs):
         self.robot_id = robot_id
 
-        if uuid is None:
-            self.uuid = generate_uuid()
-        else:
+        # the uuid and version are created when they are first accessed
+        # if they are not given (see __getattr__)
+        if uuid is not None:
             self.uuid = uuid
 
         self.last_update = dict()
@@ -26,33 +263,30 @@ class Robot(object):
 
         self.nickname = kwargs.get('nickname', None)
 
-        self.version = kwargs.get('version', {'hardware': Hardware.full_version(),
-                                              'software': Software.full_version(),
-                                              'black_box': BlackBox.full_version()})
-
-        for attr in attributes:
-            val = self.__dict__.get('attr', None)
-            if val is not None:
-                self.last_update[attr] = val
-
-    def to_dict(self):
-        robot_dict = dict()
+        if 'version' in kwargs:
+            self.version = kwargs['version']
 
-        for k, v in self.__dict__.items():
-            key = inflection.camelize(k, False)
-            robot_dict[key] = v
-
-        return robot_dict
-
-    @staticmethod
-    def from_dict(robot_dict):
-        robot = Robot(robot_dict['robotId'])
-        robot.schedule = robot_dict['schedule']
-        robot.nickname = robot_dict.get('nickname', None)
-        robot.uuid = robot_dict.get('uuid')
-        robot.version = robot_dict.get('version')
-        robot.position = robot_dict.get('position')
-        return robot
+    # only called for the slots that are not set yet
+    def __getattr__(self, name):
+        if name == 'uuid':
+            value = generate_uuid()
+        elif name == 'version':
+            value = default_version()
+        else:
+            raise AttributeError("'Robot' object has no attribute '{0}'".format(name))
+        setattr(self, name, value)
+        return value
+
+    # the state of copies and pickles only contains the slots that are set,
+    # so that copying a robot does not create its uuid and version
+    def __getstate__(self):
+        state = dict()
+        for name in self.__slots__:
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return None, state
 
     @staticmethod
     def to_csv(robot_dict):
@@ -182,3 +416,8 @@ class BlackBox(object):
         if uuid is None:
             uuid = generate_uuid()
         return {'uuid': uuid, 'logger': Software.ropod_sw(), 'fault_detection': Software.ropod_sw()}
+
+
+# the default hardware and software versions, shared by the robots whose versions are unknown
+DEFAULT_VERSIONS = _FrozenDict(hardware=_freeze(Hardware.full_version()),
+                               software=_freeze(Software.full_version()))
@@ -1,5 +1,4 @@
-import copy
-import datetime
+from ropod.structs.codec import COPY, MINUTES, Field, struct_codec
 
 
 class AvailabilityStatus:
@@ -27,6 +26,7 @@ class ActionStatus:
     FAILED = 1  # Execution failed
 
 
+@struct_codec
 class TaskStatus(object):
     UNALLOCATED = 11
     ALLOCATED = 12
@@ -41,6 +41,15 @@ class TaskStatus(object):
     CANCELED = 9  # Canceled before execution started
     PREEMPTED = 10  # Canceled during execution
 
+    __slots__ = ('task_id', 'status', 'delayed', 'current_robot_action',
+                 'completed_robot_actions', 'estimated_task_duration')
+    FIELDS = (Field('task_id'),
+              Field('status'),
+              Field('delayed'),
+              Field('estimated_task_duration', type=MINUTES),
+              Field('current_robot_action', key='current_robot_actions', type=COPY),
+              Field('completed_robot_actions', type=COPY))
+
     def __init__(self, task_id):
         self.task_id = task_id
         self.status = self.UNALLOCATED
@@ -49,31 +58,6 @@ class TaskStatus(object):
         self.completed_robot_actions = dict()
         self.estimated_task_duration = -1.
 
-    def to_dict(self):
-        task_dict = dict()
-        task_dict['task_id'] = self.task_id
-        task_dict['status'] = self.status
-        task_dict['delayed'] = self.delayed
-
-        if isinstance(self.estimated_task_duration, datetime.timedelta):
-            task_dict['estimated_task_duration'] = self.estimated_task_duration.total_seconds() / 60 # Turn duration into minutes
-        else:
-            task_dict['estimated_task_duration'] = self.estimated_task_duration
-
-        task_dict['current_robot_actions'] = copy.copy(self.current_robot_action)
-        task_dict['completed_robot_actions'] = copy.copy(self.completed_robot_actions)
-        return task_dict
-
-    @staticmethod
-    def from_dict(status_dict):
-        status = TaskStatus(status_dict['task_id'])
-        status.status = status_dict['status']
-        status.delayed = status_dict['delayed']
-        status.estimated_task_duration = datetime.timedelta(minutes=status_dict['estimated_task_duration'])
-        status.current_robot_action = status_dict['current_robot_actions']
-        status.completed_robot_actions = status_dict['completed_robot_actions']
-        return status
-
     @staticmethod
     def to_csv(status_dict):
         """ Prepares dict to be written to a csv
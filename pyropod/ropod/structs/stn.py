@@ -0,0 +1,325 @@
+import collections
+import datetime
+
+import numpy as np
+
+from ropod.structs.task import TaskConstraints
+
+_UNITS = {'hours': 3600, 'minutes': 60, 'seconds': 1}
+
+# tolerance of the comparisons of bounds, which are floats
+_EPSILON = 1e-9
+
+ZTP = 0
+
+
+class TemporalNetwork(object):
+    """Simple temporal network (STN) over the temporal constraints of tasks.
+
+    Each task has a start and a finish timepoint; the start is constrained to the task's
+    window [earliest start time, latest start time] relative to the zero timepoint (ZTP,
+    see TaskConstraints.relative_to_ztp) and the finish to start + estimated duration.
+    Tasks can be sequenced, e.g. the tasks of a robot's schedule, such that a task starts
+    after the previous one finished (plus a travel time).
+
+    A constraint u -> v with weight w means t(v) - t(u) <= w. The network keeps the
+    earliest and latest time of each timepoint relative to the ZTP (i.e. the shortest
+    path distances from and to the ZTP) and updates them incrementally when a constraint
+    is added, by propagating the tightened bounds only through the affected timepoints.
+    A constraint that makes the network inconsistent (a negative cycle) is detected
+    during the propagation; the network is then restored to its previous state.
+    Removing tasks can loosen bounds, so the bounds are then recomputed.
+
+    compute_distances computes all pairwise distances (the minimal network) in
+    a dense NumPy matrix with a vectorised Floyd-Warshall algorithm, which is also
+    used by recompute(dense=True) for batch recomputations.
+
+    Args:
+        ztp (TimeStamp): zero timepoint
+        resolution (str): "hours", "minutes" or "seconds"; unit of the bounds
+    """
+    def __init__(self, ztp, resolution='minutes'):
+        if resolution not in _UNITS:
+            raise Exception("The resolution must be one of {0}".format(', '.join(_UNITS)))
+        self.ztp = ztp
+        self.resolution = resolution
+
+        self.__lower = [0.]
+        self.__upper = [0.]
+        self.__out_edges = [dict()]
+        self.__in_edges = [dict()]
+        self.__free = list()
+        self.__task_timepoints = dict()
+
+    def __len__(self):
+        return len(self.__task_timepoints)
+
+    def __contains__(self, task_id):
+        return task_id in self.__task_timepoints
+
+    def add_task(self, task, previous_task_id=None, next_task_id=None, travel_time=None):
+        """Adds a task and optionally sequences it after and/or before queued tasks
+
+        Args:
+            task (Task): task whose start times are TimeStamps and whose estimated
+                         duration is a timedelta
+            previous_task_id: ID of a task that has to finish before the task starts
+            next_task_id: ID of a task that can only start after the task finished
+            travel_time (timedelta): minimum time between the sequenced tasks
+
+        Returns: True if the task was added, False if its constraints are inconsistent
+                 with the network (the network is then left unchanged)
+        """
+        trail = list()
+        consistent = self.__insert_task(task, previous_task_id, next_task_id, travel_time, trail)
+        if not consistent:
+            self.__rollback(trail)
+        return consistent
+
+    def fits(self, task, previous_task_id=None, next_task_id=None, travel_time=None):
+        """Returns True if the task can be added (see add_task); the network is not changed"""
+        trail = list()
+        consistent = self.__insert_task(task, previous_task_id, next_task_id, travel_time, trail)
+        self.__rollback(trail)
+        return consistent
+
+    def add_sequence(self, task_id, next_task_id, travel_time=None):
+        """Constrains a task to start after another task finished
+
+        Args:
+            task_id: ID of the task that finishes first
+            next_task_id: ID of the task that starts afterwards
+            travel_time (timedelta): minimum time between the finish and the start
+
+        Returns: True if the constraint was added, False if it is inconsistent
+                 with the network (the network is then left unchanged)
+        """
+        trail = list()
+        if self.__add_sequence(task_id, next_task_id, travel_time, trail):
+            return True
+        self.__rollback(trail)
+        return False
+
+    def remove_task(self, task_id, recompute=True):
+        """Removes a task and its constraints and recomputes the bounds, which
+        may be postponed (recompute=False) when several tasks are removed
+        """
+        for timepoint in self.__task_timepoints.pop(task_id):
+            for target in self.__out_edges[timepoint]:
+                del self.__in_edges[target][timepoint]
+            for source in self.__in_edges[timepoint]:
+                del self.__out_edges[source][timepoint]
+            self.__out_edges[timepoint] = None
+            self.__in_edges[timepoint] = None
+            self.__free.append(timepoint)
+        if recompute:
+            self.recompute()
+
+    def get_bounds(self, task_id):
+        """Returns the earliest and latest start and finish times of a task relative
+        to the ZTP (in the resolution of the network)
+
+        Return: earliest_start, latest_start, earliest_finish, latest_finish
+        """
+        start, finish = self.__task_timepoints[task_id]
+        return self.__lower[start], self.__upper[start], self.__lower[finish], self.__upper[finish]
+
+    def get_start_window(self, task_id):
+        """Returns the earliest and latest start times (TimeStamps) of a task"""
+        start, _ = self.__task_timepoints[task_id]
+        unit = _UNITS[self.resolution]
+        return (self.ztp + datetime.timedelta(seconds=self.__lower[start] * unit),
+                self.ztp + datetime.timedelta(seconds=self.__upper[start] * unit))
+
+    def to_units(self, delta):
+        """Converts a timedelta to the resolution of the network"""
+        if delta is None:
+            return 0.
+        return delta.total_seconds() / _UNITS[self.resolution]
+
+    def compute_distances(self):
+        """Computes the shortest path distances between all timepoints with
+        a vectorised Floyd-Warshall algorithm
+
+        Returns: (task_ids, distances), where the timepoints of task_ids[i] are
+                 1 + 2i (start) and 2 + 2i (finish), 0 is the ZTP, and distances[u, v]
+                 is the maximum of t(v) - t(u) (inf if unconstrained); the network is
+                 inconsistent if a diagonal element is negative
+        """
+        task_ids = list(self.__task_timepoints)
+        indices = {ZTP: 0}
+        for i, task_id in enumerate(task_ids):
+            start, finish = self.__task_timepoints[task_id]
+            indices[start] = 1 + 2 * i
+            indices[finish] = 2 + 2 * i
+
+        n = 1 + 2 * len(task_ids)
+        distances = np.full((n, n), np.inf)
+        np.fill_diagonal(distances, 0.)
+        for timepoint, index in indices.items():
+            for target, weight in self.__out_edges[timepoint].items():
+                distances[index, indices[target]] = min(distances[index, indices[target]], weight)
+
+        for k in range(n):
+            np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+        return task_ids, distances
+
+    def recompute(self, dense=False):
+        """Recomputes the bounds of all timepoints from the constraints, either by
+        propagating from the ZTP or from the dense distance matrix
+
+        Returns: True if the network is consistent
+        """
+        lower = self.__lower
+        upper = self.__upper
+        if dense:
+            task_ids, distances = self.compute_distances()
+            if (np.diag(distances) < -_EPSILON).any():
+                return False
+            for i, task_id in enumerate(task_ids):
+                for offset, timepoint in enumerate(self.__task_timepoints[task_id]):
+                    index = 1 + 2 * i + offset
+                    upper[timepoint] = float(distances[ZTP, index])
+                    lower[timepoint] = -float(distances[index, ZTP])
+            return True
+
+        for timepoint in range(1, len(lower)):
+            lower[timepoint] = -np.inf
+            upper[timepoint] = np.inf
+        trail = list()
+        return self.__propagate_upper([ZTP], None, trail) and self.__propagate_lower([ZTP], None, trail)
+
+    def __insert_task(self, task, previous_task_id, next_task_id, travel_time, trail):
+        if task.id in self.__task_timepoints:
+            raise Exception("Task {0} is already in the network".format(task.id))
+
+        earliest_start, latest_start = TaskConstraints.relative_to_ztp(task, self.ztp, self.resolution)
+        duration = self.to_units(task.estimated_duration)
+
+        start = self.__add_timepoint(trail)
+        finish = self.__add_timepoint(trail)
+        self.__task_timepoints[task.id] = (start, finish)
+        trail.append(('task', task.id))
+
+        consistent = self.__add_constraint(ZTP, start, earliest_start, latest_start, trail) and \
+            self.__add_constraint(start, finish, duration, duration, trail)
+        if consistent and previous_task_id is not None:
+            consistent = self.__add_sequence(previous_task_id, task.id, travel_time, trail)
+        if consistent and next_task_id is not None:
+            consistent = self.__add_sequence(task.id, next_task_id, travel_time, trail)
+        return consistent
+
+    def __add_timepoint(self, trail):
+        if self.__free:
+            timepoint = self.__free.pop()
+            self.__out_edges[timepoint] = dict()
+            self.__in_edges[timepoint] = dict()
+            self.__lower[timepoint] = -np.inf
+            self.__upper[timepoint] = np.inf
+        else:
+            timepoint = len(self.__lower)
+            self.__lower.append(-np.inf)
+            self.__upper.append(np.inf)
+            self.__out_edges.append(dict())
+            self.__in_edges.append(dict())
+        trail.append(('timepoint', timepoint))
+        return timepoint
+
+    def __add_sequence(self, task_id, next_task_id, travel_time, trail):
+        _, finish = self.__task_timepoints[task_id]
+        next_start, _ = self.__task_timepoints[next_task_id]
+        return self.__add_constraint(finish, next_start, self.to_units(travel_time), np.inf, trail)
+
+    def __add_constraint(self, u, v, lower, upper, trail):
+        """Adds lower <= t(v) - t(u) <= upper and propagates the bounds"""
+        return self.__add_edge(u, v, upper, trail) and self.__add_edge(v, u, -lower, trail)
+
+    def __add_edge(self, u, v, weight, trail):
+        """Adds t(v) - t(u) <= weight and propagates the bounds"""
+        if weight == np.inf:
+            return True
+        old_weight = self.__out_edges[u].get(v)
+        if old_weight is not None and old_weight <= weight:
+            return True
+
+        trail.append(('edge', u, v, old_weight))
+        self.__out_edges[u][v] = weight
+        self.__in_edges[v][u] = weight
+
+        if self.__upper[u] + weight < self.__upper[v] - _EPSILON:
+            trail.append(('upper', v, self.__upper[v]))
+            self.__upper[v] = self.__upper[u] + weight
+            if not self.__propagate_upper([v], u, trail):
+                return False
+        if self.__lower[v] - weight > self.__lower[u] + _EPSILON:
+            trail.append(('lower', u, self.__lower[u]))
+            self.__lower[u] = self.__lower[v] - weight
+            if not self.__propagate_lower([u], v, trail):
+                return False
+        return True
+
+    def __propagate_upper(self, timepoints, source, trail):
+        """Propagates decreased upper bounds along the outgoing edges; reaching
+        the source of the new edge again means that it closed a negative cycle
+        """
+        lower = self.__lower
+        upper = self.__upper
+        queue = collections.deque(timepoints)
+        while queue:
+            timepoint = queue.popleft()
+            if lower[timepoint] > upper[timepoint] + _EPSILON:
+                return False
+            bound = upper[timepoint]
+            for target, weight in self.__out_edges[timepoint].items():
+                if bound + weight < upper[target] - _EPSILON:
+                    if target == source:
+                        return False
+                    trail.append(('upper', target, upper[target]))
+                    upper[target] = bound + weight
+                    queue.append(target)
+        return True
+
+    def __propagate_lower(self, timepoints, source, trail):
+        """Propagates increased lower bounds along the incoming edges"""
+        lower = self.__lower
+        upper = self.__upper
+        queue = collections.deque(timepoints)
+        while queue:
+            timepoint = queue.popleft()
+            if lower[timepoint] > upper[timepoint] + _EPSILON:
+                return False
+            bound = lower[timepoint]
+            for origin, weight in self.__in_edges[timepoint].items():
+                if bound - weight > lower[origin] + _EPSILON:
+                    if origin == source:
+                        return False
+                    trail.append(('lower', origin, lower[origin]))
+                    lower[origin] = bound - weight
+                    queue.append(origin)
+        return True
+
+    def __rollback(self, trail):
+        for change in reversed(trail):
+            if change[0] == 'upper':
+                self.__upper[change[1]] = change[2]
+            elif change[0] == 'lower':
+                self.__lower[change[1]] = change[2]
+            elif change[0] == 'task':
+                del self.__task_timepoints[change[1]]
+            elif change[0] == 'edge':
+                _, u, v, old_weight = change
+                if old_weight is None:
+                    del self.__out_edges[u][v]
+                    del self.__in_edges[v][u]
+                else:
+                    self.__out_edges[u][v] = old_weight
+                    self.__in_edges[v][u] = old_weight
+            else:
+                timepoint = change[1]
+                for target in self.__out_edges[timepoint]:
+                    del self.__in_edges[target][timepoint]
+                for origin in self.__in_edges[timepoint]:
+                    del self.__out_edges[origin][timepoint]
+                self.__out_edges[timepoint] = None
+                self.__in_edges[timepoint] = None
+                self.__free.append(timepoint)
@@ -1,8 +1,6 @@
-import copy
-import datetime
-
 from ropod.structs.action import Action
-from ropod.structs.area import Area
+from ropod.structs.area import Area, area_registry
+from ropod.structs.codec import COPY, MINUTES, DictOf, Field, Interned, ListOf, lazy_struct_codec, struct_codec
 from ropod.structs.status import TaskStatus
 from ropod.utils.datasets import flatten_dict, keep_entry
 from ropod.utils.uuid import generate_uuid
@@ -10,6 +8,8 @@ from ropod.utils.timestamp import TimeStamp
 
 
 class RobotTask(object):
+    __slots__ = ('earliest_start_time', 'latest_start_time', 'estimated_end_time', 'priority')
+
     def __init__(self):
         self.earliest_start_time = -1.
         self.latest_start_time = -1.
@@ -18,6 +18,9 @@ class RobotTask(object):
 
 
 class TaskRequest(object):
+    __slots__ = ('id', 'pickup_pose', 'delivery_pose', 'earliest_pickup_time', 'latest_pickup_time',
+                 'user_id', 'load_type', 'load_id', 'priority')
+
     def __init__(self, id=''):
         if not id:
             self.id = generate_uuid()
@@ -61,19 +64,21 @@ class TaskRequest(object):
 
         pickup_area_dict = request_dict.get('pickup_pose', None)
         if pickup_area_dict:
-            request.pickup_pose = Area.from_dict(pickup_area_dict)
+            request.pickup_pose = area_registry.intern_area_dict(pickup_area_dict)
         else:# when the provided dict is from json schema
-            request.pickup_pose = Area()
-            request.pickup_pose.name = request_dict.get("pickupLocation", '')
-            request.pickup_pose.floor_number = request_dict.get("pickupLocationLevel", 0)
+            pickup_pose = Area()
+            pickup_pose.name = request_dict.get("pickupLocation", '')
+            pickup_pose.floor_number = request_dict.get("pickupLocationLevel", 0)
+            request.pickup_pose = area_registry.intern(pickup_pose)
 
         delivery_area_dict = request_dict.get('delivery_pose', None)
         if delivery_area_dict:
-            request.delivery_pose = Area.from_dict(delivery_area_dict)
+            request.delivery_pose = area_registry.intern_area_dict(delivery_area_dict)
         else:# when the provided dict is from json schema
-            request.delivery_pose = Area()
-            request.delivery_pose.name = request_dict.get("deliveryLocation", '')
-            request.delivery_pose.floor_number = request_dict.get("deliveryLocationLevel", 0)
+            delivery_pose = Area()
+            delivery_pose.name = request_dict.get("deliveryLocation", '')
+            delivery_pose.floor_number = request_dict.get("deliveryLocationLevel", 0)
+            request.delivery_pose = area_registry.intern(delivery_pose)
 
         request.priority = request_dict["priority"]
 
@@ -95,7 +100,29 @@ class TaskPriority:
     LOW = 3
 
 
+@struct_codec
 class Task(object):
+    __slots__ = ('id', 'robot_actions', 'loadType', 'loadId', 'team_robot_ids',
+                 'earliest_start_time', 'latest_start_time', 'estimated_duration',
+                 'earliest_finish_time', 'latest_finish_time', 'start_time', 'finish_time',
+                 'hard_constraints', 'pickup_pose', 'delivery_pose', 'status', 'priority')
+    FIELDS = (Field('id'),
+              Field('loadType'),
+              Field('loadId'),
+              Field('team_robot_ids', type=COPY),
+              Field('earliest_start_time', type=TimeStamp),
+              Field('latest_start_time', type=TimeStamp),
+              Field('estimated_duration', type=MINUTES),
+              Field('earliest_finish_time', type=TimeStamp),
+              Field('latest_finish_time', type=TimeStamp),
+              Field('start_time', type=TimeStamp, optional=True),
+              Field('finish_time', type=TimeStamp, optional=True),
+              Field('pickup_pose', type=Interned(Area, area_registry.intern_area_dict)),
+              Field('delivery_pose', type=Interned(Area, area_registry.intern_area_dict)),
+              Field('priority'),
+              Field('status', type=TaskStatus),
+              Field('hard_constraints'),
+              Field('robot_actions', type=DictOf(ListOf(Action))))
 
     def __init__(self, id=None, robot_actions=dict(), team_robot_ids=list(),
                  earliest_start_time=-1, latest_start_time=-1, estimated_duration=-1,
@@ -147,8 +174,9 @@ class Task(object):
 
         self.status = TaskStatus(self.id)
 
-        priority = kwargs.get('priority', self.NORMAL)
-        if priority in (self.EMERGENCY, self.NORMAL, self.HIGH, self.LOW):
+        priority = kwargs.get('priority', TaskPriority.NORMAL)
+        if priority in (TaskPriority.EMERGENCY, TaskPriority.NORMAL,
+                        TaskPriority.HIGH, TaskPriority.LOW):
             self.priority = priority
         else:
             raise Exception("Priority must have one of the following values:\n"
@@ -157,77 +185,6 @@ class Task(object):
                             "2) Normal\n"
                             "3) Low")
 
-    def to_dict(self):
-        task_dict = dict()
-        task_dict['id'] = self.id
-        task_dict['loadType'] = self.loadType
-        task_dict['loadId'] = self.loadId
-        task_dict['team_robot_ids'] = copy.copy(self.team_robot_ids)
-        task_dict['earliest_start_time'] = self.earliest_start_time.to_str()
-        task_dict['latest_start_time'] = self.latest_start_time.to_str()
-        task_dict['estimated_duration'] = self.estimated_duration.total_seconds() / 60  # Turn duration into minutes
-        task_dict['earliest_finish_time'] = self.earliest_finish_time.to_str()
-        task_dict['latest_finish_time'] = self.latest_finish_time.to_str()
-        if self.start_time:
-            task_dict['start_time'] = self.start_time.to_str()
-        else:
-            task_dict['start_time'] = self.start_time
-
-        if self.finish_time:
-            task_dict['finish_time'] = self.finish_time.to_str()
-        else:
-            task_dict['finish_time'] = self.finish_time
-
-        task_dict['pickup_pose'] = self.pickup_pose.to_dict()
-        task_dict['delivery_pose'] = self.delivery_pose.to_dict()
-        task_dict['priority'] = self.priority
-        task_dict['status'] = self.status.to_dict()
-        task_dict['hard_constraints'] = self.hard_constraints
-        task_dict['robot_actions'] = dict()
-        for robot_id, actions in self.robot_actions.items():
-            task_dict['robot_actions'][robot_id] = list()
-            for action in actions:
-                action_dict = Action.to_dict(action)
-                task_dict['robot_actions'][robot_id].append(action_dict)
-        return task_dict
-
-    @staticmethod
-    def from_dict(task_dict):
-        task = Task()
-        task.id = task_dict['id']
-        task.loadType = task_dict['loadType']
-        task.loadId = task_dict['loadId']
-        task.team_robot_ids = task_dict['team_robot_ids']
-        task.earliest_start_time = TimeStamp.from_str(task_dict['earliest_start_time'])
-        task.latest_start_time = TimeStamp.from_str(task_dict['latest_start_time'])
-        task.estimated_duration = datetime.timedelta(minutes=task_dict['estimated_duration'])
-        task.earliest_finish_time = TimeStamp.from_str(task_dict['earliest_finish_time'])
-        task.latest_finish_time = TimeStamp.from_str(task_dict['latest_finish_time'])
-
-        start_time = task_dict.get('start_time', None)
-        if start_time:
-            task.start_time = TimeStamp.from_str(start_time)
-        else:
-            task.start_time = start_time
-
-        finish_time = task_dict.get('finish_time', None)
-        if finish_time:
-            task.finish_time = TimeStamp.from_str(finish_time)
-        else:
-            task.finish_time = finish_time
-
-        task.pickup_pose = Area.from_dict(task_dict['pickup_pose'])
-        task.delivery_pose = Area.from_dict(task_dict['delivery_pose'])
-        task.priority = task_dict['priority']
-        task.status = TaskStatus.from_dict(task_dict['status'])
-        task.hard_constraints = task_dict['hard_constraints']
-        for robot_id, actions in task_dict['robot_actions'].items():
-            task.robot_actions[robot_id] = list()
-            for action_dict in actions:
-                action = Action.from_dict(action_dict)
-                task.robot_actions[robot_id].append(action)
-        return task
-
     @staticmethod
     def to_csv(task_dict):
         """ Prepares dict to be written to a csv
@@ -244,10 +201,10 @@ class Task(object):
     @staticmethod
     def from_request(request):
         task = Task()
-        task.load_type = request.load_type
-        task.load_id = request.load_id
-        task.earliest_start_time = request.earliest_start_time
-        task.latest_start_time = request.latest_start_time
+        task.loadType = request.load_type
+        task.loadId = request.load_id
+        task.earliest_start_time = request.earliest_pickup_time
+        task.latest_start_time = request.latest_pickup_time
         task.pickup_pose = request.pickup_pose
         task.delivery_pose = request.delivery_pose
         task.priority = request.priority
@@ -324,6 +281,19 @@ class Task(object):
             return False
 
 
+@lazy_struct_codec
+class LazyTask(Task):
+    """A Task decoded from a dictionary whose actions, poses and times are only decoded
+    (and cached) when they are first accessed, e.g. for components that only read
+    the ID and status of a task. LazyTask.from_dict keeps a reference to the dictionary,
+    which must therefore not be modified afterwards.
+    """
+    __slots__ = ('_dict',)
+    LAZY_FIELDS = ('robot_actions', 'earliest_start_time', 'latest_start_time', 'estimated_duration',
+                   'earliest_finish_time', 'latest_finish_time', 'start_time', 'finish_time',
+                   'pickup_pose', 'delivery_pose')
+
+
 class TaskConstraints(object):
 
     @staticmethod
@@ -0,0 +1,213 @@
+import datetime
+
+import numpy as np
+
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+
+_RESOLUTIONS = {'hours': 3600 * 10**9, 'minutes': 60 * 10**9, 'seconds': 10**9}
+
+
+def _to_ns(delta):
+    """Converts a timedelta to nanoseconds; arrays are assumed to be in nanoseconds already"""
+    if isinstance(delta, datetime.timedelta):
+        return delta // datetime.timedelta(microseconds=1) * 1000
+    if isinstance(delta, np.ndarray) and np.issubdtype(delta.dtype, np.timedelta64):
+        return delta.astype('timedelta64[ns]').astype(np.int64)
+    return np.asarray(delta, dtype=np.int64)
+
+
+class TaskBatch(object):
+    """A batch of tasks whose temporal constraints, priorities and statuses
+    are stored column-wise in NumPy arrays, such that the temporal operations
+    of Task and TaskConstraints can be applied to all tasks at once.
+
+    Times are stored as nanoseconds since the epoch and durations as nanoseconds
+    (see TimeStamp.ns); all times in a batch have the same time zone.
+
+    A batch created with TaskBatch.from_tasks keeps the Task objects it was
+    created from; TaskBatch.to_tasks writes the values of the batch back to them.
+
+    Args:
+        ids (list): task IDs
+        earliest_start_times (array): earliest start times in nanoseconds
+        latest_start_times (array): latest start times in nanoseconds
+        estimated_durations (array): estimated durations in nanoseconds
+        priorities (array): task priorities
+        statuses (array): task statuses (as defined in TaskStatus)
+        tz (tzinfo): time zone of the times; None for wall-clock times
+        tasks (list): the Task objects corresponding to the batch entries
+    """
+    __slots__ = ('ids', 'earliest_start_times', 'latest_start_times', 'estimated_durations',
+                 'earliest_finish_times', 'latest_finish_times', 'priorities', 'statuses',
+                 'tz', 'tasks')
+
+    def __init__(self, ids, earliest_start_times, latest_start_times, estimated_durations,
+                 priorities, statuses, tz=None, tasks=None):
+        self.ids = np.asarray(ids, dtype=object)
+        self.earliest_start_times = np.asarray(earliest_start_times, dtype=np.int64)
+        self.latest_start_times = np.asarray(latest_start_times, dtype=np.int64)
+        self.estimated_durations = np.asarray(estimated_durations, dtype=np.int64)
+        self.earliest_finish_times = self.earliest_start_times + self.estimated_durations
+        self.latest_finish_times = self.latest_start_times + self.estimated_durations
+        self.priorities = np.asarray(priorities, dtype=np.int64)
+        self.statuses = np.asarray(statuses, dtype=np.int64)
+        self.tz = tz
+
+        if tasks is not None:
+            tasks = np.asarray(tasks, dtype=object)
+            if len(tasks) != len(self.ids):
+                raise Exception("The number of tasks must match the number of IDs")
+        self.tasks = tasks
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """Creates a batch from a list of Task objects, whose start times
+        must be TimeStamps (with the same time zone) and whose estimated
+        durations must be timedeltas
+        """
+        tz = tasks[0].earliest_start_time.tz if tasks else None
+        microsecond = datetime.timedelta(microseconds=1)
+        try:
+            if any(task.earliest_start_time.tz != tz or task.latest_start_time.tz != tz for task in tasks):
+                raise Exception("All task times in a batch must have the same time zone")
+            columns = [(task.id, task.earliest_start_time.ns, task.latest_start_time.ns,
+                        task.estimated_duration // microsecond * 1000, task.priority, task.status.status)
+                       for task in tasks]
+        except (AttributeError, TypeError):
+            raise Exception("The start times of the tasks must be TimeStamps "
+                            "and the estimated durations timedeltas")
+
+        columns = list(zip(*columns)) or [()] * 6
+        return cls(columns[0], columns[1], columns[2], columns[3], columns[4], columns[5],
+                   tz=tz, tasks=list(tasks))
+
+    def to_tasks(self):
+        """Returns the tasks of the batch with the values of the batch. The tasks
+        the batch was created from are updated in place; if the batch was not
+        created from tasks, new tasks are created.
+        """
+        tasks = self.tasks
+        if tasks is None:
+            tasks = [Task(id=task_id) for task_id in self.ids]
+
+        tz = self.tz
+        from_ns = TimeStamp.from_ns
+        columns = zip(tasks, self.earliest_start_times.tolist(), self.latest_start_times.tolist(),
+                      self.estimated_durations.tolist(), self.earliest_finish_times.tolist(),
+                      self.latest_finish_times.tolist(), self.priorities.tolist(),
+                      self.statuses.tolist())
+        for task, est, lst, duration, eft, lft, priority, status in columns:
+            task.earliest_start_time = from_ns(est, tz)
+            task.latest_start_time = from_ns(lst, tz)
+            task.estimated_duration = datetime.timedelta(microseconds=duration // 1000)
+            task.earliest_finish_time = from_ns(eft, tz)
+            task.latest_finish_time = from_ns(lft, tz)
+            task.priority = priority
+            task.status.status = status
+        return list(tasks)
+
+    def postpone(self, delta, mask=None):
+        """Postpones the tasks by the given time (see Task.postpone_task)
+
+        Args:
+            delta: timedelta by which all tasks are postponed or an array
+                   with the delay of each task (in nanoseconds or as timedelta64)
+            mask (array): boolean array selecting the tasks to postpone; all tasks if None
+        """
+        delta = _to_ns(delta)
+        if mask is not None:
+            delta = np.where(mask, delta, 0)
+        self.earliest_start_times += delta
+        self.latest_start_times += delta
+        self.update_finish_times()
+
+    def update_finish_times(self, estimated_durations=None):
+        """Recomputes the earliest and latest finish times (see
+        Task.update_earliest_and_latest_finish_time)
+
+        Args:
+            estimated_durations: timedelta or array of durations (in nanoseconds or as
+                                 timedelta64) used instead of the estimated durations
+        """
+        if estimated_durations is None:
+            estimated_durations = self.estimated_durations
+        else:
+            estimated_durations = _to_ns(estimated_durations)
+        np.add(self.earliest_start_times, estimated_durations, out=self.earliest_finish_times)
+        np.add(self.latest_start_times, estimated_durations, out=self.latest_finish_times)
+
+    def update_estimated_durations(self, estimated_durations):
+        """Sets the estimated durations and recomputes the finish times
+        (see Task.update_task_estimated_duration)
+
+        Args:
+            estimated_durations: timedelta or array of durations (in nanoseconds or as timedelta64)
+        """
+        self.estimated_durations[:] = _to_ns(estimated_durations)
+        self.update_finish_times()
+
+    def relative_to_ztp(self, ztp, resolution=None):
+        """Returns the earliest and latest start times relative to a ZTP
+        (see TaskConstraints.relative_to_ztp)
+
+        Args:
+            ztp (TimeStamp): Zero Time Point
+            resolution (str): "hours", "minutes" or "seconds"; if no valid resolution
+                              is given, the differences are returned as timedelta64 arrays
+                              (with microsecond resolution, like timedelta)
+
+        Return: r_earliest_start_times (array), r_latest_start_times (array)
+        """
+        self.__check_tz(ztp)
+        r_earliest_start_times = self.earliest_start_times - ztp.ns
+        r_latest_start_times = self.latest_start_times - ztp.ns
+
+        unit = _RESOLUTIONS.get(resolution)
+        if unit is None:
+            return ((r_earliest_start_times // 1000).astype('timedelta64[us]'),
+                    (r_latest_start_times // 1000).astype('timedelta64[us]'))
+        return r_earliest_start_times / unit, r_latest_start_times / unit
+
+    def filter(self, mask):
+        """Returns a batch with the tasks selected by the given boolean
+        array (or index array); the values are copied
+
+        Args:
+            mask (array): boolean or index array
+        """
+        batch = TaskBatch.__new__(TaskBatch)
+        for attribute in TaskBatch.__slots__:
+            value = getattr(self, attribute)
+            if isinstance(value, np.ndarray):
+                value = value[mask]
+            setattr(batch, attribute, value)
+        return batch
+
+    def with_status(self, *statuses):
+        """Returns a batch with the tasks that have one of the given statuses"""
+        return self.filter(np.isin(self.statuses, statuses))
+
+    def starting_between(self, start, end):
+        """Returns a batch with the tasks whose earliest start time
+        is within the given window (including the window bounds)
+
+        Args:
+            start (TimeStamp): start of the window
+            end (TimeStamp): end of the window
+        """
+        self.__check_tz(start)
+        self.__check_tz(end)
+        return self.filter((self.earliest_start_times >= start.ns) & (self.earliest_start_times <= end.ns))
+
+    def __check_tz(self, timestamp):
+        """Raises a TypeError if the timestamp and the times of the batch are not both
+        with or both without a time zone (like comparing the TimeStamps), since their
+        nanoseconds would refer to different clocks
+        """
+        if len(self.ids) and (timestamp.tz is None) != (self.tz is None):
+            raise TypeError("can't compare the times of a batch {0} a time zone with {1!r}".format(
+                'without' if self.tz is None else 'with', timestamp))
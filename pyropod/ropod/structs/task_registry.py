@@ -0,0 +1,242 @@
+from sortedcontainers import SortedList
+
+from ropod.structs.status import TaskStatus
+from ropod.utils.timestamp import TimeStamp
+
+# statuses of tasks that are not executed (anymore)
+_FINAL_STATUSES = frozenset((TaskStatus.COMPLETED, TaskStatus.ABORTED, TaskStatus.FAILED,
+                             TaskStatus.CANCELED, TaskStatus.PREEMPTED))
+
+
+def _time_key(time):
+    """Returns the nanoseconds of a TimeStamp or None for unset times"""
+    if isinstance(time, TimeStamp):
+        return time.ns
+    return None
+
+
+class TaskRegistry(object):
+    """In-memory registry of Task objects with secondary indexes on
+    the task status, priority, assigned robots and start times.
+
+    The status and priority indexes map each value to the IDs of its tasks;
+    the start time indexes are sorted lists of (start time, task ID) pairs,
+    namely one over the earliest start times of all tasks and one per robot
+    over the (scheduled) start times of the robot's tasks; tasks whose start
+    time is not set yet are indexed with their earliest start time. The tasks of a robot
+    that do not have a final status (e.g. completed or canceled) are additionally
+    indexed separately, so that finding the executable tasks of a robot does not
+    go through the robot's history. Queries thus take O(log n + k) time for k results.
+
+    The start times of the tasks must either all have a time zone or all be wall-clock
+    times (the time zone of the first task is kept as the tz of the registry), since the
+    indexes compare their nanoseconds; times with a different awareness raise a TypeError.
+
+    The registry cannot observe changes of the tasks, so changes have to go
+    through the registry: status changes through set_status, which only
+    updates the status indexes, and other changes through update.
+    """
+    def __init__(self, tasks=None):
+        self.tz = None
+        self.__tz_set = False
+        self.__tasks = dict()
+        self.__index_keys = dict()
+        self.__by_status = dict()
+        self.__by_priority = dict()
+        self.__by_robot = dict()
+        self.__active_by_robot = dict()
+        self.__by_earliest_start = SortedList()
+
+        for task in tasks or list():
+            self.add(task)
+
+    def __len__(self):
+        return len(self.__tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self.__tasks
+
+    def __iter__(self):
+        return iter(self.__tasks.values())
+
+    def get(self, task_id):
+        """Returns the task with the given ID or None if it is not registered"""
+        return self.__tasks.get(task_id)
+
+    def add(self, task):
+        """Adds a task to the registry or updates it if a task with
+        the same ID is already registered
+        """
+        self.__check_task_tz(task)
+        if task.id in self.__tasks:
+            self.remove(task.id)
+
+        self.__tasks[task.id] = task
+        self.__index(task)
+
+    def remove(self, task_id):
+        """Removes the task with the given ID from the registry and returns it"""
+        task = self.__tasks.pop(task_id)
+        self.__unindex(task_id)
+        return task
+
+    def update(self, task):
+        """Updates the indexes of a registered task after its priority,
+        assigned robots, start times or status have changed
+        """
+        self.__check_task_tz(task)
+        self.__unindex(task.id)
+        self.__tasks[task.id] = task
+        self.__index(task)
+
+    def set_status(self, task_id, status, **kwargs):
+        """Sets the status of the task with the given ID (see Task.set_status)
+        and updates the status index and the index of the robots' active tasks
+        """
+        task = self.__tasks[task_id]
+        old_status = task.status.status
+        task.set_status(status, **kwargs)
+
+        if old_status != status:
+            self.__discard(self.__by_status, old_status, task_id)
+            self.__by_status.setdefault(status, set()).add(task_id)
+            index_keys = self.__index_keys[task_id]
+            self.__index_keys[task_id] = (status,) + index_keys[1:]
+
+            was_active = old_status not in _FINAL_STATUSES
+            if was_active != (status not in _FINAL_STATUSES):
+                _, _, robot_ids, _, start = index_keys
+                if start is not None:
+                    for robot_id in robot_ids:
+                        if was_active:
+                            self.__discard(self.__active_by_robot, robot_id, (start, task_id))
+                        else:
+                            self.__active_by_robot.setdefault(robot_id, SortedList()).add((start, task_id))
+
+    def get_tasks_by_status(self, *statuses):
+        """Returns the tasks that have one of the given statuses"""
+        return [self.__tasks[task_id] for status in statuses
+                for task_id in self.__by_status.get(status, ())]
+
+    def get_tasks_by_priority(self, priority):
+        """Returns the tasks with the given priority"""
+        return [self.__tasks[task_id] for task_id in self.__by_priority.get(priority, ())]
+
+    def get_robot_tasks(self, robot_id, start=None, end=None, statuses=None):
+        """Returns the tasks assigned to the given robot sorted by their start time
+
+        Args:
+            robot_id (str): robot ID
+            start (TimeStamp): if given, only tasks starting at or after start are returned
+            end (TimeStamp): if given, only tasks starting at or before end are returned
+            statuses (list): if given, only tasks with one of the statuses are returned
+        """
+        robot_tasks = self.__by_robot.get(robot_id)
+        if robot_tasks is None:
+            return list()
+        return self.__window(robot_tasks, start, end, statuses)
+
+    def get_executable_tasks(self, robot_id, current_time=None, statuses=None):
+        """Returns the tasks of the given robot that need to be dispatched based
+        on their schedule (see Task.is_executable), sorted by their start time;
+        tasks with a final status (e.g. completed or canceled) are not executable
+
+        Args:
+            robot_id (str): robot ID
+            current_time (TimeStamp): the current time; the current time in
+                                      the time zone of the registry if not given
+            statuses (list): if given, only tasks with one of the statuses are returned
+        """
+        robot_tasks = self.__active_by_robot.get(robot_id)
+        if robot_tasks is None:
+            return list()
+
+        if current_time is None:
+            current_time = TimeStamp.now(self.tz)
+        else:
+            self.__check_tz(current_time)
+        # Task.is_executable requires the start time to be strictly before the current time
+        task_ids = [task_id for _, task_id in robot_tasks.irange(maximum=(current_time.ns,),
+                                                                 inclusive=(True, False))]
+        return self.__get_tasks(task_ids, statuses)
+
+    def get_tasks_starting_between(self, start, end, statuses=None):
+        """Returns the tasks whose earliest start time is in the given window
+        (including the window bounds), sorted by their earliest start time
+        """
+        return self.__window(self.__by_earliest_start, start, end, statuses)
+
+    def __window(self, index, start, end, statuses):
+        for time in (start, end):
+            if time is not None:
+                self.__check_tz(time)
+        minimum = (start.ns,) if start is not None else None
+        # (end, ) would exclude entries with the end time
+        maximum = (end.ns + 1,) if end is not None else None
+        task_ids = [task_id for _, task_id in index.irange(minimum, maximum, inclusive=(True, False))]
+        return self.__get_tasks(task_ids, statuses)
+
+    def __get_tasks(self, task_ids, statuses):
+        if statuses is None:
+            return [self.__tasks[task_id] for task_id in task_ids]
+        return [self.__tasks[task_id] for task_id in task_ids
+                if self.__index_keys[task_id][0] in statuses]
+
+    def __check_tz(self, time):
+        if self.__tz_set and (time.tz is None) != (self.tz is None):
+            raise TypeError("can't compare TimeStamps with and without a time zone: "
+                            "{0!r} and the tasks of the registry".format(time))
+
+    def __check_task_tz(self, task):
+        """Checks the start times of a task before it is indexed; the first
+        start time that is a TimeStamp sets the time zone of the registry
+        """
+        for time in (task.earliest_start_time, task.start_time):
+            if isinstance(time, TimeStamp):
+                if not self.__tz_set:
+                    self.tz = time.tz
+                    self.__tz_set = True
+                self.__check_tz(time)
+
+    def __index(self, task):
+        task_id = task.id
+        status = task.status.status
+        earliest_start = _time_key(task.earliest_start_time)
+        start = _time_key(task.start_time)
+        if start is None:
+            start = earliest_start
+        # a robot listed twice is only indexed once
+        robot_ids = tuple(dict.fromkeys(task.team_robot_ids))
+
+        self.__by_status.setdefault(status, set()).add(task_id)
+        self.__by_priority.setdefault(task.priority, set()).add(task_id)
+        if earliest_start is not None:
+            self.__by_earliest_start.add((earliest_start, task_id))
+        if start is not None:
+            for robot_id in robot_ids:
+                self.__by_robot.setdefault(robot_id, SortedList()).add((start, task_id))
+                if status not in _FINAL_STATUSES:
+                    self.__active_by_robot.setdefault(robot_id, SortedList()).add((start, task_id))
+
+        self.__index_keys[task_id] = (status, task.priority, robot_ids, earliest_start, start)
+
+    def __unindex(self, task_id):
+        status, priority, robot_ids, earliest_start, start = self.__index_keys.pop(task_id)
+
+        self.__discard(self.__by_status, status, task_id)
+        self.__discard(self.__by_priority, priority, task_id)
+        if earliest_start is not None:
+            self.__by_earliest_start.discard((earliest_start, task_id))
+        if start is not None:
+            for robot_id in robot_ids:
+                self.__discard(self.__by_robot, robot_id, (start, task_id))
+                self.__discard(self.__active_by_robot, robot_id, (start, task_id))
+
+    @staticmethod
+    def __discard(index, key, value):
+        values = index.get(key)
+        if values is None:
+            return
+        values.discard(value)
+        if not values:
+            del index[key]
@@ -0,0 +1,269 @@
+import datetime
+
+from sortedcontainers import SortedList
+
+from ropod.utils.timestamp import TimeStamp
+
+
+def _to_ns(delta):
+    if delta is None:
+        return 0
+    return delta // datetime.timedelta(microseconds=1) * 1000
+
+
+def _interval(task):
+    """Returns the (start, finish) nanoseconds of a task in a schedule"""
+    start_time = task.start_time
+    if not isinstance(start_time, TimeStamp):
+        start_time = task.earliest_start_time
+    start = start_time.ns
+    return start, start + _to_ns(task.estimated_duration)
+
+
+class RobotTimeline(object):
+    """The schedule of a robot as a sorted list of the (start, finish) intervals of its tasks.
+
+    The start of a task is its start time, or its earliest start time if the start time is
+    not set yet, and its finish is the start plus the estimated duration. Since the intervals
+    are only sorted by their start times, a task overlapping a time window can start at most
+    max_duration (the longest duration of the tasks in the timeline) before the window
+    (as in ReservationBook), such that the gaps and insertion positions in a window
+    are found in O(log n + k) time for k tasks in the window.
+
+    Args:
+        robot_id (str): ID of the robot
+        tasks (list): Task objects in the robot's schedule
+    """
+    def __init__(self, robot_id, tasks=None):
+        self.robot_id = robot_id
+        self.tz = None
+
+        self.__entries = SortedList()
+        self.__keys = dict()
+        self.__tasks = dict()
+        self.__durations = SortedList()
+
+        for task in tasks or list():
+            self.add(task)
+
+    def __len__(self):
+        return len(self.__tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self.__tasks
+
+    def __iter__(self):
+        """Iterates over the tasks in the order of their start times"""
+        return (self.__tasks[task_id] for _, _, task_id in self.__entries)
+
+    def get(self, task_id):
+        """Returns the task with the given ID or None if it is not in the timeline"""
+        return self.__tasks.get(task_id)
+
+    def add(self, task):
+        """Adds a task to the timeline or updates its interval if it is in the timeline already"""
+        if task.id in self.__tasks:
+            self.remove(task.id)
+
+        start, finish = _interval(task)
+        entry = (start, finish, task.id)
+        self.__entries.add(entry)
+        self.__keys[task.id] = entry
+        self.__tasks[task.id] = task
+        self.__durations.add(finish - start)
+        if self.tz is None:
+            self.tz = task.earliest_start_time.tz
+
+    def update(self, task):
+        """Updates the interval of a task after its start time or duration has changed"""
+        self.add(task)
+
+    def remove(self, task_id):
+        """Removes the task with the given ID from the timeline and returns it"""
+        start, finish, _ = entry = self.__keys.pop(task_id)
+        self.__entries.remove(entry)
+        self.__durations.remove(finish - start)
+        return self.__tasks.pop(task_id)
+
+    def get_tasks_between(self, start, end):
+        """Returns the tasks whose intervals overlap the window [start, end),
+        sorted by their start times
+        """
+        start, end = start.ns, end.ns
+        return [self.__tasks[task_id] for entry_start, finish, task_id in
+                self.__entries.irange((start - self.__max_duration(),), (end,), inclusive=(True, False))
+                if finish > start]
+
+    def get_idle_gaps(self, start, end):
+        """Returns the (start, end) TimeStamp pairs of the periods in the window
+        [start, end) in which the robot has no task
+        """
+        window_start, window_end = start.ns, end.ns
+        gaps = list()
+        for gap_start, gap_end, _, _ in self.__gaps(window_start, window_end):
+            gap_start = window_start if gap_start is None else max(gap_start, window_start)
+            gap_end = window_end if gap_end is None else min(gap_end, window_end)
+            if gap_start < gap_end:
+                gaps.append((TimeStamp.from_ns(gap_start, start.tz), TimeStamp.from_ns(gap_end, start.tz)))
+        return gaps
+
+    def find_insertions(self, request, duration, travel_time=None):
+        """Returns the positions at which a task for the given request can be inserted,
+        i.e. the idle gaps in which the task can start within the request's pickup window
+
+        Args:
+            request (TaskRequest): request with the earliest and latest pickup times
+            duration (timedelta): estimated duration of the task
+            travel_time (timedelta): minimum time between the task and the previous
+                                     and next task of the robot
+
+        Returns: list of (start time, previous task ID, next task ID) tuples sorted
+                 by the start times, where the start time (TimeStamp) is the earliest
+                 feasible start in the gap and the task IDs are None at the ends of
+                 the schedule
+        """
+        earliest = request.earliest_pickup_time.ns
+        latest = request.latest_pickup_time.ns
+        duration = _to_ns(duration)
+        travel_time = _to_ns(travel_time)
+        tz = request.earliest_pickup_time.tz
+
+        insertions = list()
+        for gap_start, gap_end, previous_id, next_id in self.__gaps(earliest, latest + duration + travel_time):
+            start = earliest
+            if gap_start is not None:
+                start = max(start, gap_start + travel_time)
+            if start > latest:
+                break
+            if gap_end is None or start + duration + travel_time <= gap_end:
+                insertions.append((TimeStamp.from_ns(start, tz), previous_id, next_id))
+        return insertions
+
+    def find_earliest_insertion(self, request, duration, travel_time=None):
+        """Returns the first position (see find_insertions) or None if there is none"""
+        insertions = self.find_insertions(request, duration, travel_time)
+        return insertions[0] if insertions else None
+
+    def postpone(self, task_id, delta, travel_time=None):
+        """Postpones a task (see Task.postpone_task) together with the following tasks
+        that would otherwise overlap with it (the ripple effect); the start times of the
+        tasks are postponed as well if they are already set
+
+        Args:
+            task_id: ID of the task
+            delta (timedelta): time by which the task is postponed
+            travel_time (timedelta): minimum time between consecutive tasks
+
+        Returns: list of (task, delay) pairs of the postponed tasks
+        """
+        travel_time = _to_ns(travel_time)
+        start, finish, _ = entry = self.__keys[task_id]
+        shift = _to_ns(delta)
+        shifts = [(task_id, shift)]
+
+        # the new intervals are computed before the timeline is changed
+        cursor = finish + shift
+        for next_start, next_finish, next_id in self.__entries.irange(entry, inclusive=(False, True)):
+            if next_start >= cursor + travel_time:
+                break
+            next_shift = cursor + travel_time - next_start
+            shifts.append((next_id, next_shift))
+            cursor = next_finish + next_shift
+
+        postponed = list()
+        for shifted_id, shift in shifts:
+            task = self.__tasks[shifted_id]
+            delay = datetime.timedelta(microseconds=shift // 1000)
+            task.postpone_task(delay)
+            if isinstance(task.start_time, TimeStamp):
+                task.start_time += delay
+            self.add(task)
+            postponed.append((task, delay))
+        return postponed
+
+    def __max_duration(self):
+        return self.__durations[-1] if self.__durations else 0
+
+    def __gaps(self, start, end):
+        """Returns the (gap start, gap end, previous task ID, next task ID) tuples of the idle
+        periods between the tasks that overlap the window [start, end), sorted by their starts;
+        the gap start is None before the first task of the schedule and the gap end is None
+        after the last one
+        """
+        entries = self.__entries
+        max_duration = self.__max_duration()
+        first = entries.bisect_left((start - max_duration,))
+        last = entries.bisect_left((end,))
+
+        # the task before the window that finishes last; only tasks starting
+        # at most max_duration before its finish can finish even later
+        previous_finish = None
+        previous_id = None
+        index = first - 1
+        while index >= 0:
+            entry_start, entry_finish, entry_id = entries[index]
+            if previous_finish is not None and entry_start + max_duration <= previous_finish:
+                break
+            if previous_finish is None or entry_finish > previous_finish:
+                previous_finish, previous_id = entry_finish, entry_id
+            index -= 1
+
+        gaps = list()
+        for index in range(first, last):
+            entry_start, entry_finish, entry_id = entries[index]
+            if previous_finish is None or entry_start > previous_finish:
+                gaps.append((previous_finish, entry_start, previous_id, entry_id))
+            if previous_finish is None or entry_finish >= previous_finish:
+                previous_finish, previous_id = entry_finish, entry_id
+
+        next_start, next_id = (entries[last][0], entries[last][2]) if last < len(entries) else (None, None)
+        if next_start is None or previous_finish is None or next_start > previous_finish:
+            gaps.append((previous_finish, next_start, previous_id, next_id))
+        return gaps
+
+
+class FleetTimelines(object):
+    """The RobotTimelines of a fleet, used to evaluate a request for all robots at once,
+    e.g. for the bids of an auction-style allocation
+
+    Args:
+        timelines (list): RobotTimeline objects
+    """
+    def __init__(self, timelines=None):
+        self.__timelines = dict()
+        for timeline in timelines or list():
+            self.add(timeline)
+
+    def __len__(self):
+        return len(self.__timelines)
+
+    def __iter__(self):
+        return iter(self.__timelines.values())
+
+    def add(self, timeline):
+        """Adds (or replaces) the timeline of a robot"""
+        self.__timelines[timeline.robot_id] = timeline
+
+    def remove(self, robot_id):
+        """Removes the timeline of a robot and returns it"""
+        return self.__timelines.pop(robot_id)
+
+    def get(self, robot_id):
+        """Returns the timeline of the given robot or None"""
+        return self.__timelines.get(robot_id)
+
+    def evaluate_request(self, request, duration, travel_time=None):
+        """Returns the earliest insertion of a task for the request in the schedule of each robot
+
+        Returns: list of (start time, robot ID, previous task ID, next task ID) tuples sorted
+                 by the start times (see RobotTimeline.find_insertions); robots in whose
+                 schedules the task cannot be inserted are left out
+        """
+        insertions = list()
+        for robot_id, timeline in self.__timelines.items():
+            insertion = timeline.find_earliest_insertion(request, duration, travel_time)
+            if insertion is not None:
+                start_time, previous_id, next_id = insertion
+                insertions.append((start_time, robot_id, previous_id, next_id))
+        insertions.sort(key=lambda insertion: insertion[0].ns)
+        return insertions
@@ -0,0 +1,225 @@
+"""Field-level deltas between dictionary representations of structs (e.g. Task.to_dict).
+
+A delta lists the values that changed between two versions of a dictionary:
+
+    {'version': 5, 'baseVersion': 4, 'epoch': '6c1f...',
+     'set': [[['status', 'status'], 4], [['robot_actions', 'ropod_001', 0, 'status'], 'ongoing']],
+     'unset': [['finish_time']]}
+
+Each path is a list of dictionary keys and list indices; nested dictionaries and
+lists of the same length are compared item by item, while other changed values
+(including lists whose length changed) are replaced as a whole. A delta whose
+baseVersion is None is a full snapshot; it sets the empty path, i.e. the whole
+dictionary. A receiver can only apply a delta to the version it was computed
+from, so a missing delta is detected from the versions and the receiver has
+to wait for (or ask for) the next snapshot. The versions of a struct start at 1
+in each epoch, i.e. whenever a sender starts encoding the struct (e.g. after
+the sender restarted or forgot the struct), so a receiver compares versions
+only within the same epoch and applies the snapshot of a new epoch.
+"""
+import copy
+
+from ropod.utils.uuid import generate_uuid
+
+
+def diff(old, new):
+    """Returns the (set, unset) operations that turn old into new
+
+    Args:
+        old: dictionary (or list/value) of the previous version
+        new: dictionary (or list/value) of the new version
+
+    Returns: set (list of [path, value] pairs), unset (list of paths)
+    """
+    set_ops = list()
+    unset_ops = list()
+    if old != new:
+        _diff(old, new, [], set_ops, unset_ops)
+    return set_ops, unset_ops
+
+
+def _diff(old, new, path, set_ops, unset_ops):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                set_ops.append([path + [key], value])
+            elif old[key] != value:
+                _diff(old[key], value, path + [key], set_ops, unset_ops)
+        for key in old:
+            if key not in new:
+                unset_ops.append(path + [key])
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (old_value, value) in enumerate(zip(old, new)):
+            if old_value != value:
+                _diff(old_value, value, path + [index], set_ops, unset_ops)
+    else:
+        set_ops.append([path, new])
+
+
+def copy_document(document):
+    """Returns a copy of the nested dictionaries and lists of a document;
+    other values are not copied (cheaper than copy.deepcopy)
+    """
+    if isinstance(document, dict):
+        return {key: copy_document(value) for key, value in document.items()}
+    if isinstance(document, list):
+        return [copy_document(value) for value in document]
+    return document
+
+
+def patch(document, set_ops, unset_ops):
+    """Returns the document with the given operations applied. The document is not
+    modified: the dictionaries and lists along the changed paths are copied, while
+    the unchanged parts are shared between the document and the returned version.
+    """
+    copies = dict()
+    root = [document]
+    for path, value in set_ops:
+        container, key = _parent(root, path, copies)
+        container[key] = value
+    for path in unset_ops:
+        container, key = _parent(root, path, copies)
+        container.pop(key, None)
+    return root[0]
+
+
+def _parent(root, path, copies):
+    """Returns the (copied) container of the last element of the path and its key"""
+    container = root
+    key = 0
+    for next_key in path:
+        child = container[key]
+        if id(child) not in copies:
+            child = copy.copy(child)
+            container[key] = child
+            copies[id(child)] = child
+        container = child
+        key = next_key
+    return container, key
+
+
+class DeltaEncoder(object):
+    """Creates the deltas of successive versions of structs on the sending side
+
+    The encoder keeps (a copy of) the last encoded dictionary and its version for each
+    struct key, such that each call only sends the fields that changed since the previous one.
+
+    Args:
+        snapshot_interval (int): a full snapshot is sent after this number of deltas,
+                                 so that receivers that missed a delta can recover;
+                                 only on the first encoding and on reset if None
+    """
+    def __init__(self, snapshot_interval=None):
+        self.snapshot_interval = snapshot_interval
+        self.__versions = dict()
+        self.__dicts = dict()
+        self.__deltas_since_snapshot = dict()
+        self.__epochs = dict()
+
+    def encode(self, key, struct_dict, snapshot=False):
+        """Returns the delta between the last encoded version of the struct with the
+        given key and struct_dict, or a full snapshot
+
+        Args:
+            key: key of the struct (e.g. the task ID)
+            struct_dict (dict): dictionary representation of the new version of the struct
+            snapshot (bool): whether a full snapshot is created instead of a delta
+
+        Returns: dictionary with the version, baseVersion, epoch, set and unset entries (see diff)
+        """
+        epoch = self.__epochs.get(key)
+        if epoch is None:
+            epoch = self.__epochs[key] = str(generate_uuid())
+        base_version = self.__versions.get(key, 0)
+        version = base_version + 1
+        deltas = self.__deltas_since_snapshot.get(key, 0)
+        if self.snapshot_interval is not None and deltas >= self.snapshot_interval:
+            snapshot = True
+
+        if snapshot or key not in self.__dicts:
+            delta = {'version': version, 'baseVersion': None, 'epoch': epoch,
+                     'set': [[[], struct_dict]], 'unset': list()}
+            self.__deltas_since_snapshot[key] = 0
+        else:
+            set_ops, unset_ops = diff(self.__dicts[key], struct_dict)
+            delta = {'version': version, 'baseVersion': base_version, 'epoch': epoch,
+                     'set': set_ops, 'unset': unset_ops}
+            self.__deltas_since_snapshot[key] = deltas + 1
+
+        self.__versions[key] = version
+        # struct dictionaries can share mutable values with the struct
+        self.__dicts[key] = copy_document(struct_dict)
+        return delta
+
+    def reset(self, key=None):
+        """Makes the next encoding of the struct with the given key (or of all structs)
+        create a full snapshot; the versions are kept, so that the snapshot is newer
+        than the versions that the receivers have
+        """
+        if key is None:
+            self.__dicts.clear()
+        else:
+            self.__dicts.pop(key, None)
+
+    def forget(self, key):
+        """Removes the struct with the given key (e.g. a task that is finished); the
+        next encoding of a struct with the key starts a new epoch with a snapshot
+        """
+        self.__versions.pop(key, None)
+        self.__dicts.pop(key, None)
+        self.__deltas_since_snapshot.pop(key, None)
+        self.__epochs.pop(key, None)
+
+
+class DeltaDecoder(object):
+    """Applies the deltas of successive versions of structs on the receiving side
+
+    The dictionaries returned by apply share their unchanged parts with the previous
+    versions and must not be modified.
+    """
+    def __init__(self):
+        self.__versions = dict()
+        self.__dicts = dict()
+        self.__epochs = dict()
+
+    def get(self, key):
+        """Returns the last decoded dictionary of the struct with the given key or None"""
+        return self.__dicts.get(key)
+
+    def get_version(self, key):
+        """Returns the last decoded version of the struct with the given key or None"""
+        return self.__versions.get(key)
+
+    def apply(self, key, delta):
+        """Applies a delta (or snapshot) to the last version of the struct with the given key
+
+        Returns: the dictionary of the new version, or None if the delta cannot be
+                 applied because a previous delta is missing (a snapshot is then needed)
+        """
+        version = self.__versions.get(key)
+        if delta.get('epoch') != self.__epochs.get(key):
+            # the versions of another epoch cannot be compared,
+            # so only a snapshot of the new epoch can be applied
+            if delta['baseVersion'] is not None:
+                return None
+        elif delta['baseVersion'] is not None:
+            if version is not None and delta['version'] <= version:
+                # a delta that was already applied
+                return self.__dicts[key]
+            if version != delta['baseVersion']:
+                return None
+        elif version is not None and delta['version'] < version:
+            # an outdated snapshot
+            return self.__dicts[key]
+
+        struct_dict = patch(self.__dicts.get(key), delta['set'], delta['unset'])
+        self.__versions[key] = delta['version']
+        self.__dicts[key] = struct_dict
+        self.__epochs[key] = delta.get('epoch')
+        return struct_dict
+
+    def forget(self, key):
+        """Removes the struct with the given key"""
+        self.__versions.pop(key, None)
+        self.__dicts.pop(key, None)
+        self.__epochs.pop(key, None)
@@ -1,10 +1,16 @@
+from ropod.utils.delta import DeltaEncoder
 from ropod.utils.timestamp import TimeStamp
 from ropod.utils.uuid import generate_uuid
+from ropod.structs.robot import Robot
 from ropod.structs.task import Task, TaskRequest
 from ropod.structs.elevator import ElevatorRequest, RobotCallUpdate, RobotElevatorCallReply
 
 meta_model_template = 'ropod-%s-schema.json'
 
+# number of delta messages of a task or robot after which a full snapshot is sent,
+# such that receivers that missed a delta recover without requesting a resync
+DELTA_SNAPSHOT_INTERVAL = 20
+
 
 class MessageFactoryBase(object):
     def __init__(self):
@@ -75,7 +81,7 @@ class MessageFactoryBase(object):
 
 
 class RopodMessageFactory(MessageFactoryBase):
-    def __init__(self):
+    def __init__(self, delta_snapshot_interval=DELTA_SNAPSHOT_INTERVAL):
         super().__init__()
 
         self.register_msg(Task.__name__, self)
@@ -84,6 +90,8 @@ class RopodMessageFactory(MessageFactoryBase):
         self.register_msg(RobotCallUpdate.__name__, self)
         self.register_msg(RobotElevatorCallReply.__name__, self)
 
+        self.delta_encoder = DeltaEncoder(delta_snapshot_interval)
+
     def create_message(self, contents, recipients=[]):
         if isinstance(contents, Task):
             model = 'TASK'
@@ -101,6 +109,72 @@ class RopodMessageFactory(MessageFactoryBase):
         msg.update(payload)
         return msg
 
+    def create_delta_message(self, contents, recipients=[], snapshot=False):
+        '''Returns a message with the fields of a Task or Robot that changed since
+        the last delta message of the same task or robot (see ropod.utils.delta);
+        the first message of a task or robot and every delta_snapshot_interval-th
+        message after it are full snapshots. The message types are TASK-DELTA and
+        ROBOT-DELTA; a receiver that cannot apply a delta (ropod.utils.delta.DeltaDecoder.apply
+        returns None) can request a snapshot with create_delta_resync_message.
+
+        Keyword arguments:
+        :contents: a Task or Robot object
+        :recipients: list of strings
+        :snapshot: boolean; whether a full snapshot is sent (e.g. when a
+                   receiver missed a delta)
+
+        '''
+        if isinstance(contents, Task):
+            model = 'TASK-DELTA'
+            key = contents.id
+        elif isinstance(contents, Robot):
+            model = 'ROBOT-DELTA'
+            key = contents.robot_id
+        else:
+            raise Exception("Delta messages can only be created for Task and Robot objects")
+
+        msg = self.get_header(model, recipients=recipients)
+        payload = self.delta_encoder.encode(key, contents.to_dict(), snapshot)
+        payload.update(id=key, metamodel=meta_model_template % model.lower())
+        msg.update(payload=payload)
+        return msg
+
+    def create_delta_resync_message(self, delta_msg, version=None, recipients=[]):
+        '''Returns a message requesting a full snapshot of the task or robot of a delta
+        message that could not be applied because a previous delta was missed.
+        The message types are TASK-DELTA-RESYNC and ROBOT-DELTA-RESYNC; the sender
+        passes the message to process_delta_resync_message.
+
+        Keyword arguments:
+        :delta_msg: the TASK-DELTA or ROBOT-DELTA message that could not be applied
+        :version: the last version of the task or robot known to the receiver (if any)
+        :recipients: list of strings
+
+        '''
+        model = delta_msg['header']['type'] + '-RESYNC'
+        msg = self.get_header(model, recipients=recipients)
+        msg.update(payload={'id': delta_msg['payload']['id'], 'version': version,
+                            'metamodel': meta_model_template % model.lower()})
+        return msg
+
+    def process_delta_resync_message(self, resync_msg):
+        '''Makes the next delta message of the task or robot whose snapshot
+        is requested by the given resync message a full snapshot
+        '''
+        self.delta_encoder.reset(resync_msg['payload']['id'])
+
+    def forget_delta_contents(self, key):
+        '''Forgets the last delta message of a task or robot, e.g. when the task
+        is finished, so that the delta encoder does not grow with every task
+        that passes through the factory; a later delta message of the task or
+        robot is a full snapshot
+
+        Keyword arguments:
+        :key: the ID of the task or robot
+
+        '''
+        self.delta_encoder.forget(key)
+
     def get_query_msg(self, msg_type, payload_key, payload_value, success, receiverId):
         '''Returns a dictionary representing a query response for the given
         message type.
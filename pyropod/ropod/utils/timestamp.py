@@ -1,14 +1,29 @@
-
-import dateutil.parser
 from datetime import timezone, datetime, timedelta
 
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _raise_naive_aware(timestamp, other):
+    # like datetime, timestamps with and without a time zone cannot be compared
+    raise TypeError("can't compare TimeStamps with and without a time zone: {0!r}, {1!r}".format(
+        timestamp, other))
+
 
 class TimeStamp:
     """A timestamp object that supports some of the operations of datetime objects.
 
+    The time is stored as an integer number of nanoseconds since the epoch (with
+    microsecond resolution, like datetime) together with the time zone of the time,
+    such that arithmetic and comparisons operate on integers. For timestamps
+    without a time zone, the nanoseconds refer to the wall-clock time;
+    timestamps with and without a time zone cannot be compared (a TypeError is raised).
+
     Args:
         delta: Can be an object of type datetime.timedelta or TimeStamp
     """
+    __slots__ = ('_ns', '_tz', '_str')
 
     def __init__(self, delta=None):
         """Constructor of the TimeStamp object.
@@ -18,56 +33,91 @@ class TimeStamp:
         Args:
             delta (timedelta): A timedelta object to be added to datetime.now()
         """
-        self._time = datetime.now()
+        self._ns = (datetime.now() - _EPOCH) // _MICROSECOND * 1000
+        self._tz = None
+        self._str = None
         if delta is not None:
-            self._time = self._time + delta
+            self._ns += delta // _MICROSECOND * 1000
 
     def __add__(self, delta):
         if isinstance(delta, timedelta):
-            return TimeStamp.from_datetime(self._time + delta)
+            return TimeStamp.from_ns(self._ns + delta // _MICROSECOND * 1000, self._tz)
         else:
             raise Exception("delta must be an object of datetime.timedelta.")
 
     def __sub__(self, delta):
         if isinstance(delta, timedelta):
-            return TimeStamp.from_datetime(self._time - delta)
+            return TimeStamp.from_ns(self._ns - delta // _MICROSECOND * 1000, self._tz)
         # if isinstance(delta, TimeStamp):
         #     return self._time - delta._time
         else:
             raise Exception("delta must be an object of datetime.timedelta.")
 
     def __gt__(self, other):
-        return self._time > other._time
+        if (self._tz is None) != (other._tz is None):
+            _raise_naive_aware(self, other)
+        return self._ns > other._ns
 
     def __lt__(self, other):
-        return self._time < other._time
+        if (self._tz is None) != (other._tz is None):
+            _raise_naive_aware(self, other)
+        return self._ns < other._ns
 
     def __ge__(self, other):
-        return self._time >= other._time
+        if (self._tz is None) != (other._tz is None):
+            _raise_naive_aware(self, other)
+        return self._ns >= other._ns
 
     def __le__(self, other):
-        return self._time <= other._time
+        if (self._tz is None) != (other._tz is None):
+            _raise_naive_aware(self, other)
+        return self._ns <= other._ns
+
+    def __eq__(self, other):
+        if not isinstance(other, TimeStamp):
+            return NotImplemented
+        # like datetime, timestamps with and without a time zone are never equal
+        # (only the ordering comparisons raise a TypeError)
+        return self._ns == other._ns and (self._tz is None) == (other._tz is None)
+
+    def __hash__(self):
+        return hash(self._ns)
 
     def __str__(self):
-        return self._time.isoformat()
+        return self.to_str()
 
     def __repr__(self):
-        return "TimeStamp(%s)" % self._time.isoformat()
+        return "TimeStamp(%s)" % self.to_str()
 
     @property
     def timestamp(self):
-        return self._time.timestamp()
+        if self._tz is None:
+            # the wall-clock time is converted using the local time zone
+            return self.to_datetime().timestamp()
+        return self._ns // 1000 / 10**6
 
     @timestamp.setter
     def timestamp(self, value):
         if not isinstance(value, datetime):
             raise Exception("value must be an object of datetime.datetime")
 
-        self._time = value
+        self._set_datetime(value)
+
+    @property
+    def ns(self):
+        """Nanoseconds since the epoch (of the wall-clock time for timestamps without a time zone)"""
+        return self._ns
+
+    @property
+    def tz(self):
+        """Time zone of the timestamp (None for wall-clock timestamps)"""
+        return self._tz
 
     def to_str(self):
         """Returns the timestamp as a string in ISO format"""
-        return self._time.isoformat()
+        if self._str is None:
+            self._str = self.to_datetime().isoformat()
+        return self._str
 
     def get_difference(self, other, resolution=None):
         """Returns the difference between itself and another TimeStamp object
@@ -83,25 +133,74 @@ class TimeStamp:
         _res = {'hours': 3600, 'minutes': 60, 'seconds': 1}.get(resolution)
 
         if isinstance(other, TimeStamp):
-            result = self._time - other._time
+            difference_ns = self._ns - other._ns
         else:
             raise Exception("Object must be of TimeStamp type")
 
         if resolution in ['hours', 'minutes', 'seconds']:
-            return result.total_seconds() / _res
+            return difference_ns / 1e9 / _res
+        else:
+            return timedelta(microseconds=difference_ns // 1000)
+
+    def _set_datetime(self, value):
+        if value.tzinfo is None or value.utcoffset() is None:
+            self._ns = (value - _EPOCH) // _MICROSECOND * 1000
+            self._tz = None
         else:
-            return result
+            self._ns = (value - _EPOCH_UTC) // _MICROSECOND * 1000
+            self._tz = value.tzinfo
+        self._str = None
+
+    @classmethod
+    def from_ns(cls, ns, tz=None):
+        """Creates a timestamp from nanoseconds since the epoch (truncated to microseconds)
+
+        Args:
+            ns (int): nanoseconds since the epoch; for timestamps without
+                      a time zone, of the wall-clock time
+            tz (tzinfo): time zone of the timestamp
+        """
+        x = cls.__new__(cls)
+        x._ns = ns - ns % 1000
+        x._tz = tz
+        x._str = None
+        return x
+
+    @classmethod
+    def now(cls, tz=None):
+        """Returns the current time in the given time zone, or the current
+        wall-clock time (like TimeStamp()) if tz is None
+        """
+        if tz is None:
+            return cls()
+        return cls.from_ns((datetime.now(timezone.utc) - _EPOCH_UTC) // _MICROSECOND * 1000, tz)
 
     @classmethod
     def from_datetime(cls, datetime):
-        x = cls()
-        x._time = datetime
+        x = cls.__new__(cls)
+        x._set_datetime(datetime)
         return x
 
     @classmethod
     def from_str(cls, iso_date):
-        t = dateutil.parser.parse(iso_date)
-        return cls.from_datetime(t)
+        """Creates a timestamp from a string in ISO format; strings that
+        datetime.fromisoformat cannot parse are parsed with dateutil
+        """
+        try:
+            t = datetime.fromisoformat(iso_date)
+        except ValueError:
+            import dateutil.parser
+            return cls.from_datetime(dateutil.parser.parse(iso_date))
+
+        x = cls.from_datetime(t)
+        # strings in the format of to_str (for timestamps without
+        # a time zone) are kept, such that they don't need to be formatted again
+        if iso_date[10:11] == 'T' and (len(iso_date) == 19 or (len(iso_date) == 26 and t.microsecond)):
+            x._str = iso_date
+        return x
 
     def to_datetime(self):
-        return self._time
+        time = _EPOCH + timedelta(microseconds=self._ns // 1000)
+        if self._tz is None:
+            return time
+        return time.replace(tzinfo=timezone.utc).astimezone(self._tz)
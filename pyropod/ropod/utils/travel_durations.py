@@ -0,0 +1,237 @@
+import collections
+import datetime
+import threading
+import time
+
+
+def _to_ns(delta):
+    return delta // datetime.timedelta(microseconds=1) * 1000
+
+
+def _to_timedelta(ns):
+    return datetime.timedelta(microseconds=ns // 1000)
+
+
+def _area_id(area):
+    """Returns the ID of an area, or its name if it has no ID (e.g. the areas
+    of task requests, which are only identified by their names)
+    """
+    return area.id if area.id is not None else area.name
+
+
+def area_pair_key(pickup_area, delivery_area):
+    """Returns the cache key of a pair of areas: their IDs (or names, for areas
+    without an ID) and floor numbers
+    """
+    return _area_id(pickup_area), pickup_area.floor_number, _area_id(delivery_area), delivery_area.floor_number
+
+
+class TravelDurationEstimator(object):
+    """Memoizes the estimated durations of tasks between pairs of areas (e.g. the
+    estimates of a path planner), keyed by the IDs and floors of the areas.
+
+    Estimates are evicted in least recently used order when max_size is exceeded and
+    expire after the time to live. The durations of completed tasks can be observed
+    to refine the estimates: the estimate of a pair is replaced by the exponential
+    moving average of the observed durations once min_samples durations were observed
+    (such learned estimates are kept when the planner estimates expire). The observations
+    of at most max_size pairs are kept as well, evicted in least recently observed order.
+
+    The lock of the estimator is not held while the estimate functions are called,
+    so that slow estimates do not delay the lookups of other threads.
+
+    Args:
+        estimate (function): estimate(pickup_area, delivery_area) returns the
+                             estimated duration (timedelta) for a pair of areas
+        estimate_many (function): optional function returning the estimated durations
+                                  for a list of (pickup_area, delivery_area) pairs,
+                                  used by get_many instead of calling estimate per pair
+        max_size (int): maximum number of cached estimates; no limit if None
+        ttl (timedelta): time to live of the estimates; no expiry if None
+        min_samples (int): number of observed durations after which they replace the estimate
+        alpha (float): weight of a new observation in the moving average
+        clock (function): returns the current time in seconds (for the expiry)
+    """
+    def __init__(self, estimate, estimate_many=None, max_size=10000, ttl=None,
+                 min_samples=3, alpha=0.2, clock=time.monotonic):
+        self.estimate = estimate
+        self.estimate_many = estimate_many
+        self.max_size = max_size
+        self.ttl = ttl.total_seconds() if ttl is not None else None
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.clock = clock
+
+        # key -> [duration in ns, expiry time]
+        self.__cache = collections.OrderedDict()
+        # key -> [average duration in ns, number of observations]
+        self.__observations = collections.OrderedDict()
+        # incremented on invalidations, so that estimates computed
+        # before an invalidation are not cached
+        self.__generation = 0
+        self.__area_keys = dict()
+        self.__listeners = list()
+        self.__lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.__cache)
+
+    def get(self, pickup_area, delivery_area):
+        """Returns the estimated duration (timedelta) between two areas"""
+        key = area_pair_key(pickup_area, delivery_area)
+        with self.__lock:
+            duration = self.__lookup(key)
+            if duration is not None:
+                return _to_timedelta(duration)
+            duration = self.__learned(key)
+            if duration is not None:
+                self.__store(key, duration)
+                return _to_timedelta(duration)
+            generation = self.__generation
+
+        duration = _to_ns(self.estimate(pickup_area, delivery_area))
+        with self.__lock:
+            if generation == self.__generation:
+                self.__store(key, duration)
+        return _to_timedelta(duration)
+
+    def get_many(self, pairs):
+        """Returns the estimated durations (timedeltas) of a list of (pickup_area,
+        delivery_area) pairs; the missing estimates of distinct pairs are computed
+        once (with estimate_many if given)
+        """
+        keys = [area_pair_key(pickup_area, delivery_area) for pickup_area, delivery_area in pairs]
+        with self.__lock:
+            durations = dict()
+            missing = dict()
+            for key, pair in zip(keys, pairs):
+                if key in durations or key in missing:
+                    continue
+                duration = self.__lookup(key)
+                if duration is not None:
+                    durations[key] = duration
+                    continue
+                duration = self.__learned(key)
+                if duration is None:
+                    missing[key] = pair
+                else:
+                    durations[key] = duration
+                    self.__store(key, duration)
+            generation = self.__generation
+
+        if missing:
+            if self.estimate_many is not None:
+                estimates = self.estimate_many(list(missing.values()))
+            else:
+                estimates = [self.estimate(*pair) for pair in missing.values()]
+            for key, estimate in zip(missing, estimates):
+                durations[key] = _to_ns(estimate)
+
+            with self.__lock:
+                if generation == self.__generation:
+                    for key in missing:
+                        self.__store(key, durations[key])
+        return [_to_timedelta(durations[key]) for key in keys]
+
+    def update_task(self, task):
+        """Updates the estimated duration of a task (see Task.update_task_estimated_duration)
+        with the estimate between its pickup and delivery areas
+        """
+        task.update_task_estimated_duration(self.get(task.pickup_pose, task.delivery_pose))
+
+    def observe(self, task):
+        """Refines the estimate between the pickup and delivery areas of a completed
+        task with its actual duration (finish_time - start_time)
+        """
+        if task.start_time is None or task.finish_time is None:
+            return
+        key = area_pair_key(task.pickup_pose, task.delivery_pose)
+        duration = task.finish_time.ns - task.start_time.ns
+
+        with self.__lock:
+            observation = self.__observations.get(key)
+            if observation is None:
+                observation = self.__observations[key] = [duration, 1]
+                self.__index(key)
+                if self.max_size is not None and len(self.__observations) > self.max_size:
+                    evicted, _ = self.__observations.popitem(last=False)
+                    if evicted not in self.__cache:
+                        self.__unindex(evicted)
+            else:
+                observation[0] += int(self.alpha * (duration - observation[0]))
+                observation[1] += 1
+                self.__observations.move_to_end(key)
+
+            if key in self.__cache and observation[1] >= self.min_samples:
+                self.__cache[key][0] = observation[0]
+
+    def invalidate(self, area_id=None):
+        """Removes the estimates (and observations) involving the area with the given ID
+        (or name, for areas without an ID), e.g. after the map of the area changed,
+        or all estimates if area_id is None
+        """
+        with self.__lock:
+            self.__generation += 1
+            if area_id is None:
+                keys = list(self.__cache) + [key for key in self.__observations if key not in self.__cache]
+                self.__cache.clear()
+                self.__observations.clear()
+                self.__area_keys.clear()
+            else:
+                keys = list(self.__area_keys.pop(area_id, ()))
+                for key in keys:
+                    self.__cache.pop(key, None)
+                    self.__observations.pop(key, None)
+                    other_area_id = key[2] if key[0] == area_id else key[0]
+                    other_keys = self.__area_keys.get(other_area_id)
+                    if other_keys is not None:
+                        other_keys.discard(key)
+
+            for listener in self.__listeners:
+                listener(keys)
+
+    def add_invalidation_listener(self, listener):
+        """Registers a function that is called with the list of invalidated keys
+        (see area_pair_key), e.g. to invalidate caches derived from the estimates
+        """
+        self.__listeners.append(listener)
+
+    def __lookup(self, key):
+        entry = self.__cache.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= self.clock()):
+            self.misses += 1
+            return None
+        self.__cache.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def __learned(self, key):
+        observation = self.__observations.get(key)
+        if observation is not None and observation[1] >= self.min_samples:
+            return observation[0]
+        return None
+
+    def __store(self, key, duration):
+        expiry = self.clock() + self.ttl if self.ttl is not None else None
+        self.__cache[key] = [duration, expiry]
+        self.__cache.move_to_end(key)
+        self.__index(key)
+        if self.max_size is not None and len(self.__cache) > self.max_size:
+            evicted, _ = self.__cache.popitem(last=False)
+            if evicted not in self.__observations:
+                self.__unindex(evicted)
+
+    def __index(self, key):
+        self.__area_keys.setdefault(key[0], set()).add(key)
+        self.__area_keys.setdefault(key[2], set()).add(key)
+
+    def __unindex(self, key):
+        for area_id in (key[0], key[2]):
+            keys = self.__area_keys.get(area_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__area_keys[area_id]
@@ -0,0 +1,123 @@
+import copy
+import datetime
+import gc
+import pickle
+import threading
+
+import pytest
+
+from ropod.structs.area import Area, AreaRegistry, FrozenArea, SubArea, area_registry
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+
+AREA_DICT = {'id': 'area_1', 'name': 'AMK_D_L-1_C41', 'floorNumber': -1, 'type': 'room',
+             'subAreas': [{'id': 'sub_1', 'name': 'charging_1', 'capacity': 2}]}
+
+
+def test_equal_dictionaries_share_one_area():
+    registry = AreaRegistry()
+    area = registry.intern_area_dict(AREA_DICT)
+
+    assert isinstance(area, FrozenArea)
+    assert registry.intern_area_dict(copy.deepcopy(AREA_DICT)) is area
+    assert area.sub_areas[0] is registry.intern_sub_area_dict(AREA_DICT['subAreas'][0])
+    assert registry.get('area_1') is area
+    assert area.to_dict() == Area.from_dict(AREA_DICT).to_dict()
+
+
+def test_changed_areas_are_new_instances():
+    registry = AreaRegistry()
+    area = registry.intern_area_dict(AREA_DICT)
+    changed_dict = copy.deepcopy(AREA_DICT)
+    changed_dict['subAreas'][0]['capacity'] = 3
+
+    changed = registry.intern_area_dict(changed_dict)
+
+    assert changed is not area
+    assert changed.sub_areas[0].capacity == 3
+    assert area.sub_areas[0].capacity == 2
+    assert registry.get('area_1') is changed
+
+
+def test_interned_areas_are_immutable_and_hashable():
+    area = AreaRegistry().intern_area_dict(AREA_DICT)
+
+    with pytest.raises(Exception):
+        area.name = 'other'
+    with pytest.raises(Exception):
+        del area.type
+    assert {area: 1}[area] == 1
+    assert copy.copy(area) is area and copy.deepcopy(area) is area
+    assert pickle.loads(pickle.dumps(area)) == area
+
+
+def test_thawed_areas_can_be_modified():
+    area = AreaRegistry().intern_area_dict(AREA_DICT)
+
+    thawed = area.thaw()
+    thawed.sub_areas[0].capacity = 5
+
+    assert type(thawed) is Area and type(thawed.sub_areas[0]) is SubArea
+    assert area.sub_areas[0].capacity == 2
+
+
+def test_areas_built_from_structs_are_interned():
+    registry = AreaRegistry()
+    area = Area.from_dict(AREA_DICT)
+
+    assert registry.intern(area) is registry.intern_area_dict(AREA_DICT)
+    assert registry.intern(registry.intern(area)) is registry.intern(area)
+
+
+def test_areas_without_an_id_are_not_indexed():
+    registry = AreaRegistry()
+    area = registry.intern_area_dict({'id': None, 'name': 'AMK_B_L4_C1'})
+
+    assert registry.get(None) is None
+    assert registry.intern_area_dict({'id': None, 'name': 'AMK_B_L4_C1'}) is area
+    assert registry.intern_area_dict({'id': None, 'name': 'AMK_B_L4_C2'}) is not area
+
+
+def test_unreferenced_areas_are_removed():
+    registry = AreaRegistry()
+    area = registry.intern_area_dict(AREA_DICT)
+    assert len(registry) == 1
+
+    del area
+    gc.collect()
+
+    assert len(registry) == 0
+    assert registry.get('area_1') is None
+
+
+def test_concurrent_interning_returns_one_instance():
+    registry = AreaRegistry()
+    areas = []
+    lock = threading.Lock()
+
+    def intern():
+        for _ in range(200):
+            area = registry.intern_area_dict(copy.deepcopy(AREA_DICT))
+            with lock:
+                areas.append(area)
+
+    threads = [threading.Thread(target=intern) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, areas))) == 1
+
+
+def test_tasks_share_their_areas():
+    start = TimeStamp.from_str('2020-01-01T10:00:00')
+    task_dict = Task(id='task_1', earliest_start_time=start, latest_start_time=start,
+                     estimated_duration=datetime.timedelta(minutes=10)).to_dict()
+    task_dict['pickup_pose'] = AREA_DICT
+    task_dict['delivery_pose'] = copy.deepcopy(AREA_DICT)
+
+    first, second = Task.from_dict(task_dict), Task.from_dict(copy.deepcopy(task_dict))
+
+    assert first.pickup_pose is second.pickup_pose is first.delivery_pose
+    assert first.pickup_pose is area_registry.get('area_1')
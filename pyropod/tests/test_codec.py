@@ -0,0 +1,233 @@
+"""The expected dictionaries are the output of the hand-written to_dict methods
+that the generated codecs replaced, for the same structs
+"""
+import datetime
+
+import pytest
+
+from ropod.structs.action import Action
+from ropod.structs.area import Area, SubArea, SubAreaReservation
+from ropod.structs.codec import Field, struct_codec
+from ropod.structs.elevator import Elevator, ElevatorRequest
+from ropod.structs.robot import Robot
+from ropod.structs.status import TaskStatus
+from ropod.structs.task import Task, TaskRequest
+from ropod.utils.timestamp import TimeStamp
+
+SUB_AREA_DICT = {'id': 'sub_1', 'name': 'charging_1', 'type': 'charging', 'capacity': 2}
+
+PICKUP_DICT = {'id': 'area_1', 'name': 'AMK_D_L-1_C41', 'floor_number': -1, 'type': 'room',
+               'subareas': [SUB_AREA_DICT]}
+
+DELIVERY_DICT = {'id': 'area_2', 'name': 'AMK_B_L4_C1', 'floor_number': 4}
+
+ACTION_DICT = {'_id': 'action_1', 'type': 'GOTO', 'start_floor': -1, 'goal_floor': -1,
+               'level': -1, 'elevator_id': -1, 'execution_status': 'pending', 'eta': 12.5,
+               'areas': [DELIVERY_DICT], 'subareas': [SUB_AREA_DICT]}
+
+TASK_DICT = {'id': 'task_1',
+             'loadType': 'Sickbed',
+             'loadId': 'load_1',
+             'team_robot_ids': ['ropod_001'],
+             'earliest_start_time': '2020-01-01T10:00:00',
+             'latest_start_time': '2020-01-01T10:10:00',
+             'estimated_duration': 15.0,
+             'earliest_finish_time': '2020-01-01T10:15:00',
+             'latest_finish_time': '2020-01-01T10:25:00',
+             'start_time': '2020-01-01T10:02:00',
+             'finish_time': None,
+             'pickup_pose': PICKUP_DICT,
+             'delivery_pose': DELIVERY_DICT,
+             'priority': 1,
+             'status': {'task_id': 'task_1', 'status': TaskStatus.ONGOING, 'delayed': False,
+                        'estimated_task_duration': -1.0,
+                        'current_robot_actions': {}, 'completed_robot_actions': {}},
+             'hard_constraints': True,
+             'robot_actions': {'ropod_001': [ACTION_DICT]}}
+
+REQUEST_DICT = {'id': 'request_1', 'pickupLocation': 'AMK_D_L-1_C41', 'pickupLocationLevel': -1,
+                'deliveryLocation': 'AMK_B_L4_C1', 'deliveryLocationLevel': 4,
+                'earliestPickupTime': '2020-01-01T10:00:00', 'latestPickupTime': '2020-01-01T10:10:00',
+                'userId': 'user_1', 'loadType': 'MobiDik', 'loadId': 'load_2', 'priority': 2}
+
+RESERVATION_DICT = {'subAreaId': 'sub_1', 'taskId': 'task_1', 'robotId': 'ropod_001',
+                    'startTime': '2020-01-01T10:00:00', 'endTime': '2020-01-01T10:05:00',
+                    'status': 'scheduled', 'requiredCapacity': 1}
+
+ELEVATOR_REQUEST_DICT = {'elevatorId': 1, 'operationalMode': 'ROBOT', 'startFloor': 0, 'goalFloor': 4,
+                         'queryId': 'query_1', 'command': 'CALL_ELEVATOR', 'load': 'MobiDik',
+                         'robotId': 'ropod_001', 'status': 0, 'taskId': 'task_1'}
+
+ELEVATOR_DICT = {'elevatorId': 2, 'floor': 3, 'calls': 1, 'isAvailable': True,
+                 'doorOpenAtGoalFloor': False, 'doorOpenAtStartFloor': False}
+
+
+def make_sub_area():
+    sub_area = SubArea()
+    sub_area.id = 'sub_1'
+    sub_area.name = 'charging_1'
+    sub_area.type = 'charging'
+    sub_area.capacity = 2
+    return sub_area
+
+
+def make_areas():
+    pickup_area = Area()
+    pickup_area.id = 'area_1'
+    pickup_area.name = 'AMK_D_L-1_C41'
+    pickup_area.floor_number = -1
+    pickup_area.type = 'room'
+    pickup_area.sub_areas = [make_sub_area()]
+
+    delivery_area = Area()
+    delivery_area.id = 'area_2'
+    delivery_area.name = 'AMK_B_L4_C1'
+    delivery_area.floor_number = 4
+    return pickup_area, delivery_area
+
+
+def make_action():
+    action = Action()
+    action.id = 'action_1'
+    action.type = 'GOTO'
+    action.areas = [make_areas()[1]]
+    action.subareas = [make_sub_area()]
+    action.execution_status = 'pending'
+    action.eta = 12.5
+    return action
+
+
+def test_sub_area_encoding():
+    assert make_sub_area().to_dict() == SUB_AREA_DICT
+
+
+def test_area_encoding_omits_empty_values():
+    pickup_area, delivery_area = make_areas()
+    assert pickup_area.to_dict() == PICKUP_DICT
+    assert delivery_area.to_dict() == DELIVERY_DICT
+
+
+def test_action_encoding():
+    assert make_action().to_dict() == ACTION_DICT
+
+
+def test_task_encoding():
+    pickup_area, delivery_area = make_areas()
+    task = Task(id='task_1', robot_actions={'ropod_001': [make_action()]}, team_robot_ids=['ropod_001'],
+                earliest_start_time=TimeStamp.from_str('2020-01-01T10:00:00'),
+                latest_start_time=TimeStamp.from_str('2020-01-01T10:10:00'),
+                estimated_duration=datetime.timedelta(minutes=15),
+                pickup_pose=pickup_area, delivery_pose=delivery_area,
+                loadType='Sickbed', loadId='load_1', priority=1,
+                start_time=TimeStamp.from_str('2020-01-01T10:02:00'))
+    task.status.status = TaskStatus.ONGOING
+
+    task_dict = task.to_dict()
+
+    assert task_dict == TASK_DICT
+    assert task_dict['team_robot_ids'] is not task.team_robot_ids
+
+
+def test_task_request_encoding():
+    pickup_area, delivery_area = make_areas()
+    request = TaskRequest(id='request_1')
+    request.pickup_pose = pickup_area
+    request.delivery_pose = delivery_area
+    request.earliest_pickup_time = TimeStamp.from_str('2020-01-01T10:00:00')
+    request.latest_pickup_time = TimeStamp.from_str('2020-01-01T10:10:00')
+    request.user_id = 'user_1'
+    request.load_type = 'MobiDik'
+    request.load_id = 'load_2'
+    request.priority = 2
+
+    assert request.to_dict() == REQUEST_DICT
+
+
+def test_reservation_round_trip():
+    reservation = SubAreaReservation.from_dict(RESERVATION_DICT)
+
+    assert reservation.start_time == TimeStamp.from_str('2020-01-01T10:00:00')
+    assert reservation.to_dict() == RESERVATION_DICT
+
+
+def test_elevator_round_trips():
+    request = ElevatorRequest('query_1', 0, 4, 'CALL_ELEVATOR', task_id='task_1',
+                              load='MobiDik', robot_id='ropod_001')
+    elevator = Elevator(2)
+    elevator.floor = 3
+    elevator.calls = 1
+    elevator.is_available = True
+
+    assert request.to_dict() == ELEVATOR_REQUEST_DICT
+    assert elevator.to_dict() == ELEVATOR_DICT
+    assert ElevatorRequest.from_dict(ELEVATOR_REQUEST_DICT).to_dict() == ELEVATOR_REQUEST_DICT
+    assert Elevator.from_dict(ELEVATOR_DICT).to_dict() == ELEVATOR_DICT
+
+
+def test_areas_are_decoded_from_camel_case_keys():
+    area = Area.from_dict({'id': 'area_1', 'name': 'AMK_D_L-1_C41', 'floorNumber': -1, 'type': 'room',
+                           'subAreas': [SUB_AREA_DICT]})
+
+    assert area.to_dict() == PICKUP_DICT
+
+
+def test_task_decoding():
+    task_dict = dict(TASK_DICT, hard_constraints=False,
+                     status=dict(TASK_DICT['status'], estimated_task_duration=15.0))
+    task_dict['robot_actions'] = {'ropod_001': [dict(ACTION_DICT, id='action_1')]}
+
+    task = Task.from_dict(task_dict)
+
+    assert task.estimated_duration == datetime.timedelta(minutes=15)
+    assert task.status.estimated_task_duration == datetime.timedelta(minutes=15)
+    assert task.earliest_start_time == TimeStamp.from_str('2020-01-01T10:00:00')
+    assert task.finish_time is None
+    assert task.hard_constraints is False
+    action = task.robot_actions['ropod_001'][0]
+    assert (action.id, action.type, action.eta) == ('action_1', 'GOTO', 12.5)
+    assert [sub_area.to_dict() for sub_area in action.subareas] == [SUB_AREA_DICT]
+
+
+def test_task_request_decoding_from_the_json_schema():
+    request = TaskRequest.from_dict(REQUEST_DICT)
+
+    assert request.pickup_pose.name == 'AMK_D_L-1_C41'
+    assert request.pickup_pose.floor_number == -1
+    assert request.delivery_pose.floor_number == 4
+    assert request.to_dict() == REQUEST_DICT
+
+
+def test_robot_encoding():
+    robot = Robot('ropod_001', uuid='uuid_1', version={'hardware': {}, 'software': {}}, nickname='r1')
+    robot_dict = robot.to_dict()
+
+    assert robot_dict['robotId'] == 'ropod_001'
+    assert robot_dict['uuid'] == 'uuid_1'
+    assert robot_dict['nickname'] == 'r1'
+    assert robot_dict['version'] == {'hardware': {}, 'software': {}}
+    assert Robot.from_dict(robot_dict).to_dict() == robot_dict
+
+
+def test_every_slot_needs_a_field():
+    with pytest.raises(ValueError):
+        @struct_codec
+        class Incomplete(object):
+            __slots__ = ('id', 'name')
+            FIELDS = (Field('id'),)
+
+
+def test_generated_codec_of_a_new_struct():
+    @struct_codec
+    class Reading(object):
+        __slots__ = ('sensor_id', 'time', 'values', 'note')
+        FIELDS = (Field('sensor_id', key='sensorId'),
+                  Field('time', type=TimeStamp),
+                  Field('values'),
+                  Field('note', optional=True, omit_empty=True))
+
+    reading = Reading.from_dict({'sensorId': 's1', 'time': '2020-01-01T10:00:00', 'values': [1, 2]})
+
+    assert reading.sensor_id == 's1'
+    assert reading.time == TimeStamp.from_str('2020-01-01T10:00:00')
+    assert reading.note is None
+    assert reading.to_dict() == {'sensorId': 's1', 'time': '2020-01-01T10:00:00', 'values': [1, 2]}
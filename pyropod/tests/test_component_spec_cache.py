@@ -0,0 +1,112 @@
+from ropod.ftsm import component_spec_cache
+from ropod.ftsm.component_spec_cache import ComponentSpecCache
+from ropod.ftsm.robot_store import InMemoryRobotStore
+
+
+class CountingRobotStore(InMemoryRobotStore):
+    '''In-memory store that counts the specification queries'''
+    def __init__(self):
+        super(CountingRobotStore, self).__init__()
+        self.bulk_queries = 0
+        self.single_queries = 0
+
+    def get_component_specs(self):
+        self.bulk_queries += 1
+        return super(CountingRobotStore, self).get_component_specs()
+
+    def get_component_spec(self, component_name):
+        self.single_queries += 1
+        return super(CountingRobotStore, self).get_component_spec(component_name)
+
+
+def spec(component_name, dependencies=()):
+    return {'component_name': component_name, 'dependencies': list(dependencies)}
+
+
+def test_specs_are_loaded_in_one_query():
+    store = CountingRobotStore()
+    store.add_component_spec(spec('laser', ['power']))
+    store.add_component_spec(spec('wheels'))
+    cache = ComponentSpecCache(store)
+
+    assert cache.get_spec('laser') == spec('laser', ['power'])
+    assert cache.get_spec('wheels') == spec('wheels')
+    assert store.bulk_queries == 1
+    assert store.single_queries == 0
+
+
+def test_cached_specs_are_copied():
+    store = CountingRobotStore()
+    store.add_component_spec(spec('laser', ['power']))
+    cache = ComponentSpecCache(store)
+
+    cache.get_spec('laser')['dependencies'].append('wheels')
+
+    assert cache.get_spec('laser') == spec('laser', ['power'])
+
+
+def test_unknown_specs_are_looked_up_individually():
+    store = CountingRobotStore()
+    cache = ComponentSpecCache(store)
+    cache.load()
+    store.add_component_spec(spec('laser'))
+    store.bulk_queries = 0
+
+    assert cache.get_spec('battery') is None
+    assert store.single_queries == 1
+    assert store.bulk_queries == 0
+
+
+def test_spec_changes_invalidate_the_cache():
+    store = CountingRobotStore()
+    store.add_component_spec(spec('laser'))
+    cache = ComponentSpecCache(store)
+    cache.load()
+    version = cache.version
+
+    store.add_component_spec(spec('laser', ['power']))
+
+    assert cache.version > version
+    assert cache.get_spec('laser') == spec('laser', ['power'])
+
+
+def test_specs_read_during_an_invalidation_are_not_cached():
+    store = CountingRobotStore()
+    store.add_component_spec(spec('laser'))
+    cache = ComponentSpecCache(store)
+
+    get_component_specs = store.get_component_specs
+
+    def get_changing_specs():
+        specs = get_component_specs()
+        store.add_component_spec(spec('laser', ['power']))
+        return specs
+
+    store.get_component_specs = get_changing_specs
+    cache.load()
+    store.get_component_specs = get_component_specs
+
+    assert cache.get_spec('laser') == spec('laser', ['power'])
+
+
+def test_specs_expire_after_max_age(monkeypatch):
+    now = [100.]
+    monkeypatch.setattr(component_spec_cache.time, 'monotonic', lambda: now[0])
+    store = CountingRobotStore()
+    store.add_component_spec(spec('laser'))
+    cache = ComponentSpecCache(store, max_age=10.)
+    cache.get_spec('laser')
+
+    now[0] = 105.
+    cache.get_spec('laser')
+    assert store.bulk_queries == 1
+
+    now[0] = 111.
+    cache.get_spec('laser')
+    assert store.bulk_queries == 2
+
+
+def test_caches_are_shared_per_store():
+    store = InMemoryRobotStore()
+    assert ComponentSpecCache.get_cache(store) is ComponentSpecCache.get_cache(store)
+    assert ComponentSpecCache.get_cache(InMemoryRobotStore()) is not ComponentSpecCache.get_cache(store)
@@ -0,0 +1,215 @@
+import copy
+import datetime
+import random
+
+from ropod.structs.robot import Robot
+from ropod.structs.task import Task
+from ropod.utils.delta import DeltaDecoder, DeltaEncoder, copy_document, diff, patch
+from ropod.utils.models import RopodMessageFactory
+from ropod.utils.timestamp import TimeStamp
+
+OLD = {'id': 'task_1', 'status': {'status': 11, 'delayed': False},
+       'team_robot_ids': ['ropod_001'],
+       'robot_actions': {'ropod_001': [{'id': 'a1', 'status': 'planned'}, {'id': 'a2', 'status': 'planned'}]},
+       'finish_time': None}
+
+
+def test_diff_lists_the_changed_paths():
+    new = copy.deepcopy(OLD)
+    new['status']['status'] = 6
+    new['robot_actions']['ropod_001'][0]['status'] = 'ongoing'
+    new['team_robot_ids'].append('ropod_002')
+    del new['finish_time']
+
+    set_ops, unset_ops = diff(OLD, new)
+
+    assert sorted(set_ops) == sorted([[['status', 'status'], 6],
+                                      [['robot_actions', 'ropod_001', 0, 'status'], 'ongoing'],
+                                      [['team_robot_ids'], ['ropod_001', 'ropod_002']]])
+    assert unset_ops == [['finish_time']]
+    assert diff(OLD, copy.deepcopy(OLD)) == ([], [])
+
+
+def test_patch_shares_the_unchanged_parts():
+    new = copy.deepcopy(OLD)
+    new['status']['status'] = 6
+    old = copy.deepcopy(OLD)
+
+    patched = patch(old, *diff(old, new))
+
+    assert patched == new
+    assert old == OLD
+    assert patched['robot_actions'] is old['robot_actions']
+    assert patched['status'] is not old['status']
+
+
+def random_document(depth=0):
+    if depth > 2 or random.random() < 0.3:
+        return random.choice([None, 1, 2, 'a', 'b', True])
+    if random.random() < 0.5:
+        return [random_document(depth + 1) for _ in range(random.randrange(3))]
+    return {random.choice('abcd'): random_document(depth + 1) for _ in range(random.randrange(4))}
+
+
+def test_patched_diffs_reproduce_random_documents():
+    random.seed(0)
+    for _ in range(500):
+        old = {'root': random_document()}
+        new = {'root': random_document()}
+        old_copy = copy_document(old)
+
+        assert patch(old, *diff(old, new)) == new
+        assert old == old_copy
+
+
+def test_decoder_follows_the_encoder():
+    encoder, decoder = DeltaEncoder(), DeltaDecoder()
+    versions = [dict(OLD, status={'status': status, 'delayed': False}) for status in (11, 12, 13)]
+
+    for version in versions:
+        delta = encoder.encode('task_1', version)
+        assert decoder.apply('task_1', delta) == version
+
+    assert decoder.get_version('task_1') == 3
+    assert decoder.get('task_1') == versions[-1]
+
+
+def test_missed_deltas_are_detected_and_resolved_by_a_snapshot():
+    encoder, decoder = DeltaEncoder(), DeltaDecoder()
+    decoder.apply('task_1', encoder.encode('task_1', OLD))
+    encoder.encode('task_1', dict(OLD, finish_time='2020-01-01T10:00:00'))
+    delta = encoder.encode('task_1', dict(OLD, finish_time='2020-01-01T11:00:00'))
+
+    assert decoder.apply('task_1', delta) is None
+    assert decoder.get_version('task_1') == 1
+
+    encoder.reset('task_1')
+    snapshot = encoder.encode('task_1', dict(OLD, finish_time='2020-01-01T11:00:00'))
+    assert snapshot['baseVersion'] is None
+    assert decoder.apply('task_1', snapshot)['finish_time'] == '2020-01-01T11:00:00'
+    assert decoder.get_version('task_1') == 4
+
+
+def test_snapshots_are_sent_after_the_snapshot_interval():
+    encoder = DeltaEncoder(snapshot_interval=2)
+    base_versions = [encoder.encode('task_1', dict(OLD, version=i))['baseVersion'] for i in range(7)]
+
+    assert base_versions == [None, 1, 2, None, 4, 5, None]
+
+
+def test_repeated_and_outdated_deltas_are_ignored():
+    encoder, decoder = DeltaEncoder(), DeltaDecoder()
+    first = encoder.encode('task_1', OLD)
+    second = encoder.encode('task_1', dict(OLD, finish_time='2020-01-01T10:00:00'))
+    decoder.apply('task_1', first)
+    decoder.apply('task_1', second)
+
+    assert decoder.apply('task_1', second)['finish_time'] == '2020-01-01T10:00:00'
+    assert decoder.apply('task_1', first)['finish_time'] == '2020-01-01T10:00:00'
+    assert decoder.get_version('task_1') == 2
+
+
+def test_snapshots_of_a_restarted_sender_are_applied():
+    encoder, decoder = DeltaEncoder(), DeltaDecoder()
+    for status in (11, 12, 13):
+        decoder.apply('task_1', encoder.encode('task_1', dict(OLD, status=status)))
+
+    restarted = DeltaEncoder()
+    first = restarted.encode('task_1', dict(OLD, status=4))
+    second = restarted.encode('task_1', dict(OLD, status=5))
+
+    # the deltas of the new sender cannot be applied before its snapshot
+    assert decoder.apply('task_1', second) is None
+    assert decoder.apply('task_1', first)['status'] == 4
+    assert decoder.apply('task_1', second)['status'] == 5
+    assert decoder.get_version('task_1') == 2
+
+
+def test_forgotten_structs_start_a_new_epoch():
+    encoder, decoder = DeltaEncoder(snapshot_interval=2), DeltaDecoder()
+    decoder.apply('task_1', encoder.encode('task_1', OLD))
+    decoder.apply('task_1', encoder.encode('task_1', dict(OLD, finish_time='2020-01-01T10:00:00')))
+
+    encoder.forget('task_1')
+    snapshot = encoder.encode('task_1', dict(OLD, status=4))
+
+    assert snapshot['version'] == 1 and snapshot['baseVersion'] is None
+    assert decoder.apply('task_1', snapshot) == dict(OLD, status=4)
+    assert decoder.apply('task_1', encoder.encode('task_1', dict(OLD, status=5)))['status'] == 5
+
+
+def test_encoded_dictionaries_can_be_modified_afterwards():
+    encoder = DeltaEncoder()
+    document = copy.deepcopy(OLD)
+    encoder.encode('task_1', document)
+    document['status']['status'] = 6
+
+    delta = encoder.encode('task_1', document)
+
+    assert delta['set'] == [[['status', 'status'], 6]]
+
+
+def make_task():
+    start = TimeStamp.from_str('2020-01-01T10:00:00')
+    return Task(id='task_1', robot_actions={}, team_robot_ids=['ropod_001'],
+                earliest_start_time=start, latest_start_time=start,
+                estimated_duration=datetime.timedelta(minutes=10), loadId='load_1')
+
+
+def test_delta_messages_reproduce_the_task():
+    factory, decoder = RopodMessageFactory(), DeltaDecoder()
+    task = make_task()
+
+    msg = factory.create_delta_message(task, recipients=['fms'])
+    assert msg['header']['type'] == 'TASK-DELTA'
+    assert msg['payload']['id'] == 'task_1'
+    decoder.apply('task_1', msg['payload'])
+
+    task.finish_time = TimeStamp.from_str('2020-01-01T10:12:00')
+    msg = factory.create_delta_message(task)
+    assert msg['payload']['set'] == [[['finish_time'], '2020-01-01T10:12:00']]
+    assert decoder.apply('task_1', msg['payload']) == task.to_dict()
+
+
+def test_resync_messages_request_a_snapshot():
+    factory, decoder = RopodMessageFactory(), DeltaDecoder()
+    robot = Robot('ropod_001', uuid='uuid_1', version={})
+    factory.create_delta_message(robot)
+    robot.position = 'A'
+    msg = factory.create_delta_message(robot)
+    assert decoder.apply('ropod_001', msg['payload']) is None
+
+    resync_msg = factory.create_delta_resync_message(msg, version=decoder.get_version('ropod_001'))
+    assert resync_msg['header']['type'] == 'ROBOT-DELTA-RESYNC'
+    assert resync_msg['payload']['id'] == 'ropod_001'
+    factory.process_delta_resync_message(resync_msg)
+
+    msg = factory.create_delta_message(robot)
+    assert msg['payload']['baseVersion'] is None
+    assert decoder.apply('ropod_001', msg['payload']) == robot.to_dict()
+
+
+def test_factories_send_snapshots_periodically():
+    factory = RopodMessageFactory(delta_snapshot_interval=3)
+    robot = Robot('ropod_001', uuid='uuid_1', version={})
+
+    base_versions = []
+    for position in range(9):
+        robot.position = position
+        base_versions.append(factory.create_delta_message(robot)['payload']['baseVersion'])
+
+    assert [i for i, base_version in enumerate(base_versions) if base_version is None] == [0, 4, 8]
+
+
+def test_factories_forget_finished_tasks():
+    factory, decoder = RopodMessageFactory(), DeltaDecoder()
+    task = make_task()
+    decoder.apply('task_1', factory.create_delta_message(task)['payload'])
+    task.finish_time = TimeStamp.from_str('2020-01-01T10:12:00')
+    decoder.apply('task_1', factory.create_delta_message(task)['payload'])
+
+    factory.forget_delta_contents('task_1')
+    msg = factory.create_delta_message(task)
+
+    assert msg['payload']['version'] == 1 and msg['payload']['baseVersion'] is None
+    assert decoder.apply('task_1', msg['payload']) == task.to_dict()
@@ -0,0 +1,142 @@
+from ropod.ftsm.depend_status_watcher import DependStatusWatcher
+from ropod.ftsm.robot_store import InMemoryRobotStore
+
+
+def status(component_id, health_status='nominal'):
+    return {'component_id': component_id,
+            'modes': [{'monitorName': 'monitor', 'healthStatus': {'status': health_status}}]}
+
+
+class Recorder(object):
+    def __init__(self):
+        self.docs = []
+
+    def __call__(self, status_doc):
+        self.docs.append(status_doc)
+
+    def statuses(self):
+        return [(doc['component_id'], doc['modes'][0]['healthStatus']['status'])
+                for doc in self.docs]
+
+
+def test_initial_statuses_are_read_when_the_stream_is_opened():
+    store = InMemoryRobotStore()
+    store.update_status(status('laser'))
+    watcher = DependStatusWatcher(store, max_await_time_ms=10)
+    recorder = Recorder()
+    watcher.subscribe(['laser', 'wheels'], recorder)
+
+    watcher.refresh()
+
+    assert watcher.has_stream
+    assert recorder.statuses() == [('laser', 'nominal')]
+
+
+def test_stream_reports_changes_of_subscribed_components():
+    store = InMemoryRobotStore()
+    watcher = DependStatusWatcher(store, max_await_time_ms=10)
+    recorder = Recorder()
+    watcher.subscribe(['laser'], recorder)
+    watcher.refresh()
+
+    store.update_status(status('laser', 'failure'))
+    store.update_status(status('wheels', 'failure'))
+    watcher.refresh()
+    watcher.refresh()
+
+    assert recorder.statuses() == [('laser', 'failure')]
+
+
+def test_unchanged_statuses_are_not_reported_again():
+    store = InMemoryRobotStore()
+    watcher = DependStatusWatcher(store, max_await_time_ms=10)
+    recorder = Recorder()
+    watcher.subscribe(['laser'], recorder)
+    watcher.refresh()
+
+    store.update_status(status('laser'))
+    store.update_status(status('laser'))
+    store.update_status(status('laser', 'failure'))
+    for _ in range(3):
+        watcher.refresh()
+
+    assert recorder.statuses() == [('laser', 'nominal'), ('laser', 'failure')]
+
+
+def test_subscribing_reports_the_known_status_immediately():
+    store = InMemoryRobotStore()
+    store.update_status(status('laser'))
+    watcher = DependStatusWatcher(store, max_await_time_ms=10)
+    first = Recorder()
+    watcher.subscribe(['laser'], first)
+    watcher.refresh()
+
+    second = Recorder()
+    watcher.subscribe(['laser'], second)
+
+    assert second.statuses() == [('laser', 'nominal')]
+
+
+def test_unsubscribed_callbacks_are_not_called():
+    store = InMemoryRobotStore()
+    watcher = DependStatusWatcher(store, max_await_time_ms=10)
+    recorder = Recorder()
+    watcher.subscribe(['laser'], recorder)
+    watcher.refresh()
+    watcher.unsubscribe(recorder)
+    watcher.refresh()
+
+    store.update_status(status('laser', 'failure'))
+    watcher.refresh()
+
+    assert recorder.docs == []
+    assert not watcher.has_stream
+
+
+class CountingRobotStore(InMemoryRobotStore):
+    '''In-memory store without status streams that counts the status queries'''
+    def __init__(self):
+        super(CountingRobotStore, self).__init__()
+        self.queries = []
+
+    def watch_statuses(self, component_ids, max_await_time_ms=500):
+        return None
+
+    def get_statuses(self, component_ids):
+        self.queries.append(sorted(component_ids))
+        return super(CountingRobotStore, self).get_statuses(component_ids)
+
+
+def test_polling_reads_all_statuses_in_one_query():
+    store = CountingRobotStore()
+    for component_id in ('laser', 'wheels', 'battery'):
+        store.update_status(status(component_id))
+    watcher = DependStatusWatcher(store)
+    first, second = Recorder(), Recorder()
+    watcher.subscribe(['laser', 'wheels'], first)
+    watcher.subscribe(['wheels', 'battery'], second)
+
+    watcher.refresh()
+
+    assert not watcher.has_stream
+    assert store.queries == [['battery', 'laser', 'wheels']]
+    assert sorted(first.statuses()) == [('laser', 'nominal'), ('wheels', 'nominal')]
+    assert sorted(second.statuses()) == [('battery', 'nominal'), ('wheels', 'nominal')]
+
+
+def test_polling_only_reports_changed_statuses():
+    store = CountingRobotStore()
+    store.update_status(status('laser'))
+    store.update_status(status('wheels'))
+    watcher = DependStatusWatcher(store)
+    recorder = Recorder()
+    watcher.subscribe(['laser', 'wheels'], recorder)
+    watcher.refresh()
+    del recorder.docs[:]
+
+    store.update_status(status('wheels', 'failure'))
+    watcher.poll()
+    watcher.poll()
+
+    assert recorder.statuses() == [('wheels', 'failure')]
+    assert len(store.queries) == 3
@@ -0,0 +1,148 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from ropod.structs.dispatch_queue import DispatchQueue
+from ropod.structs.task import Task, TaskPriority
+from ropod.utils.timestamp import TimeStamp
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def at(minutes):
+    return START + datetime.timedelta(minutes=minutes)
+
+
+def make_task(task_id, minutes, priority=TaskPriority.NORMAL, start_minutes=None):
+    task = Task(id=task_id, robot_actions={}, team_robot_ids=[],
+                earliest_start_time=at(minutes), latest_start_time=at(minutes + 5),
+                estimated_duration=datetime.timedelta(minutes=10), priority=priority)
+    if start_minutes is not None:
+        task.start_time = at(start_minutes)
+    return task
+
+
+def ids(tasks):
+    return [task.id for task in tasks]
+
+
+def test_due_tasks_are_ordered_by_priority_then_start_time():
+    queue = DispatchQueue([make_task('normal_early', 0),
+                           make_task('low', 1, TaskPriority.LOW),
+                           make_task('emergency', 5, TaskPriority.EMERGENCY),
+                           make_task('normal_late', 3),
+                           make_task('high', 4, TaskPriority.HIGH),
+                           make_task('future', 30, TaskPriority.EMERGENCY)])
+
+    due = queue.pop_due_tasks(at(10))
+
+    assert ids(due) == ['emergency', 'high', 'normal_early', 'normal_late', 'low']
+    assert len(queue) == 1 and 'future' in queue
+
+
+def test_tasks_are_due_after_their_start_time():
+    queue = DispatchQueue([make_task('task_1', 10)])
+
+    assert queue.pop_due_tasks(at(10)) == []
+    assert ids(queue.pop_due_tasks(at(10) + datetime.timedelta(microseconds=1))) == ['task_1']
+
+
+def test_start_times_take_precedence_over_earliest_start_times():
+    queue = DispatchQueue([make_task('scheduled', 0, start_minutes=20), make_task('unscheduled', 10)])
+
+    assert queue.peek_next_due_time() == at(10)
+    assert ids(queue.pop_due_tasks(at(15))) == ['unscheduled']
+    assert queue.peek_next_due_time() == at(20)
+
+
+def test_updates_move_the_task():
+    task = make_task('task_1', 0)
+    queue = DispatchQueue([task, make_task('task_2', 5)])
+
+    task.earliest_start_time = at(20)
+    queue.update(task)
+
+    assert ids(queue.pop_due_tasks(at(10))) == ['task_2']
+    assert len(queue) == 1
+
+
+def test_postponed_tasks_keep_their_durations():
+    task = make_task('task_1', 0, start_minutes=1)
+    queue = DispatchQueue([task])
+
+    queue.postpone('task_1', datetime.timedelta(minutes=30))
+
+    assert task.start_time == at(31)
+    assert task.earliest_finish_time == at(40)
+    assert queue.pop_due_tasks(at(20)) == []
+    assert ids(queue.pop_due_tasks(at(40))) == ['task_1']
+
+
+def test_removed_tasks_are_not_dispatched():
+    queue = DispatchQueue([make_task('task_1', 0), make_task('task_2', 5)])
+
+    assert queue.remove('task_1').id == 'task_1'
+    assert queue.remove('task_1') is None
+    assert ids(queue.pop_due_tasks(at(10))) == ['task_2']
+    assert queue.peek_next_due_time() is None
+
+
+def test_many_updates_keep_one_entry_per_task():
+    tasks = [make_task('task_{0}'.format(i), i) for i in range(10)]
+    queue = DispatchQueue(tasks)
+    for minutes in range(100):
+        for task in tasks:
+            task.earliest_start_time = at(minutes)
+            queue.update(task)
+
+    assert len(queue) == 10
+    assert sorted(ids(queue.pop_due_tasks(at(100)))) == sorted(ids(tasks))
+    assert queue.pop_due_tasks(at(1000)) == []
+
+
+def test_waiting_times_out_without_due_tasks():
+    queue = DispatchQueue([make_task('future', 0)])
+    queue.postpone('future', datetime.timedelta(days=365 * 100))
+
+    start = time.monotonic()
+    assert queue.wait_for_due_tasks(timeout=0.05) == []
+    assert time.monotonic() - start >= 0.04
+
+
+def test_waiting_returns_tasks_added_by_other_threads():
+    queue = DispatchQueue()
+    past_task = make_task('task_1', 0)
+
+    timer = threading.Timer(0.05, queue.add, [past_task])
+    timer.start()
+    try:
+        assert ids(queue.wait_for_due_tasks(timeout=2.)) == ['task_1']
+    finally:
+        timer.cancel()
+
+
+def make_aware_task(task_id, delta):
+    task = make_task(task_id, 0)
+    task.earliest_start_time = TimeStamp.now(datetime.timezone(datetime.timedelta(hours=5))) + delta
+    return task
+
+
+def test_aware_tasks_are_due_in_their_time_zone():
+    queue = DispatchQueue([make_aware_task('past', -datetime.timedelta(minutes=1)),
+                           make_aware_task('future', datetime.timedelta(hours=1))])
+
+    assert ids(queue.pop_due_tasks()) == ['past']
+    assert queue.peek_next_due_time().tz == queue.tz
+    assert queue.wait_for_due_tasks(timeout=0.01) == []
+
+
+def test_times_with_and_without_time_zones_are_not_mixed():
+    queue = DispatchQueue([make_aware_task('task_1', datetime.timedelta(hours=1))])
+
+    with pytest.raises(TypeError):
+        queue.add(make_task('task_2', 0))
+    with pytest.raises(TypeError):
+        queue.pop_due_tasks(at(0))
+    assert len(queue) == 1
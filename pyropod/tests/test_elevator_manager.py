@@ -0,0 +1,170 @@
+import datetime
+
+import pytest
+
+from ropod.structs.elevator import Elevator, ElevatorRequest, ElevatorRequestStatus
+from ropod.structs.elevator_manager import ElevatorRequestManager
+from ropod.utils.timestamp import TimeStamp
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def at(seconds):
+    return START + datetime.timedelta(seconds=seconds)
+
+
+def make_request(query_id, start_floor, goal_floor, elevator_id=1):
+    return ElevatorRequest(query_id, start_floor, goal_floor, 'CALL_ELEVATOR', elevator_id=elevator_id)
+
+
+@pytest.fixture
+def manager():
+    return ElevatorRequestManager(capacity=3)
+
+
+def test_compatible_requests_share_a_trip(manager):
+    trip = manager.add_request(make_request('query_1', 0, 4), at(0))
+
+    assert manager.add_request(make_request('query_2', 1, 3), at(5)) is trip
+    assert trip.load == 2
+    assert trip.stops == [0, 1, 3, 4]
+    assert trip.start_floors == [0, 1] and trip.goal_floors == [3, 4]
+    assert manager.get_request_trip('query_2') is trip
+    assert manager.get_queue(1) == [trip]
+
+
+def test_requests_in_the_other_direction_get_a_new_trip(manager):
+    up = manager.add_request(make_request('query_1', 0, 4), at(0))
+    down = manager.add_request(make_request('query_2', 3, 1), at(1))
+
+    assert down is not up
+    assert down.direction == -1 and down.stops == [3, 1]
+    assert manager.get_queue(1) == [up, down]
+
+
+def test_requests_after_the_batching_window_get_a_new_trip(manager):
+    trip = manager.add_request(make_request('query_1', 0, 4), at(0))
+
+    assert manager.add_request(make_request('query_2', 0, 4), at(10)) is not trip
+
+
+def test_requests_for_other_elevators_get_a_new_trip(manager):
+    trip = manager.add_request(make_request('query_1', 0, 4), at(0))
+
+    other = manager.add_request(make_request('query_2', 0, 4, elevator_id=2), at(1))
+    assert other is not trip and other.elevator_id == 2
+
+
+def test_trips_are_limited_by_the_capacity():
+    manager = ElevatorRequestManager(capacity=2, load_size=lambda request: request.load or 1)
+    trip = manager.add_request(make_request('query_1', 0, 4), at(0))
+    heavy = make_request('query_2', 0, 4)
+    heavy.load = 2
+
+    assert manager.add_request(heavy, at(1)) is not trip
+    assert manager.add_request(make_request('query_3', 0, 4), at(1)) is not trip
+
+    manager.add_elevator(Elevator(3), capacity=5)
+    assert manager.get_capacity(3) == 5 and manager.get_capacity(1) == 2
+
+
+def test_requests_must_overlap_the_floors_of_the_trip(manager):
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+
+    other = manager.add_request(make_request('query_2', 3, 5), at(1))
+    assert other is not trip
+
+    # only the last trip of the elevator accepts requests
+    assert manager.add_request(make_request('query_3', 1, 4), at(2)) is other
+    assert other.floor_span == (1, 5)
+
+
+def test_requests_within_the_max_floor_distance_are_merged():
+    manager = ElevatorRequestManager(capacity=3, max_floor_distance=1)
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+
+    assert manager.add_request(make_request('query_2', 3, 5), at(1)) is trip
+    assert trip.floor_span == (0, 5)
+    assert manager.add_request(make_request('query_3', 7, 8), at(2)) is not trip
+
+
+def test_duplicate_requests_are_rejected(manager):
+    manager.add_request(make_request('query_1', 0, 2), at(0))
+    with pytest.raises(Exception):
+        manager.add_request(make_request('query_1', 0, 2), at(1))
+
+
+def test_trips_are_ready_after_the_batching_window_or_when_full(manager):
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+
+    assert manager.get_ready_trips(at(5)) == []
+    assert manager.get_ready_trips(at(10)) == [trip]
+
+    manager.add_request(make_request('query_2', 0, 2), at(1))
+    manager.add_request(make_request('query_3', 0, 2), at(2))
+    assert manager.get_ready_trips(at(3)) == [trip]
+
+
+def test_trips_wait_for_available_elevators(manager):
+    elevator = Elevator(1)
+    manager.add_elevator(elevator)
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+
+    assert manager.get_ready_trips(at(20)) == []
+    elevator.is_available = True
+    assert manager.get_ready_trips(at(20)) == [trip]
+
+
+def test_trips_are_served_one_at_a_time(manager):
+    first = manager.add_request(make_request('query_1', 0, 2), at(0))
+    second = manager.add_request(make_request('query_2', 2, 0), at(1))
+
+    manager.set_trip_status(first.trip_id, ElevatorRequestStatus.ACCEPTED, at(10))
+    assert manager.get_ready_trips(at(20)) == []
+
+    for status in (ElevatorRequestStatus.GOING_TO_START, ElevatorRequestStatus.WAITING_FOR_ROBOT_IN,
+                   ElevatorRequestStatus.GOING_TO_GOAL, ElevatorRequestStatus.WAITING_FOR_ROBOT_OUT,
+                   ElevatorRequestStatus.COMPLETED):
+        manager.set_trip_status(first.trip_id, status, at(20))
+
+    assert first.requests[0].status == ElevatorRequestStatus.COMPLETED
+    assert [status for status, _ in first.status_history][-1] == ElevatorRequestStatus.COMPLETED
+    assert manager.get_trip(first.trip_id) is None
+    assert manager.get_request_trip('query_1') is None
+    assert manager.get_ready_trips(at(20)) == [second]
+
+
+def test_invalid_transitions_are_rejected(manager):
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+
+    with pytest.raises(Exception):
+        manager.set_trip_status(trip.trip_id, ElevatorRequestStatus.GOING_TO_GOAL, at(1))
+    assert trip.status == ElevatorRequestStatus.PENDING
+
+    manager.update_request_status('query_1', ElevatorRequestStatus.ACCEPTED, at(1))
+    manager.update_request_status('query_1', ElevatorRequestStatus.FAILED, at(2))
+    assert trip.is_final()
+    assert manager.get_queue(1) == []
+
+
+def test_canceled_requests_leave_their_trip(manager):
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+    request = make_request('query_2', 0, 2)
+    manager.add_request(request, at(1))
+
+    assert manager.cancel_request('query_2', at(2))
+    assert request.status == ElevatorRequestStatus.CANCELED
+    assert trip.load == 1 and manager.get_request_trip('query_2') is None
+
+    assert manager.cancel_request('query_1', at(3))
+    assert trip.status == ElevatorRequestStatus.CANCELED
+    assert manager.get_queue(1) == []
+    assert not manager.cancel_request('query_1', at(4))
+
+
+def test_dispatched_requests_cannot_be_canceled(manager):
+    trip = manager.add_request(make_request('query_1', 0, 2), at(0))
+    manager.set_trip_status(trip.trip_id, ElevatorRequestStatus.ACCEPTED, at(10))
+
+    assert not manager.cancel_request('query_1', at(11))
+    assert manager.get_request_trip('query_1') is trip
@@ -0,0 +1,86 @@
+import pytest
+
+from ropod.structs.fleet_state import FleetStateStore
+from ropod.structs.robot import Robot
+from ropod.structs.status import AvailabilityStatus
+from ropod.utils.timestamp import TimeStamp
+
+UPDATE_TIME = TimeStamp.from_str('2020-01-01T10:00:00')
+LATER = TimeStamp.from_str('2020-01-01T10:01:00')
+
+
+@pytest.fixture
+def store():
+    return FleetStateStore([Robot('ropod_001', uuid='uuid_1', version={}),
+                            Robot('ropod_002', uuid='uuid_2', version={})])
+
+
+def test_only_changed_attributes_are_updated(store):
+    changed = store.update('ropod_001', {'availability': AvailabilityStatus.IDLE, 'position': None},
+                           UPDATE_TIME)
+
+    assert changed == {'availability': AvailabilityStatus.IDLE}
+    robot = store.get_robot('ropod_001')
+    assert robot.availability == AvailabilityStatus.IDLE
+    assert robot.last_update == {'availability': '2020-01-01T10:00:00'}
+
+
+def test_updates_without_changes_keep_the_version(store):
+    version = store.version
+    assert store.update('ropod_001', {'position': None}) == {}
+    assert store.version == version
+
+
+def test_unknown_attributes_are_rejected(store):
+    with pytest.raises(Exception):
+        store.update('ropod_001', {'robot_id': 'ropod_003'})
+
+
+def test_changes_since_a_version(store):
+    version, changes = store.get_changes()
+    assert set(changes) == {'ropod_001', 'ropod_002'}
+    assert changes['ropod_001']['uuid'] == 'uuid_1'
+
+    store.update('ropod_001', {'availability': AvailabilityStatus.BUSY}, UPDATE_TIME)
+    store.update('ropod_001', {'current_task': 'task_1'}, LATER)
+    new_version, changes = store.get_changes(version)
+
+    assert new_version == version + 2
+    assert changes == {'ropod_001': {'robotId': 'ropod_001',
+                                     'availability': AvailabilityStatus.BUSY,
+                                     'currentTask': 'task_1',
+                                     'lastUpdate': {'availability': '2020-01-01T10:00:00',
+                                                    'current_task': '2020-01-01T10:01:00'}}}
+    assert store.get_changes(new_version) == (new_version, {})
+
+
+def test_repeated_changes_are_reported_once_with_the_last_value(store):
+    version = store.version
+    store.update('ropod_002', {'position': 'A'}, UPDATE_TIME)
+    store.update('ropod_002', {'position': 'B'}, LATER)
+
+    _, changes = store.get_changes(version)
+
+    assert changes['ropod_002']['position'] == 'B'
+    assert changes['ropod_002']['lastUpdate'] == {'position': '2020-01-01T10:01:00'}
+
+
+def test_removed_robots_are_reported(store):
+    version = store.version
+    robot = store.remove_robot('ropod_002')
+
+    assert robot.robot_id == 'ropod_002'
+    assert 'ropod_002' not in store
+    assert store.get_changes(version)[1] == {'ropod_002': None}
+
+
+def test_snapshots_are_not_affected_by_later_updates(store):
+    store.update('ropod_001', {'position': 'A'}, UPDATE_TIME)
+    snapshot = store.snapshot()
+    store.update('ropod_001', {'position': 'B'}, LATER)
+
+    assert snapshot.version == store.version - 1
+    assert snapshot.get_robot('ropod_001').position == 'A'
+    assert snapshot.get_robot('ropod_001').last_update == {'position': '2020-01-01T10:00:00'}
+    assert snapshot.to_dict()['ropod_001']['position'] == 'A'
+    assert store.get_robot('ropod_001').position == 'B'
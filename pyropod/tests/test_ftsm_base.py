@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('pyftsm')
+
+from pyftsm.ftsm import FTSMStates, FTSMTransitions
+
+from ropod.ftsm.ftsm_base import DependMonitorTypes, FTSMBase
+from ropod.ftsm.robot_store import InMemoryRobotStore
+
+
+class Component(FTSMBase):
+    '''A component that records the calls of its ROS setup and teardown'''
+    def __init__(self, name, robot_store):
+        self.ros_calls = []
+        super(Component, self).__init__(name, robot_store.component_specs[name]['dependencies'],
+                                        robot_store.component_specs[name]['dependency_monitors'],
+                                        depend_status_poll_interval=0.01,
+                                        robot_store=robot_store)
+
+    def running(self):
+        return FTSMTransitions.CONTINUE
+
+    def recovering(self):
+        return FTSMTransitions.DONE_RECOVERING
+
+    def setup_ros(self):
+        self.ros_calls.append('setup')
+
+    def tear_down_ros(self):
+        self.ros_calls.append('tear_down')
+
+
+def heartbeat(component_id, monitor_name, healthy):
+    return {'component_id': component_id,
+            'modes': [{'monitorName': monitor_name, 'healthStatus': {'status': healthy}}]}
+
+
+def run_later(function, delay=0.05):
+    timer = threading.Timer(delay, function)
+    timer.start()
+    return timer
+
+
+@pytest.fixture
+def store():
+    store = InMemoryRobotStore()
+    store.add_component_spec({'component_name': 'navigation',
+                              'dependencies': ['laser', 'roscore'],
+                              'dependency_monitors': {
+                                  DependMonitorTypes.HEARTBEAT: {'laser': 'laser/heartbeat',
+                                                                 'roscore': 'ros/ros_master_monitor'}}})
+    return store
+
+
+@pytest.fixture
+def component(store):
+    component = Component('navigation', store)
+    yield component
+    component.current_state = FTSMStates.STOPPED
+
+
+def test_waiting_wakes_up_on_dependency_status_changes(store, component):
+    timer = run_later(lambda: store.update_status(heartbeat('laser', 'heartbeat', True)))
+    start_time = time.time()
+
+    assert component.wait_for_dependency('laser', timeout=5.)
+    assert time.time() - start_time < 2.
+    timer.cancel()
+
+
+def test_waiting_for_unhealthy_dependencies_times_out(store, component):
+    store.update_status(heartbeat('laser', 'heartbeat', False))
+    start_time = time.time()
+
+    assert not component.wait_for_dependency('laser', timeout=0.1)
+    assert time.time() - start_time >= 0.1
+    assert not component.wait_for_depend_statuses(lambda depend_statuses: False, timeout=0.01)
+
+
+def test_waiting_wakes_up_when_the_component_stops(component):
+    timer = run_later(lambda: setattr(component, 'current_state', FTSMStates.STOPPED))
+    start_time = time.time()
+
+    assert not component.wait_for_dependency('laser', timeout=5.)
+    assert time.time() - start_time < 2.
+    timer.cancel()
+
+
+def test_ros_is_set_up_again_when_the_master_is_back(store, component):
+    store.update_status(heartbeat('ros', 'ros_master_monitor', False))
+    assert component.wait_for_depend_statuses(
+        lambda depend_statuses: depend_statuses[DependMonitorTypes.HEARTBEAT]['roscore']
+                                               ['ros/ros_master_monitor']['status'] is False,
+        timeout=2.)
+
+    timer = run_later(lambda: store.update_status(heartbeat('ros', 'ros_master_monitor', True)))
+    component.recover_from_possible_dead_rosmaster()
+
+    assert component.ros_calls == ['tear_down', 'setup']
+    timer.cancel()
+
+
+def test_ros_is_not_set_up_if_the_component_stops(store, component):
+    store.update_status(heartbeat('ros', 'ros_master_monitor', False))
+    component.wait_for_depend_statuses(
+        lambda depend_statuses: depend_statuses[DependMonitorTypes.HEARTBEAT]['roscore']
+                                               ['ros/ros_master_monitor']['status'] is False,
+        timeout=2.)
+
+    timer = run_later(lambda: setattr(component, 'current_state', FTSMStates.STOPPED))
+    component.recover_from_possible_dead_rosmaster()
+
+    assert component.ros_calls == ['tear_down']
+    timer.cancel()
@@ -0,0 +1,79 @@
+import pytest
+
+from ropod.ftsm.stats import RECOVERING, RUNNING, DurationHistogram, FTSMStats
+
+
+def test_histogram_counts_durations_per_bucket():
+    histogram = DurationHistogram()
+    for duration in (0.0005, 0.05, 0.05, 1000.):
+        histogram.add(duration)
+
+    histogram_dict = histogram.to_dict()
+    counts = {bucket['upper_bound']: bucket['count'] for bucket in histogram_dict['buckets']}
+    assert counts[0.001] == 1
+    assert counts[0.1] == 2
+    assert counts[None] == 1
+    assert histogram_dict['count'] == 4
+    assert histogram_dict['min'] == 0.0005
+    assert histogram_dict['max'] == 1000.
+    assert histogram.mean == pytest.approx((0.0005 + 0.1 + 1000.) / 4)
+
+
+def test_empty_histogram_has_no_mean():
+    assert DurationHistogram().mean is None
+
+
+def test_time_in_state_includes_the_current_state():
+    stats = FTSMStats()
+    stats.record_transition(None, RUNNING, 10.)
+    stats.record_transition(RUNNING, RECOVERING, 15.)
+    stats.record_transition(RECOVERING, RUNNING, 17.)
+
+    assert stats.get_time_in_state(RUNNING, 20.) == 8.
+    assert stats.get_time_in_state(RECOVERING, 20.) == 2.
+    assert stats.transition_counts == {(RUNNING, RECOVERING): 1,
+                                       (RECOVERING, RUNNING): 1}
+
+
+def test_recovery_latency_spans_consecutive_recovery_attempts():
+    stats = FTSMStats(max_recovery_attempts=1)
+    stats.record_transition(None, RUNNING, 0.)
+    stats.record_depend_status_update(9.)
+    stats.record_transition(RUNNING, RECOVERING, 10.)
+    stats.record_transition(RECOVERING, RECOVERING, 12.)
+    stats.record_transition(RECOVERING, RUNNING, 14.)
+
+    stats_dict = stats.to_dict(20.)
+    assert stats_dict['recovery_attempts'] == 2
+    assert stats_dict['exceeded_recovery_attempts'] == 1
+    assert stats_dict['consecutive_recovery_attempts'] == 0
+    assert stats_dict['recovery_latencies']['count'] == 1
+    assert stats_dict['recovery_latencies']['total'] == 4.
+    assert stats_dict['depend_status_to_recovery']['total'] == 1.
+    assert stats_dict['transition_counts']['{0}->{1}'.format(RECOVERING, RECOVERING)] == 1
+
+
+def test_staleness_is_measured_from_the_last_refresh():
+    stats = FTSMStats()
+    stats.record_depend_status_update(1.)
+    stats.record_transition(None, RUNNING, 10., depend_status_refresh_time=9.5)
+    stats.record_transition(RUNNING, RECOVERING, 20., depend_status_refresh_time=19.75)
+    stats.record_transition(RECOVERING, RUNNING, 30.)
+
+    staleness = stats.to_dict(30.)['depend_status_staleness']
+    assert staleness['count'] == 2
+    assert staleness['total'] == 0.75
+    # the detection latency is still measured from the last status change
+    assert stats.to_dict(30.)['depend_status_to_recovery']['total'] == 19.
+
+
+def test_state_names_can_be_given():
+    stats = FTSMStats(max_recovery_attempts=2, running_state='RUN', recovering_state='RECOVER')
+    stats.record_transition(None, 'RUN', 0.)
+    stats.record_transition('RUN', 'RECOVER', 1.)
+    stats.record_transition('RECOVER', 'RECOVER', 2.)
+    stats.record_transition('RECOVER', 'RUN', 4.)
+
+    assert stats.recovery_attempts == 2
+    assert stats.exceeded_recovery_attempts == 0
+    assert stats.recovery_latencies.total == 3.
@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+
+from ropod.structs.task import LazyTask, Task
+from ropod.utils.timestamp import TimeStamp
+
+AREA_DICT = {'id': 'area_1', 'name': 'AMK_D_L-1_C41', 'floorNumber': -1,
+             'subAreas': [{'id': 'sub_1', 'name': 'charging_1'}]}
+
+TASK_DICT = {'id': 'task_1', 'loadType': 'Sickbed', 'loadId': 'load_1', 'team_robot_ids': ['ropod_001'],
+             'earliest_start_time': '2020-01-01T10:00:00', 'latest_start_time': '2020-01-01T10:10:00',
+             'estimated_duration': 15.0, 'earliest_finish_time': '2020-01-01T10:15:00',
+             'latest_finish_time': '2020-01-01T10:25:00', 'start_time': '2020-01-01T10:02:00',
+             'finish_time': None, 'pickup_pose': AREA_DICT,
+             'delivery_pose': {'id': 'area_2', 'name': 'AMK_B_L4_C1', 'floorNumber': 4},
+             'priority': 1, 'hard_constraints': True,
+             'status': {'task_id': 'task_1', 'status': 6, 'delayed': False, 'estimated_task_duration': 15.0,
+                        'current_robot_actions': {}, 'completed_robot_actions': {}},
+             'robot_actions': {'ropod_001': [{'id': 'action_1', 'type': 'GOTO', 'start_floor': -1,
+                                              'goal_floor': -1, 'level': -1, 'elevator_id': -1,
+                                              'execution_status': 'pending', 'eta': 1.,
+                                              'areas': [AREA_DICT], 'subareas': []}]}}
+
+
+def is_decoded(task, name):
+    try:
+        object.__getattribute__(task, name)
+    except AttributeError:
+        return False
+    return True
+
+
+def test_lazy_fields_are_decoded_on_first_access():
+    task = LazyTask.from_dict(TASK_DICT)
+
+    assert task.id == 'task_1'
+    assert task.status.status == 6
+    assert isinstance(task, Task)
+    for name in LazyTask.LAZY_FIELDS:
+        assert not is_decoded(task, name)
+
+    assert task.earliest_start_time == TimeStamp.from_str('2020-01-01T10:00:00')
+    assert is_decoded(task, 'earliest_start_time')
+    assert not is_decoded(task, 'robot_actions')
+    assert task.earliest_start_time is task.earliest_start_time
+
+
+def test_lazy_tasks_match_eagerly_decoded_tasks():
+    task = Task.from_dict(TASK_DICT)
+    lazy_task = LazyTask.from_dict(TASK_DICT)
+
+    assert lazy_task.to_dict() == task.to_dict()
+    assert lazy_task.estimated_duration == datetime.timedelta(minutes=15)
+    assert lazy_task.finish_time is None
+    assert lazy_task.pickup_pose.floor_number == -1
+    assert [action.id for action in lazy_task.robot_actions['ropod_001']] == ['action_1']
+
+
+def test_lazy_fields_can_be_set_before_they_are_decoded():
+    task = LazyTask.from_dict(TASK_DICT)
+    finish_time = TimeStamp.from_str('2020-01-01T10:20:00')
+
+    task.finish_time = finish_time
+
+    assert task.finish_time == finish_time
+    assert task.to_dict()['finish_time'] == '2020-01-01T10:20:00'
+
+
+def test_unknown_attributes_raise_attribute_errors():
+    task = LazyTask.from_dict(TASK_DICT)
+    with pytest.raises(AttributeError):
+        task.unknown_attribute
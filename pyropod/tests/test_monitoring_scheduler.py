@@ -0,0 +1,117 @@
+import time
+
+from ropod.ftsm.monitoring_scheduler import MonitoringScheduler
+from ropod.ftsm.robot_store import InMemoryRobotStore
+
+
+def status(component_id, health_status='nominal'):
+    return {'component_id': component_id,
+            'modes': [{'monitorName': 'monitor', 'healthStatus': {'status': health_status}}]}
+
+
+def wait_until(predicate, timeout=2.):
+    end_time = time.time() + timeout
+    while not predicate():
+        if time.time() > end_time:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class PollingRobotStore(InMemoryRobotStore):
+    '''In-memory store without status streams'''
+    def watch_statuses(self, component_ids, max_await_time_ms=500):
+        return None
+
+
+class FailingRobotStore(InMemoryRobotStore):
+    '''In-memory store whose state writes raise an error that is not a PyMongoError'''
+    def __init__(self):
+        super(FailingRobotStore, self).__init__()
+        self.write_attempts = 0
+
+    def write_sm_states(self, state_docs):
+        self.write_attempts += 1
+        raise RuntimeError('write failed')
+
+
+def test_schedulers_are_shared_per_store():
+    store = InMemoryRobotStore()
+    scheduler = MonitoringScheduler.get_scheduler(store)
+
+    assert MonitoringScheduler.get_scheduler(store) is scheduler
+    assert MonitoringScheduler.get_scheduler(InMemoryRobotStore()) is not scheduler
+
+
+def test_status_changes_are_delivered_from_a_stream():
+    store = InMemoryRobotStore()
+    scheduler = MonitoringScheduler(store, max_wait_time=0.01)
+    received = []
+    scheduler.subscribe_statuses(['laser'], received.append)
+
+    store.update_status(status('laser', 'failure'))
+
+    assert wait_until(lambda: received == [status('laser', 'failure')])
+
+
+def test_status_changes_are_polled_without_a_stream():
+    store = PollingRobotStore()
+    scheduler = MonitoringScheduler(store, max_wait_time=0.01)
+    received = []
+    scheduler.subscribe_statuses(['laser'], received.append, poll_interval=0.01)
+
+    store.update_status(status('laser'))
+    assert wait_until(lambda: received == [status('laser')])
+
+    store.update_status(status('laser', 'failure'))
+    assert wait_until(lambda: received[-1:] == [status('laser', 'failure')])
+    assert len(received) == 2
+
+
+def test_state_updates_are_written():
+    store = InMemoryRobotStore()
+    scheduler = MonitoringScheduler(store, max_wait_time=0.01)
+    scheduler.update_state('laser', 'running', 1.)
+
+    assert wait_until(lambda: store.get_sm_state('laser') is not None)
+    assert store.get_sm_state('laser')['state'] == 'running'
+
+
+def test_callback_errors_do_not_stop_the_other_callbacks():
+    store = InMemoryRobotStore()
+    scheduler = MonitoringScheduler(store, max_wait_time=0.01)
+    received = []
+
+    def failing_callback(status_doc):
+        raise ValueError('callback failed')
+
+    scheduler.subscribe_statuses(['laser'], failing_callback)
+    scheduler.subscribe_statuses(['laser'], received.append)
+
+    store.update_status(status('laser', 'failure'))
+    assert wait_until(lambda: len(received) == 1)
+
+    store.update_status(status('laser'))
+    assert wait_until(lambda: len(received) == 2)
+
+
+def test_errors_do_not_stop_the_scheduler_thread():
+    store = FailingRobotStore()
+    scheduler = MonitoringScheduler(store, max_wait_time=0.01)
+    received = []
+    scheduler.update_state('laser', 'running', 1.)
+    assert wait_until(lambda: store.write_attempts > 0)
+
+    scheduler.subscribe_statuses(['laser'], received.append)
+    store.update_status(status('laser'))
+
+    assert wait_until(lambda: received == [status('laser')])
+
+
+def test_refreshes_without_changes_are_recorded():
+    for store in (InMemoryRobotStore(), PollingRobotStore()):
+        scheduler = MonitoringScheduler(store, max_wait_time=0.01)
+        scheduler.subscribe_statuses(['laser'], lambda status_doc: None, poll_interval=0.01)
+        start_time = time.time()
+
+        assert wait_until(lambda: (scheduler.last_status_refresh_time or 0.) > start_time + 0.05)
@@ -0,0 +1,152 @@
+import datetime
+import random
+
+from ropod.structs.area import SubArea, SubAreaReservation
+from ropod.structs.reservation_book import ReservationBook, _SubAreaReservations
+from ropod.utils.timestamp import TimeStamp
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def at(minutes):
+    return START + datetime.timedelta(minutes=minutes)
+
+
+def make_reservation(start, end, sub_area_id='sub_1', task_id='task_1', required_capacity=1):
+    reservation = SubAreaReservation()
+    reservation.sub_area_id = sub_area_id
+    reservation.task_id = task_id
+    reservation.start_time = at(start)
+    reservation.end_time = at(end)
+    reservation.required_capacity = required_capacity
+    return reservation
+
+
+def make_sub_area(sub_area_id, capacity):
+    sub_area = SubArea()
+    sub_area.id = sub_area_id
+    sub_area.capacity = capacity
+    return sub_area
+
+
+def test_overlapping_reservations():
+    book = ReservationBook()
+    first = make_reservation(0, 10)
+    second = make_reservation(10, 20)
+    other = make_reservation(0, 30, sub_area_id='sub_2')
+    for reservation in (first, second, other):
+        book.add(reservation)
+
+    assert book.get_overlapping('sub_1', at(5), at(10)) == [first]
+    assert book.get_overlapping('sub_1', at(5), at(15)) == [first, second]
+    assert book.get_overlapping('sub_1', at(20), at(30)) == []
+    assert book.get_overlapping('sub_3', at(0), at(30)) == []
+
+
+def test_reserve_checks_the_capacity():
+    book = ReservationBook([make_sub_area('sub_1', 2)])
+    assert book.reserve(make_reservation(0, 10))
+    assert book.reserve(make_reservation(5, 15))
+
+    rejected = make_reservation(8, 12)
+    assert not book.reserve(rejected)
+    assert rejected.status == 'unknown'
+    assert book.reserve(make_reservation(10, 20))
+    assert not book.reserve(make_reservation(0, 30, sub_area_id='sub_1', required_capacity=3))
+    assert book.get_usage('sub_1', at(0), at(30)) == 2
+
+
+def test_cancel_frees_the_capacity():
+    book = ReservationBook()
+    reservation = make_reservation(0, 10)
+    assert book.reserve(reservation)
+    assert not book.has_capacity('sub_1', at(5), at(6))
+
+    book.cancel(reservation)
+
+    assert reservation.status == ReservationBook.CANCELLED
+    assert len(book) == 0
+    assert book.has_capacity('sub_1', at(5), at(6))
+
+
+def test_cancelling_a_long_reservation_shrinks_the_search_window():
+    book = ReservationBook()
+    long_reservation = make_reservation(0, 600)
+    short_reservation = make_reservation(700, 710)
+    book.add(long_reservation)
+    book.add(short_reservation)
+
+    book.cancel(long_reservation)
+
+    assert book.get_overlapping('sub_1', at(705), at(706)) == [short_reservation]
+    assert book.get_overlapping('sub_1', at(300), at(400)) == []
+
+
+def test_max_duration_decreases_when_reservations_are_removed():
+    reservations = _SubAreaReservations()
+    long_entry = (0, 600, 0, None)
+    short_entry = (700, 710, 1, None)
+    reservations.add(long_entry)
+    reservations.add(short_entry)
+    assert reservations.max_duration == 600
+
+    reservations.remove(long_entry)
+    assert reservations.max_duration == 10
+
+    reservations.remove(short_entry)
+    assert reservations.max_duration == 0
+
+
+def test_task_reservations():
+    book = ReservationBook()
+    first = make_reservation(0, 10, task_id='task_1')
+    second = make_reservation(20, 30, sub_area_id='sub_2', task_id='task_1')
+    other = make_reservation(0, 10, sub_area_id='sub_2', task_id='task_2')
+    for reservation in (first, second, other):
+        book.add(reservation)
+
+    assert book.get_task_reservations('task_1') == [first, second]
+
+    book.cancel_task_reservations('task_1')
+    assert book.get_task_reservations('task_1') == []
+    assert len(book) == 1
+    assert first.status == second.status == ReservationBook.CANCELLED
+
+
+def test_earliest_slot():
+    book = ReservationBook([make_sub_area('sub_1', 1)])
+    book.add(make_reservation(0, 10))
+    book.add(make_reservation(15, 30))
+
+    duration = datetime.timedelta(minutes=5)
+    assert book.find_earliest_slot('sub_1', duration, at(0)) == at(10)
+    assert book.find_earliest_slot('sub_1', datetime.timedelta(minutes=6), at(0)) == at(30)
+    assert book.find_earliest_slot('sub_1', duration, at(0), latest_start_time=at(5)) is None
+    assert book.find_earliest_slot('sub_1', duration, at(0), required_capacity=2) is None
+    assert book.find_earliest_slot('sub_2', duration, at(0)) == at(0)
+
+
+def test_queries_match_a_linear_scan():
+    random.seed(0)
+    book = ReservationBook([make_sub_area('sub_1', 3)])
+    reservations = []
+    for i in range(200):
+        start = random.randrange(0, 1000)
+        reservation = make_reservation(start, start + random.choice((1, 5, 20, 200)), task_id=str(i))
+        book.add(reservation)
+        reservations.append(reservation)
+    for reservation in random.sample(reservations, 100):
+        book.cancel(reservation)
+        reservations.remove(reservation)
+
+    for _ in range(100):
+        start = random.randrange(0, 1000)
+        end = start + random.randrange(1, 50)
+        expected = [reservation for reservation in reservations
+                    if reservation.start_time < at(end) and reservation.end_time > at(start)]
+        assert sorted(book.get_overlapping('sub_1', at(start), at(end)), key=id) == sorted(expected, key=id)
+
+        usage = max(sum(1 for reservation in expected
+                        if reservation.start_time <= at(minute) < reservation.end_time)
+                    for minute in range(start, end))
+        assert book.get_usage('sub_1', at(start), at(end)) == usage
@@ -0,0 +1,191 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from ropod.structs.robot import DEFAULT_VERSIONS, Hardware, Robot, Software
+
+
+def is_set(robot, name):
+    try:
+        object.__getattribute__(robot, name)
+    except AttributeError:
+        return False
+    return True
+
+
+def test_the_uuid_and_version_are_created_when_accessed():
+    robot = Robot('ropod_001')
+    assert not is_set(robot, 'uuid') and not is_set(robot, 'version')
+
+    uuid = robot.uuid
+    assert is_set(robot, 'uuid') and robot.uuid == uuid
+    assert not is_set(robot, 'version')
+
+    assert robot.version['hardware'] == Hardware.full_version()
+    assert robot.version['software'] == Software.full_version()
+    assert robot.version['black_box']['logger'] == {'version': 'unknown'}
+
+
+def test_given_uuids_and_versions_are_kept():
+    version = {'hardware': {}, 'software': {}}
+    robot = Robot('ropod_001', uuid='uuid_1', version=version)
+
+    assert robot.uuid == 'uuid_1'
+    assert robot.version is version
+
+
+def test_unknown_attributes_raise_attribute_errors():
+    with pytest.raises(AttributeError):
+        Robot('ropod_001').serial_number
+
+
+def test_robots_have_their_own_black_box_uuid():
+    assert Robot('ropod_001').version['black_box']['uuid'] != Robot('ropod_002').version['black_box']['uuid']
+
+
+def test_the_default_versions_cannot_be_modified():
+    with pytest.raises(Exception):
+        DEFAULT_VERSIONS['hardware']['laser']['model'] = 'SICK'
+    with pytest.raises(Exception):
+        DEFAULT_VERSIONS['hardware']['wheels'].append(Hardware.wheel(5))
+
+    copied = copy.deepcopy(DEFAULT_VERSIONS)
+    copied['hardware']['laser']['model'] = 'SICK'
+    assert DEFAULT_VERSIONS['hardware']['laser']['model'] == 'Hokuyo'
+
+
+def test_versions_are_copied_on_write():
+    robot = Robot('ropod_001')
+    other = Robot('ropod_002')
+
+    robot.version['hardware']['laser']['model'] = 'SICK'
+    robot.version['hardware']['wheels'][0]['serial_number'] = 'wheel_1'
+    robot.version['software'].setdefault('navigation', {})['local_planner'] = 'dwa'
+    for wheel in robot.version['hardware']['wheels']:
+        wheel['firmware_version'] = '1.0'
+
+    assert robot.version['hardware']['laser']['model'] == 'SICK'
+    assert robot.version['hardware']['wheels'][0] == \
+        {'id': 1, 'serial_number': 'wheel_1', 'firmware_version': '1.0'}
+    assert robot.version['software']['navigation']['local_planner'] == 'dwa'
+    assert DEFAULT_VERSIONS['hardware']['laser']['model'] == 'Hokuyo'
+    assert DEFAULT_VERSIONS['hardware']['wheels'][1]['firmware_version'] == 'unknown'
+    assert other.version['hardware'] == Hardware.full_version()
+    assert other.version['software'] == Software.full_version()
+
+
+def test_black_boxes_can_be_modified():
+    robot = Robot('ropod_001')
+
+    robot.version['black_box']['logger']['version'] = '1.0'
+
+    assert robot.version['black_box']['logger'] == {'version': '1.0'}
+    assert Robot('ropod_002').version['black_box']['logger'] == {'version': 'unknown'}
+
+
+def test_copies_of_versions_can_be_modified():
+    robot = Robot('ropod_001')
+
+    dict(robot.version)['hardware']['laser']['model'] = 'SICK'
+    robot.version.copy()['software']['execution']['execution']['version'] = '1.0'
+    {**robot.version}['hardware']['wheels'].append(Hardware.wheel(5))
+
+    # like for dictionaries, the copies are shallow
+    assert robot.version['hardware']['laser']['model'] == 'SICK'
+    assert robot.version['software']['execution']['execution'] == {'version': '1.0'}
+    assert len(robot.version['hardware']['wheels']) == 5
+    assert DEFAULT_VERSIONS['hardware'] == Hardware.full_version()
+    assert DEFAULT_VERSIONS['software'] == Software.full_version()
+
+
+def test_reading_versions_keeps_them_shared():
+    robot = Robot('ropod_001')
+
+    json.dumps(robot.version, default=str)
+    copy.deepcopy(robot.version)
+    for subtree in robot.version.values():
+        list(subtree.items())
+
+    assert dict.__getitem__(robot.version, 'hardware') is DEFAULT_VERSIONS['hardware']
+    assert dict.__getitem__(robot.version, 'software') is DEFAULT_VERSIONS['software']
+
+
+def test_repeated_reads_return_the_same_subtree():
+    robot = Robot('ropod_001')
+    laser = robot.version['hardware']['laser']
+    same_laser = robot.version['hardware']['laser']
+
+    laser['model'] = 'SICK'
+    same_laser['serial_number'] = 'laser_1'
+
+    assert laser is same_laser
+    assert robot.version['hardware']['laser'] == {'model': 'SICK', 'serial_number': 'laser_1'}
+
+
+def test_removed_subtrees_can_be_modified_separately():
+    robot = Robot('ropod_001')
+    cubes = robot.version['hardware']['sensor_cubes']
+    cube = cubes[0]
+    wheel = robot.version['hardware']['wheels'].pop()
+
+    cubes.insert(0, Hardware.sensor_cube(0))
+    cube['serial_number'] = 'cube_1'
+    wheel['serial_number'] = 'wheel_4'
+
+    assert [cube['serial_number'] for cube in robot.version['hardware']['sensor_cubes']] == \
+        ['unknown', 'cube_1']
+    assert len(robot.version['hardware']['wheels']) == 3
+    assert DEFAULT_VERSIONS['hardware']['wheels'][3]['serial_number'] == 'unknown'
+
+
+def test_versions_can_be_modified_through_values_and_items():
+    robot = Robot('ropod_001')
+
+    for subtree in robot.version.values():
+        subtree['updated'] = True
+    for _, subtree in robot.version['hardware'].items():
+        if isinstance(subtree, dict):
+            subtree['serial_number'] = 'x'
+
+    assert all(subtree['updated'] for subtree in robot.version.values())
+    assert robot.version['hardware']['laser']['serial_number'] == 'x'
+    assert 'updated' not in DEFAULT_VERSIONS['hardware']
+
+
+def test_copies_do_not_create_the_uuid_and_version():
+    robot = Robot('ropod_001', position='A')
+
+    for copied in (copy.copy(robot), copy.deepcopy(robot), pickle.loads(pickle.dumps(robot))):
+        assert copied.robot_id == 'ropod_001' and copied.position == 'A'
+        assert not is_set(copied, 'uuid') and not is_set(copied, 'version')
+    assert not is_set(robot, 'uuid') and not is_set(robot, 'version')
+
+
+def test_copies_keep_the_uuid_and_version():
+    robot = Robot('ropod_001')
+    uuid = robot.uuid
+    robot.version['hardware']['laser']['model'] = 'SICK'
+
+    copied = copy.deepcopy(robot)
+    copied.version['hardware']['laser']['model'] = 'Velodyne'
+    unpickled = pickle.loads(pickle.dumps(robot))
+
+    assert copied.uuid == uuid and unpickled.uuid == uuid
+    assert robot.version['hardware']['laser']['model'] == 'SICK'
+    assert unpickled.version == robot.version
+    assert type(unpickled.version) is dict
+
+
+def test_dict_round_trip():
+    robot = Robot('ropod_001', position='A', nickname='r1')
+    robot.version['hardware']['laser']['model'] = 'SICK'
+
+    robot_dict = robot.to_dict()
+
+    assert robot_dict['robotId'] == 'ropod_001' and robot_dict['nickname'] == 'r1'
+    assert robot_dict['uuid'] == robot.uuid
+    assert robot_dict['version']['hardware']['laser']['model'] == 'SICK'
+    assert robot_dict['version']['software'] == Software.full_version()
+    assert Robot.from_dict(robot_dict).to_dict() == robot_dict
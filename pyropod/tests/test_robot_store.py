@@ -0,0 +1,104 @@
+import pytest
+
+from ropod.ftsm import robot_store
+from ropod.ftsm.robot_store import InMemoryRobotStore, MongoRobotStore
+
+
+def spec(component_name, dependencies=()):
+    return {'component_name': component_name, 'dependencies': list(dependencies),
+            'dependency_monitors': {}}
+
+
+def status(component_id, health_status='nominal'):
+    return {'component_id': component_id,
+            'modes': [{'monitorName': 'monitor', 'healthStatus': {'status': health_status}}]}
+
+
+def test_in_memory_store_returns_copies_of_specs():
+    store = InMemoryRobotStore()
+    store.add_component_spec(spec('laser', ['power']))
+
+    laser_spec = store.get_component_spec('laser')
+    laser_spec['dependencies'].append('wheels')
+
+    assert store.get_component_spec('laser')['dependencies'] == ['power']
+    assert store.get_component_spec('wheels') is None
+    assert [s['component_name'] for s in store.get_component_specs()] == ['laser']
+
+
+def test_in_memory_store_notifies_spec_listeners():
+    store = InMemoryRobotStore()
+    changed = []
+    store.add_spec_listener(changed.append)
+
+    store.add_component_spec(spec('laser'))
+    store.add_component_spec(spec('laser', ['power']))
+
+    assert changed == ['laser', 'laser']
+
+
+def test_in_memory_store_returns_known_statuses_only():
+    store = InMemoryRobotStore()
+    store.update_status(status('laser'))
+    store.update_status(status('wheels', 'failure'))
+
+    statuses = store.get_statuses(['wheels', 'battery'])
+
+    assert statuses == [status('wheels', 'failure')]
+
+
+def test_in_memory_stream_receives_changes_of_watched_components():
+    store = InMemoryRobotStore()
+    stream = store.watch_statuses(['laser'], max_await_time_ms=10)
+
+    store.update_status(status('wheels'))
+    store.update_status(status('laser', 'failure'))
+
+    assert stream.try_next() == status('laser', 'failure')
+    assert stream.try_next() is None
+
+    stream.close()
+    store.update_status(status('laser'))
+    assert stream.try_next() is None
+
+
+def test_in_memory_store_writes_states_by_component():
+    store = InMemoryRobotStore()
+    store.write_sm_states([{'component_name': 'laser', 'state': 'booting'}])
+    store.write_sm_states([{'component_name': 'laser', 'state': 'running'},
+                           {'component_name': 'wheels', 'state': 'running'}])
+
+    assert store.get_sm_state('laser') == {'component_name': 'laser', 'state': 'running'}
+    assert store.get_sm_state('wheels')['state'] == 'running'
+    assert store.get_sm_state('battery') is None
+
+
+@pytest.fixture
+def mongo_store(monkeypatch):
+    mongomock = pytest.importorskip('mongomock')
+    monkeypatch.setattr(robot_store.pm, 'MongoClient', mongomock.MongoClient)
+    return MongoRobotStore(db_name='test_robot_store')
+
+
+def test_mongo_store_projects_statuses(mongo_store):
+    doc = status('laser')
+    doc['modes'][0]['monitorName'] = 'laser_monitor'
+    doc['modes'][0]['timestamp'] = 1.
+    mongo_store.status_collection.insert_one(doc)
+    mongo_store.status_collection.insert_one(status('wheels'))
+
+    statuses = mongo_store.get_statuses(['laser'])
+
+    assert statuses == [{'component_id': 'laser',
+                         'modes': [{'monitorName': 'laser_monitor',
+                                    'healthStatus': {'status': 'nominal'}}]}]
+
+
+def test_mongo_stores_are_shared(monkeypatch):
+    mongomock = pytest.importorskip('mongomock')
+    monkeypatch.setattr(robot_store.pm, 'MongoClient', mongomock.MongoClient)
+
+    store = MongoRobotStore.get_store('test_shared_store', db_port=27017)
+
+    assert MongoRobotStore.get_store('test_shared_store', db_port=27017) is store
+    assert MongoRobotStore.get_store('test_other_store', db_port=27017) is not store
@@ -0,0 +1,141 @@
+import time
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+
+import pytest
+
+from ropod.ftsm.robot_store import InMemoryRobotStore
+from ropod.ftsm.shared_status_table import SharedMemoryRobotStore, SharedStatusTable, StatusCollector
+
+
+def wait_until(predicate, timeout=2.):
+    end_time = time.time() + timeout
+    while not predicate():
+        if time.time() > end_time:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def table_name():
+    return 'test_status_table_{0}'.format(uuid.uuid4().hex[:12])
+
+
+@pytest.fixture
+def table(table_name):
+    table = SharedStatusTable.create(table_name, num_slots=4, key_size=32, payload_size=64)
+    yield table
+    table.close()
+    table.unlink()
+
+
+def test_written_statuses_are_read(table):
+    table.write('laser', 'laser_monitor', {'status': 'nominal'}, 10.)
+    table.write('wheels', 'wheel_monitor', {'status': 'failure'}, 11.)
+
+    assert table.read('laser', 'laser_monitor') == ({'status': 'nominal'}, 10.)
+    assert table.read('laser', 'other_monitor') is None
+    assert table.read_all() == [('laser', 'laser_monitor', {'status': 'nominal'}, 10.),
+                                ('wheels', 'wheel_monitor', {'status': 'failure'}, 11.)]
+
+
+def test_updates_reuse_the_slot_of_a_monitor(table):
+    table.write('laser', 'laser_monitor', {'status': 'nominal'}, 10.)
+    generation = table.generation
+    table.write('laser', 'laser_monitor', {'status': 'failure'}, 12.)
+
+    assert table.num_used_slots == 1
+    assert table.generation == generation + 1
+    assert table.read('laser', 'laser_monitor') == ({'status': 'failure'}, 12.)
+
+
+def test_read_statuses_are_copies(table):
+    table.write('laser', 'laser_monitor', {'status': 'nominal'}, 10.)
+
+    table.read('laser', 'laser_monitor')[0]['status'] = 'failure'
+    table.read_all()[0][2]['status'] = 'failure'
+
+    assert table.read('laser', 'laser_monitor') == ({'status': 'nominal'}, 10.)
+
+
+def test_attached_tables_see_the_writes(table, table_name):
+    attached = SharedStatusTable.attach(table_name)
+    try:
+        table.write('laser', 'laser_monitor', {'status': 'nominal'}, 10.)
+        assert attached.read('laser', 'laser_monitor') == ({'status': 'nominal'}, 10.)
+
+        table.write('laser', 'laser_monitor', {'status': 'failure'}, 11.)
+        table.write('wheels', 'wheel_monitor', {'status': 'nominal'}, 11.)
+        assert attached.read('laser', 'laser_monitor') == ({'status': 'failure'}, 11.)
+        assert attached.read('wheels', 'wheel_monitor') == ({'status': 'nominal'}, 11.)
+    finally:
+        attached.close()
+
+
+def test_statuses_that_do_not_fit_are_rejected(table):
+    with pytest.raises(ValueError):
+        table.write('laser', 'm' * 40, {'status': 'nominal'})
+    with pytest.raises(ValueError):
+        table.write('laser', 'laser_monitor', {'status': 'x' * 64})
+    for i in range(4):
+        table.write('component_{0}'.format(i), 'monitor', {'status': 'nominal'})
+    with pytest.raises(ValueError):
+        table.write('component_4', 'monitor', {'status': 'nominal'})
+    assert table.num_used_slots == 4
+
+
+def test_only_status_tables_can_be_attached(table_name):
+    shm = shared_memory.SharedMemory(name=table_name, create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            SharedStatusTable.attach(table_name)
+    finally:
+        # attach stops tracking blocks that were not created as tables
+        resource_tracker.register(shm._name, 'shared_memory')
+        shm.close()
+        shm.unlink()
+
+
+def test_store_reads_statuses_from_the_table(table, table_name):
+    table.write('laser', 'laser_monitor', {'status': 'nominal'}, 10.)
+    table.write('laser', 'scan_monitor', {'status': 'failure'}, 10.)
+    table.write('wheels', 'wheel_monitor', {'status': 'nominal'}, 10.)
+    backing_store = InMemoryRobotStore()
+    store = SharedMemoryRobotStore(table, backing_store)
+
+    assert store.get_statuses(['laser', 'battery']) == [
+        {'component_id': 'laser',
+         'modes': [{'monitorName': 'laser_monitor', 'healthStatus': {'status': 'nominal'}},
+                   {'monitorName': 'scan_monitor', 'healthStatus': {'status': 'failure'}}]}]
+    assert store.watch_statuses(['laser']) is None
+
+    store.write_sm_states([{'component_name': 'laser', 'state': 'running'}])
+    assert backing_store.get_sm_state('laser') == {'component_name': 'laser', 'state': 'running'}
+
+
+def test_stores_are_shared_per_table_and_backing_store(table, table_name):
+    backing_store = InMemoryRobotStore()
+    store = SharedMemoryRobotStore.get_store(table_name, backing_store)
+
+    assert SharedMemoryRobotStore.get_store(table_name, backing_store) is store
+    assert SharedMemoryRobotStore.get_store(table_name, InMemoryRobotStore()) is not store
+
+
+def test_collector_publishes_the_monitored_statuses(table):
+    store = InMemoryRobotStore()
+    store.add_component_spec({'component_name': 'navigation',
+                              'dependencies': ['laser'],
+                              'dependency_monitors': {'laser': {'heartbeat': 'laser/laser_monitor'}}})
+    StatusCollector(store, table).start()
+
+    store.update_status({'component_id': 'laser',
+                         'modes': [{'monitorName': 'laser_monitor',
+                                    'healthStatus': {'status': 'failure'}}]})
+    store.update_status({'component_id': 'wheels',
+                         'modes': [{'monitorName': 'wheel_monitor',
+                                    'healthStatus': {'status': 'failure'}}]})
+
+    assert wait_until(lambda: table.read('laser', 'laser_monitor') is not None)
+    assert table.read('laser', 'laser_monitor')[0] == {'status': 'failure'}
+    assert table.read('wheels', 'wheel_monitor') is None
@@ -0,0 +1,95 @@
+import pymongo as pm
+
+from ropod.ftsm.robot_store import InMemoryRobotStore
+from ropod.ftsm.sm_state_writer import SMStateWriter
+
+
+class RecordingRobotStore(InMemoryRobotStore):
+    '''In-memory store that records its bulk writes and can be made to fail'''
+    def __init__(self):
+        super(RecordingRobotStore, self).__init__()
+        self.writes = []
+        self.fail = False
+
+    def write_sm_states(self, state_docs):
+        if self.fail:
+            raise pm.errors.AutoReconnect('connection lost')
+        self.writes.append(sorted((doc['component_name'], doc['state']) for doc in state_docs))
+        super(RecordingRobotStore, self).write_sm_states(state_docs)
+
+
+def test_nothing_is_written_without_updates():
+    writer = SMStateWriter(RecordingRobotStore())
+    assert writer.next_write_time() is None
+
+
+def test_pending_updates_are_coalesced_into_one_write():
+    store = RecordingRobotStore()
+    writer = SMStateWriter(store)
+    writer.update_state('laser', 'booting', 1.)
+    writer.update_state('laser', 'running', 2.)
+    writer.update_state('wheels', 'running', 2., stats={'transitions': 3})
+
+    assert writer.next_write_time() == 0.
+    writer.write_states(10.)
+
+    assert store.writes == [[('laser', 'running'), ('wheels', 'running')]]
+    assert store.get_sm_state('laser') == {'component_name': 'laser', 'state': 'running',
+                                           'transition_time': 2., 'update_time': 10.}
+    assert store.get_sm_state('wheels')['stats'] == {'transitions': 3}
+    assert writer.next_write_time() is None
+
+
+def test_heartbeats_refresh_registered_components():
+    store = RecordingRobotStore()
+    writer = SMStateWriter(store)
+    writer.update_state('laser', 'running', 1., heartbeat_interval=5.)
+    writer.write_states(10.)
+
+    assert writer.next_write_time() == 15.
+    writer.write_states(12.)
+    assert len(store.writes) == 1
+
+    writer.write_states(15.)
+    assert store.writes[-1] == [('laser', 'running')]
+    assert store.get_sm_state('laser')['update_time'] == 15.
+    assert writer.next_write_time() == 20.
+
+
+def test_unregistered_components_are_not_refreshed():
+    store = RecordingRobotStore()
+    writer = SMStateWriter(store)
+    writer.update_state('laser', 'running', 1., heartbeat_interval=5.)
+    writer.write_states(10.)
+    writer.unregister('laser')
+
+    assert writer.next_write_time() is None
+    writer.write_states(20.)
+    assert len(store.writes) == 1
+
+
+def test_failed_writes_are_retried_after_the_retry_interval():
+    store = RecordingRobotStore()
+    writer = SMStateWriter(store)
+    writer.update_state('laser', 'running', 1.)
+    store.fail = True
+    writer.write_states(10.)
+
+    assert writer.next_write_time() == 10. + writer.retry_interval
+
+    store.fail = False
+    writer.write_states(11.)
+    assert store.writes == [[('laser', 'running')]]
+
+
+def test_newer_states_replace_failed_writes():
+    store = RecordingRobotStore()
+    writer = SMStateWriter(store)
+    writer.update_state('laser', 'running', 1.)
+    store.fail = True
+    writer.write_states(10.)
+    writer.update_state('laser', 'recovering', 10.5)
+
+    store.fail = False
+    writer.write_states(11.)
+    assert store.writes == [[('laser', 'recovering')]]
@@ -0,0 +1,146 @@
+import datetime
+import random
+
+import numpy as np
+import pytest
+
+from ropod.structs.stn import TemporalNetwork
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+
+ZTP = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def make_task(task_id, earliest_start, latest_start, duration):
+    return Task(id=task_id, robot_actions={}, team_robot_ids=[],
+                earliest_start_time=ZTP + datetime.timedelta(minutes=earliest_start),
+                latest_start_time=ZTP + datetime.timedelta(minutes=latest_start),
+                estimated_duration=datetime.timedelta(minutes=duration))
+
+
+def all_bounds(network, task_ids):
+    return {task_id: network.get_bounds(task_id) for task_id in task_ids}
+
+
+@pytest.fixture
+def network():
+    network = TemporalNetwork(ZTP)
+    assert network.add_task(make_task('task_1', 0, 10, 20))
+    assert network.add_task(make_task('task_2', 0, 60, 10), previous_task_id='task_1',
+                            travel_time=datetime.timedelta(minutes=5))
+    return network
+
+
+def test_bounds_of_a_task():
+    network = TemporalNetwork(ZTP)
+    assert network.add_task(make_task('task_1', 10, 30, 15))
+
+    assert network.get_bounds('task_1') == (10., 30., 25., 45.)
+    assert network.get_start_window('task_1') == (ZTP + datetime.timedelta(minutes=10),
+                                                  ZTP + datetime.timedelta(minutes=30))
+
+
+def test_the_resolution_is_validated():
+    with pytest.raises(Exception):
+        TemporalNetwork(ZTP, resolution='days')
+
+    network = TemporalNetwork(ZTP, resolution='seconds')
+    assert network.add_task(make_task('task_1', 1, 2, 1))
+    assert network.get_bounds('task_1') == (60., 120., 120., 180.)
+
+
+def test_sequenced_tasks_start_after_the_previous_task(network):
+    assert network.get_bounds('task_2') == (25., 60., 35., 70.)
+    # the first task can still start at its latest start time
+    assert network.get_bounds('task_1') == (0., 10., 20., 30.)
+
+
+def test_sequencing_before_a_task_tightens_its_latest_start(network):
+    assert network.add_task(make_task('task_0', 0, 30, 10), next_task_id='task_1')
+
+    assert network.get_bounds('task_0') == (0., 0., 10., 10.)
+    assert network.get_bounds('task_1')[0] == 10.
+
+
+def test_inconsistent_tasks_are_rolled_back(network):
+    before = all_bounds(network, ['task_1', 'task_2'])
+
+    # task_3 has to start before task_2 finishes, but after it in the sequence
+    assert not network.add_task(make_task('task_3', 0, 30, 5), previous_task_id='task_2')
+
+    assert 'task_3' not in network
+    assert len(network) == 2
+    assert all_bounds(network, ['task_1', 'task_2']) == before
+    assert network.recompute()
+    assert all_bounds(network, ['task_1', 'task_2']) == before
+
+    assert network.add_task(make_task('task_3', 0, 80, 5), previous_task_id='task_2')
+    assert network.get_bounds('task_3') == (35., 80., 40., 85.)
+
+
+def test_an_inconsistent_sequence_is_rolled_back(network):
+    assert network.add_task(make_task('task_3', 0, 0, 5))
+    before = all_bounds(network, ['task_1', 'task_2', 'task_3'])
+
+    assert not network.add_sequence('task_2', 'task_3')
+    assert all_bounds(network, ['task_1', 'task_2', 'task_3']) == before
+    assert network.add_sequence('task_3', 'task_1')
+    assert network.get_bounds('task_1')[0] == 5.
+
+
+def test_fits_does_not_change_the_network(network):
+    before = all_bounds(network, ['task_1', 'task_2'])
+
+    assert network.fits(make_task('task_3', 0, 80, 5), previous_task_id='task_2')
+    assert not network.fits(make_task('task_3', 0, 30, 5), previous_task_id='task_2')
+
+    assert 'task_3' not in network
+    assert all_bounds(network, ['task_1', 'task_2']) == before
+
+
+def test_tasks_cannot_be_added_twice(network):
+    with pytest.raises(Exception):
+        network.add_task(make_task('task_1', 0, 10, 20))
+
+
+def test_removing_a_task_loosens_the_bounds(network):
+    network.remove_task('task_1')
+
+    assert 'task_1' not in network
+    assert network.get_bounds('task_2') == (0., 60., 10., 70.)
+
+    # the timepoints of the removed task are reused
+    assert network.add_task(make_task('task_1', 0, 10, 20), next_task_id='task_2')
+    assert network.get_bounds('task_2') == (20., 60., 30., 70.)
+
+
+def test_dense_recomputation_matches_the_incremental_bounds():
+    rng = random.Random(0)
+    network = TemporalNetwork(ZTP)
+    task_ids = list()
+    for i in range(30):
+        earliest_start = rng.randint(0, 300)
+        task = make_task('task_{0}'.format(i), earliest_start, earliest_start + rng.randint(0, 120),
+                         rng.randint(1, 30))
+        previous_task_id = rng.choice(task_ids) if task_ids and rng.random() < 0.5 else None
+        if network.add_task(task, previous_task_id=previous_task_id):
+            task_ids.append(task.id)
+    assert len(task_ids) > 10
+
+    incremental = all_bounds(network, task_ids)
+    assert network.recompute(dense=True)
+    dense = all_bounds(network, task_ids)
+
+    for task_id in task_ids:
+        assert np.allclose(incremental[task_id], dense[task_id])
+
+
+def test_distances_between_timepoints(network):
+    task_ids, distances = network.compute_distances()
+    start_1 = 1 + 2 * task_ids.index('task_1')
+    start_2 = 1 + 2 * task_ids.index('task_2')
+
+    # task_2 starts between 25 and 60 minutes after task_1
+    assert distances[start_1, start_2] == 60.
+    assert distances[start_2, start_1] == -25.
+    assert (np.diag(distances) == 0.).all()
@@ -0,0 +1,19 @@
+import pytest
+
+from ropod.structs.action import Action
+from ropod.structs.area import Area, SubArea, SubAreaReservation
+from ropod.structs.elevator import Elevator, ElevatorRequest
+from ropod.structs.robot import Robot
+from ropod.structs.status import TaskStatus
+from ropod.structs.task import Task, TaskRequest
+
+
+@pytest.mark.parametrize('struct', [
+    Action(), Area(), SubArea(), SubAreaReservation(), Elevator(1),
+    ElevatorRequest('query_1', 0, 4, 'CALL_ELEVATOR'), Robot('ropod_001'),
+    TaskStatus('task_1'), Task(), TaskRequest()], ids=lambda struct: type(struct).__name__)
+def test_structs_have_no_instance_dictionary(struct):
+    assert not hasattr(struct, '__dict__')
+    with pytest.raises(AttributeError):
+        struct.misspelled_attribute = 1
+
@@ -0,0 +1,141 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from ropod.structs.status import TaskStatus
+from ropod.structs.task import Task, TaskConstraints
+from ropod.structs.task_batch import TaskBatch
+from ropod.utils.timestamp import TimeStamp
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def make_tasks():
+    tasks = []
+    for i in range(4):
+        earliest_start_time = START + datetime.timedelta(minutes=10 * i)
+        tasks.append(Task(id='task_{0}'.format(i),
+                          earliest_start_time=earliest_start_time,
+                          latest_start_time=earliest_start_time + datetime.timedelta(minutes=5),
+                          estimated_duration=datetime.timedelta(minutes=3 + i, microseconds=i),
+                          priority=i % 4))
+    tasks[1].status.status = TaskStatus.SCHEDULED
+    tasks[3].status.status = TaskStatus.SCHEDULED
+    return tasks
+
+
+def task_times(task):
+    return (task.earliest_start_time, task.latest_start_time, task.estimated_duration,
+            task.earliest_finish_time, task.latest_finish_time)
+
+
+def test_round_trip_keeps_the_task_values():
+    tasks = make_tasks()
+    expected = [task_times(task) for task in tasks]
+
+    batch = TaskBatch.from_tasks(tasks)
+    result = batch.to_tasks()
+
+    assert len(batch) == 4
+    assert result == tasks
+    assert [task_times(task) for task in result] == expected
+    assert batch.priorities.tolist() == [0, 1, 2, 3]
+
+
+def test_postpone_matches_the_task_method():
+    tasks, expected = make_tasks(), make_tasks()
+    delay = datetime.timedelta(minutes=7, microseconds=3)
+    for task in expected:
+        task.postpone_task(delay)
+
+    batch = TaskBatch.from_tasks(tasks)
+    batch.postpone(delay)
+
+    assert [task_times(task) for task in batch.to_tasks()] == [task_times(task) for task in expected]
+
+
+def test_postpone_with_a_mask_and_per_task_delays():
+    batch = TaskBatch.from_tasks(make_tasks())
+    earliest_start_times = batch.earliest_start_times.copy()
+    delays = np.array([1, 2, 3, 4], dtype='timedelta64[s]')
+
+    batch.postpone(delays, mask=np.array([True, False, True, False]))
+
+    assert (batch.earliest_start_times - earliest_start_times).tolist() == [10**9, 0, 3 * 10**9, 0]
+    assert (batch.earliest_finish_times == batch.earliest_start_times + batch.estimated_durations).all()
+
+
+def test_update_estimated_durations_matches_the_task_method():
+    tasks, expected = make_tasks(), make_tasks()
+    duration = datetime.timedelta(minutes=20)
+    for task in expected:
+        task.update_task_estimated_duration(duration)
+
+    batch = TaskBatch.from_tasks(tasks)
+    batch.update_estimated_durations(duration)
+
+    assert [task_times(task) for task in batch.to_tasks()] == [task_times(task) for task in expected]
+
+
+def test_relative_to_ztp_matches_task_constraints():
+    tasks = make_tasks()
+    ztp = START - datetime.timedelta(hours=1)
+    batch = TaskBatch.from_tasks(tasks)
+
+    for resolution in ('hours', 'minutes', 'seconds'):
+        earliest, latest = batch.relative_to_ztp(ztp, resolution)
+        expected = [TaskConstraints.relative_to_ztp(task, ztp, resolution) for task in tasks]
+        assert list(zip(earliest.tolist(), latest.tolist())) == pytest.approx(expected)
+
+    earliest, _ = batch.relative_to_ztp(ztp)
+    assert earliest.tolist() == [datetime.timedelta(minutes=60 + 10 * i) for i in range(4)]
+
+
+def test_filters_return_copies():
+    tasks = make_tasks()
+    batch = TaskBatch.from_tasks(tasks)
+
+    scheduled = batch.with_status(TaskStatus.SCHEDULED)
+    assert scheduled.ids.tolist() == ['task_1', 'task_3']
+    assert list(scheduled.tasks) == [tasks[1], tasks[3]]
+
+    scheduled.postpone(datetime.timedelta(hours=1))
+    assert batch.earliest_start_times[1] == tasks[1].earliest_start_time.ns
+
+    window = batch.starting_between(START + datetime.timedelta(minutes=10),
+                                    START + datetime.timedelta(minutes=20))
+    assert window.ids.tolist() == ['task_1', 'task_2']
+
+
+def test_batches_without_tasks_create_tasks():
+    batch = TaskBatch(['task_1'], [START.ns], [START.ns], [60 * 10**9], [2], [TaskStatus.UNALLOCATED])
+
+    task, = batch.to_tasks()
+
+    assert task.id == 'task_1'
+    assert task.earliest_finish_time == START + datetime.timedelta(minutes=1)
+
+
+def test_times_must_have_the_same_time_zone():
+    tasks = make_tasks()
+    tasks[1].earliest_start_time = TimeStamp.from_str('2020-01-01T10:00:00+00:00')
+    with pytest.raises(Exception):
+        TaskBatch.from_tasks(tasks)
+
+
+def test_windows_and_ztps_must_match_the_time_zone_of_the_batch():
+    batch = TaskBatch.from_tasks(make_tasks())
+    aware = TimeStamp.from_str('2020-01-01T10:00:00+00:00')
+
+    with pytest.raises(TypeError):
+        batch.relative_to_ztp(aware, 'minutes')
+    with pytest.raises(TypeError):
+        batch.starting_between(aware, aware + datetime.timedelta(hours=1))
+
+
+def test_empty_batches():
+    batch = TaskBatch.from_tasks([])
+
+    assert len(batch) == 0
+    assert batch.to_tasks() == []
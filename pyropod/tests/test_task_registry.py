@@ -0,0 +1,146 @@
+import datetime
+
+import pytest
+
+from ropod.structs.status import TaskStatus
+from ropod.structs.task import Task, TaskPriority
+from ropod.structs.task_registry import TaskRegistry
+from ropod.utils.timestamp import TimeStamp
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def make_task(task_id, minutes, robot_ids=('ropod_001',), priority=TaskPriority.NORMAL, start_minutes=None):
+    earliest_start_time = START + datetime.timedelta(minutes=minutes)
+    task = Task(id=task_id, robot_actions={}, team_robot_ids=list(robot_ids),
+                earliest_start_time=earliest_start_time,
+                latest_start_time=earliest_start_time + datetime.timedelta(minutes=5),
+                estimated_duration=datetime.timedelta(minutes=10), priority=priority)
+    if start_minutes is not None:
+        task.start_time = START + datetime.timedelta(minutes=start_minutes)
+    return task
+
+
+def ids(tasks):
+    return [task.id for task in tasks]
+
+
+@pytest.fixture
+def registry():
+    return TaskRegistry([make_task('task_3', 30),
+                         make_task('task_1', 10, priority=TaskPriority.HIGH),
+                         make_task('task_2', 20, robot_ids=('ropod_001', 'ropod_002')),
+                         make_task('task_4', 40, robot_ids=('ropod_002',), start_minutes=5)])
+
+
+def test_tasks_are_found_by_id(registry):
+    assert len(registry) == 4
+    assert 'task_1' in registry
+    assert registry.get('task_1').id == 'task_1'
+    assert registry.get('task_5') is None
+    assert sorted(ids(registry)) == ['task_1', 'task_2', 'task_3', 'task_4']
+
+
+def test_robot_tasks_are_sorted_by_start_time(registry):
+    assert ids(registry.get_robot_tasks('ropod_001')) == ['task_1', 'task_2', 'task_3']
+    assert ids(registry.get_robot_tasks('ropod_002')) == ['task_4', 'task_2']
+    assert registry.get_robot_tasks('ropod_003') == []
+
+
+def test_robot_task_windows_include_their_bounds(registry):
+    tasks = registry.get_robot_tasks('ropod_001', start=START + datetime.timedelta(minutes=10),
+                                     end=START + datetime.timedelta(minutes=20))
+    assert ids(tasks) == ['task_1', 'task_2']
+
+
+def test_tasks_by_earliest_start(registry):
+    tasks = registry.get_tasks_starting_between(START + datetime.timedelta(minutes=15),
+                                                START + datetime.timedelta(minutes=40))
+    assert ids(tasks) == ['task_2', 'task_3', 'task_4']
+
+
+def test_tasks_by_status_and_priority(registry):
+    registry.set_status('task_2', TaskStatus.SCHEDULED)
+
+    assert ids(registry.get_tasks_by_status(TaskStatus.SCHEDULED)) == ['task_2']
+    assert sorted(ids(registry.get_tasks_by_status(TaskStatus.UNALLOCATED))) == ['task_1', 'task_3', 'task_4']
+    assert ids(registry.get_tasks_by_priority(TaskPriority.HIGH)) == ['task_1']
+    assert ids(registry.get_robot_tasks('ropod_001', statuses=[TaskStatus.SCHEDULED])) == ['task_2']
+
+
+def test_executable_tasks_start_before_the_current_time(registry):
+    current_time = START + datetime.timedelta(minutes=20)
+
+    assert ids(registry.get_executable_tasks('ropod_001', current_time)) == ['task_1']
+    assert ids(registry.get_executable_tasks('ropod_002', current_time)) == ['task_4']
+
+
+def test_updates_reindex_the_task(registry):
+    task = registry.get('task_3')
+    task.team_robot_ids = ['ropod_002']
+    task.earliest_start_time = START
+    registry.update(task)
+
+    assert ids(registry.get_robot_tasks('ropod_001')) == ['task_1', 'task_2']
+    assert ids(registry.get_robot_tasks('ropod_002')) == ['task_3', 'task_4', 'task_2']
+
+
+def test_removed_tasks_are_not_found(registry):
+    removed = registry.remove('task_2')
+
+    assert removed.id == 'task_2'
+    assert 'task_2' not in registry
+    assert ids(registry.get_robot_tasks('ropod_002')) == ['task_4']
+    assert 'task_2' not in ids(registry.get_tasks_by_status(TaskStatus.UNALLOCATED))
+
+
+def test_robots_listed_twice_are_indexed_once():
+    registry = TaskRegistry([make_task('task_1', 10, robot_ids=('ropod_001', 'ropod_001'))])
+
+    assert ids(registry.get_robot_tasks('ropod_001')) == ['task_1']
+
+    registry.remove('task_1')
+    assert registry.get_robot_tasks('ropod_001') == []
+
+
+def test_finished_tasks_are_not_executable(registry):
+    current_time = START + datetime.timedelta(minutes=40)
+    registry.set_status('task_1', TaskStatus.COMPLETED)
+    registry.set_status('task_3', TaskStatus.CANCELED)
+
+    assert ids(registry.get_executable_tasks('ropod_001', current_time)) == ['task_2']
+    # the history of the robot is still indexed
+    assert ids(registry.get_robot_tasks('ropod_001')) == ['task_1', 'task_2', 'task_3']
+
+    registry.set_status('task_3', TaskStatus.SCHEDULED)
+    assert ids(registry.get_executable_tasks('ropod_001', current_time)) == ['task_2', 'task_3']
+
+    registry.remove('task_1')
+    registry.add(make_task('task_1', 10))
+    assert ids(registry.get_executable_tasks('ropod_001', current_time)) == ['task_1', 'task_2', 'task_3']
+
+
+def test_times_with_and_without_time_zones_are_not_mixed(registry):
+    aware = TimeStamp.from_str('2020-01-01T10:00:00+00:00')
+    task = make_task('task_5', 0)
+    task.earliest_start_time = aware
+
+    with pytest.raises(TypeError):
+        registry.add(task)
+    with pytest.raises(TypeError):
+        registry.get_executable_tasks('ropod_001', aware)
+    with pytest.raises(TypeError):
+        registry.get_tasks_starting_between(aware, aware)
+    assert 'task_5' not in registry
+
+
+def test_executable_tasks_default_to_the_current_time_of_the_registry():
+    tz = datetime.timezone(datetime.timedelta(hours=-5))
+    task = make_task('task_1', 0)
+    task.earliest_start_time = TimeStamp.now(tz) - datetime.timedelta(minutes=1)
+    later_task = make_task('task_2', 0)
+    later_task.earliest_start_time = TimeStamp.now(tz) + datetime.timedelta(hours=1)
+    registry = TaskRegistry([task, later_task])
+
+    assert registry.tz is tz
+    assert ids(registry.get_executable_tasks('ropod_001')) == ['task_1']
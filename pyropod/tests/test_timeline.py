@@ -0,0 +1,149 @@
+import datetime
+import random
+
+import pytest
+
+from ropod.structs.task import Task, TaskRequest
+from ropod.structs.timeline import FleetTimelines, RobotTimeline
+from ropod.utils.timestamp import TimeStamp
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def at(minutes):
+    return START + datetime.timedelta(minutes=minutes)
+
+
+def minutes(duration):
+    return datetime.timedelta(minutes=duration)
+
+
+def make_task(task_id, start, duration):
+    return Task(id=task_id, robot_actions={}, team_robot_ids=['ropod_001'],
+                earliest_start_time=at(start), latest_start_time=at(start + 10),
+                estimated_duration=minutes(duration))
+
+
+def make_request(earliest, latest):
+    request = TaskRequest('request_1')
+    request.earliest_pickup_time = at(earliest)
+    request.latest_pickup_time = at(latest)
+    return request
+
+
+def gaps_in_minutes(gaps):
+    return [(start.get_difference(START, 'minutes'), end.get_difference(START, 'minutes'))
+            for start, end in gaps]
+
+
+@pytest.fixture
+def timeline():
+    return RobotTimeline('ropod_001', [make_task('task_2', 30, 10),
+                                       make_task('task_1', 0, 20),
+                                       make_task('task_3', 60, 15)])
+
+
+def test_tasks_are_sorted_by_their_start_times(timeline):
+    assert [task.id for task in timeline] == ['task_1', 'task_2', 'task_3']
+    assert len(timeline) == 3
+    assert 'task_2' in timeline and timeline.get('task_4') is None
+
+
+def test_scheduled_start_times_are_used(timeline):
+    task = timeline.get('task_1')
+    task.start_time = at(45)
+    timeline.update(task)
+
+    assert [task.id for task in timeline] == ['task_2', 'task_1', 'task_3']
+    assert [task.id for task in timeline.get_tasks_between(at(62), at(63))] == ['task_1', 'task_3']
+
+
+def test_tasks_between_include_tasks_starting_before_the_window(timeline):
+    assert [task.id for task in timeline.get_tasks_between(at(15), at(35))] == ['task_1', 'task_2']
+    assert [task.id for task in timeline.get_tasks_between(at(20), at(30))] == []
+    assert [task.id for task in timeline.get_tasks_between(at(70), at(200))] == ['task_3']
+
+
+def test_idle_gaps(timeline):
+    assert gaps_in_minutes(timeline.get_idle_gaps(at(-10), at(100))) == \
+        [(-10, 0), (20, 30), (40, 60), (75, 100)]
+    assert gaps_in_minutes(timeline.get_idle_gaps(at(5), at(35))) == [(20, 30)]
+    assert timeline.get_idle_gaps(at(0), at(20)) == []
+
+
+def test_gaps_after_an_earlier_longer_task():
+    timeline = RobotTimeline('ropod_001', [make_task('long', 0, 60), make_task('short', 10, 10)])
+
+    # the short task finishes first, but the robot is busy with the long task until 60
+    assert gaps_in_minutes(timeline.get_idle_gaps(at(30), at(90))) == [(60, 90)]
+    assert timeline.find_insertions(make_request(30, 80), minutes(5), minutes(2)) == \
+        [(at(62), 'long', None)]
+
+
+def test_removed_tasks_leave_gaps(timeline):
+    assert timeline.remove('task_2').id == 'task_2'
+    assert gaps_in_minutes(timeline.get_idle_gaps(at(0), at(75))) == [(20, 60)]
+
+
+def test_insertions_fit_into_the_gaps(timeline):
+    insertions = timeline.find_insertions(make_request(10, 70), minutes(10), minutes(5))
+
+    # the gap between task_1 and task_2 is too small for the task and the travel times
+    assert insertions == [(at(45), 'task_2', 'task_3')]
+    assert timeline.find_insertions(make_request(10, 80), minutes(10), minutes(5))[-1] == \
+        (at(80), 'task_3', None)
+    assert timeline.find_earliest_insertion(make_request(10, 70), minutes(10), minutes(5)) == \
+        (at(45), 'task_2', 'task_3')
+    assert timeline.find_earliest_insertion(make_request(10, 25), minutes(10), minutes(5)) is None
+
+
+def test_insertions_before_the_first_task(timeline):
+    assert timeline.find_insertions(make_request(-30, -20), minutes(10)) == [(at(-30), None, 'task_1')]
+
+
+def test_postponing_ripples_through_overlapping_tasks(timeline):
+    postponed = timeline.postpone('task_1', minutes(15), travel_time=minutes(5))
+
+    assert [(task.id, delay) for task, delay in postponed] == \
+        [('task_1', minutes(15)), ('task_2', minutes(10))]
+    assert timeline.get('task_1').earliest_start_time == at(15)
+    assert timeline.get('task_2').earliest_start_time == at(40)
+    assert timeline.get('task_3').earliest_start_time == at(60)
+    assert gaps_in_minutes(timeline.get_idle_gaps(at(0), at(60))) == [(0, 15), (35, 40), (50, 60)]
+
+
+def test_idle_gaps_match_a_linear_scan():
+    rng = random.Random(0)
+    tasks = [make_task('task_{0}'.format(i), rng.randint(0, 500), rng.randint(1, 80)) for i in range(40)]
+    timeline = RobotTimeline('ropod_001', tasks)
+
+    for _ in range(50):
+        start = rng.randint(-50, 600)
+        end = start + rng.randint(1, 150)
+        busy = set()
+        for task in tasks:
+            task_start = int(task.earliest_start_time.get_difference(START, 'minutes'))
+            busy.update(range(task_start, task_start + int(task.estimated_duration.total_seconds() // 60)))
+        idle = [minute for minute in range(start, end) if minute not in busy]
+
+        expected = list()
+        for minute in idle:
+            if expected and expected[-1][1] == minute:
+                expected[-1] = (expected[-1][0], minute + 1)
+            else:
+                expected.append((minute, minute + 1))
+        assert gaps_in_minutes(timeline.get_idle_gaps(at(start), at(end))) == expected
+
+
+def test_fleet_insertions_are_sorted_by_start_time(timeline):
+    other = RobotTimeline('ropod_002', [make_task('task_4', 0, 50)])
+    busy = RobotTimeline('ropod_003', [make_task('task_5', 0, 500)])
+    fleet = FleetTimelines([timeline, other, busy])
+
+    assert len(fleet) == 3 and fleet.get('ropod_002') is other
+    assert fleet.evaluate_request(make_request(10, 70), minutes(10), minutes(5)) == \
+        [(at(45), 'ropod_001', 'task_2', 'task_3'), (at(55), 'ropod_002', 'task_4', None)]
+
+    assert fleet.remove('ropod_001') is timeline
+    assert [insertion[1] for insertion in fleet.evaluate_request(make_request(10, 70), minutes(10))] == \
+        ['ropod_002']
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ropod.utils.timestamp import TimeStamp
+
+CET = timezone(timedelta(hours=1))
+
+
+def test_strings_round_trip():
+    for iso_date in ('2020-01-01T10:00:00', '2020-01-01T10:00:00.250000',
+                     '2020-01-01T10:00:00+01:00'):
+        assert TimeStamp.from_str(iso_date).to_str() == iso_date
+
+
+def test_strings_are_parsed_like_datetime():
+    timestamp = TimeStamp.from_str('2020-01-01T10:00:00.123456')
+
+    assert timestamp.to_datetime() == datetime(2020, 1, 1, 10, 0, 0, 123456)
+    assert timestamp.ns == (datetime(2020, 1, 1, 10, 0, 0, 123456) - datetime(1970, 1, 1)) // \
+        timedelta(microseconds=1) * 1000
+    assert timestamp.tz is None
+
+
+def test_aware_timestamps_count_from_the_utc_epoch():
+    timestamp = TimeStamp.from_str('2020-01-01T10:00:00+01:00')
+
+    assert timestamp.tz == CET
+    assert timestamp.to_datetime() == datetime(2020, 1, 1, 9, tzinfo=timezone.utc)
+    assert timestamp.timestamp == datetime(2020, 1, 1, 9, tzinfo=timezone.utc).timestamp()
+
+
+def test_other_formats_are_parsed_with_dateutil():
+    assert TimeStamp.from_str('Jan 1 2020 10:00').to_datetime() == datetime(2020, 1, 1, 10)
+
+
+def test_arithmetic_with_timedeltas():
+    timestamp = TimeStamp.from_str('2020-01-01T10:00:00+01:00')
+
+    later = timestamp + timedelta(minutes=90, microseconds=1)
+    assert later.to_str() == '2020-01-01T11:30:00.000001+01:00'
+    assert (later - timedelta(minutes=90, microseconds=1)) == timestamp
+    with pytest.raises(Exception):
+        timestamp + 5
+    with pytest.raises(Exception):
+        timestamp - timestamp
+
+
+def test_differences():
+    start = TimeStamp.from_str('2020-01-01T10:00:00')
+    end = TimeStamp.from_str('2020-01-01T11:30:00')
+
+    assert end.get_difference(start) == timedelta(minutes=90)
+    assert end.get_difference(start, 'hours') == 1.5
+    assert end.get_difference(start, 'minutes') == 90
+    assert start.get_difference(end, 'seconds') == -5400
+
+
+def test_comparisons():
+    earlier = TimeStamp.from_str('2020-01-01T10:00:00')
+    later = TimeStamp.from_str('2020-01-01T10:00:00.000001')
+
+    assert earlier < later and later > earlier
+    assert earlier <= earlier and earlier >= earlier
+    assert earlier == TimeStamp.from_str('2020-01-01T10:00:00')
+    assert hash(earlier) == hash(TimeStamp.from_str('2020-01-01T10:00:00'))
+    assert earlier != later
+    assert earlier != '2020-01-01T10:00:00'
+
+
+def test_aware_timestamps_in_different_zones_are_compared_in_utc():
+    assert TimeStamp.from_str('2020-01-01T10:00:00+01:00') == TimeStamp.from_str('2020-01-01T09:00:00+00:00')
+    assert TimeStamp.from_str('2020-01-01T10:00:00+01:00') < TimeStamp.from_str('2020-01-01T09:30:00+00:00')
+
+
+def test_naive_and_aware_timestamps_cannot_be_ordered():
+    naive = TimeStamp.from_str('2020-01-01T10:00:00')
+    aware = TimeStamp.from_str('2020-01-01T10:00:00+00:00')
+
+    for compare in (lambda a, b: a < b, lambda a, b: a > b, lambda a, b: a <= b,
+                    lambda a, b: a >= b):
+        with pytest.raises(TypeError):
+            compare(naive, aware)
+        with pytest.raises(TypeError):
+            compare(aware, naive)
+
+
+def test_naive_and_aware_timestamps_are_not_equal():
+    naive = TimeStamp.from_str('2020-01-01T10:00:00')
+    aware = TimeStamp.from_str('2020-01-01T10:00:00+00:00')
+
+    assert not naive == aware and not aware == naive
+    assert naive != aware and aware != naive
+    assert aware not in [naive] and [naive, aware].index(aware) == 1
+    assert {naive: 'naive', aware: 'aware'}[aware] == 'aware'
+    # like for datetime
+    assert naive.to_datetime() != aware.to_datetime()
+
+
+def test_from_ns_truncates_to_microseconds():
+    timestamp = TimeStamp.from_ns(1577872800123456789)
+
+    assert timestamp.ns == 1577872800123456000
+    assert timestamp.to_str() == '2020-01-01T10:00:00.123456'
+
+
+def test_now_with_delta():
+    before = datetime.now()
+    timestamp = TimeStamp(timedelta(hours=1))
+    after = datetime.now()
+
+    assert before + timedelta(hours=1) <= timestamp.to_datetime() <= after + timedelta(hours=1)
+
+
+def test_now_in_a_time_zone():
+    tz = timezone(timedelta(hours=2))
+    before = datetime.now(timezone.utc)
+    now = TimeStamp.now(tz)
+    after = datetime.now(timezone.utc)
+
+    assert now.tz is tz
+    assert before.replace(microsecond=0) <= now.to_datetime() <= after
+    assert TimeStamp.now().tz is None
@@ -0,0 +1,236 @@
+import datetime
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ropod.structs.area import Area
+from ropod.structs.task import Task
+from ropod.utils.timestamp import TimeStamp
+from ropod.utils.travel_durations import TravelDurationEstimator, area_pair_key
+
+START = TimeStamp.from_str('2020-01-01T10:00:00')
+
+
+def make_area(area_id, name=None, floor_number=0):
+    area = Area()
+    area.id = area_id
+    area.name = name if name is not None else 'area_{0}'.format(area_id)
+    area.floor_number = floor_number
+    return area
+
+
+def minutes(duration):
+    return datetime.timedelta(minutes=duration)
+
+
+def make_task(pickup_area, delivery_area, duration):
+    return SimpleNamespace(pickup_pose=pickup_area, delivery_pose=delivery_area, start_time=START,
+                           finish_time=START + minutes(duration))
+
+
+class Clock(object):
+    '''A clock that is advanced by the tests'''
+    def __init__(self):
+        self.time = 0.
+
+    def __call__(self):
+        return self.time
+
+
+class Planner(object):
+    '''Estimates 10 minutes per floor plus 1 minute and records the estimated pairs'''
+    def __init__(self):
+        self.calls = list()
+
+    def __call__(self, pickup_area, delivery_area):
+        self.calls.append((pickup_area.name, delivery_area.name))
+        return minutes(1 + 10 * abs(pickup_area.floor_number - delivery_area.floor_number))
+
+
+A = make_area(1, floor_number=0)
+B = make_area(2, floor_number=1)
+C = make_area(3, floor_number=2)
+
+
+@pytest.fixture
+def planner():
+    return Planner()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_estimates_are_cached(planner):
+    estimator = TravelDurationEstimator(planner)
+
+    assert estimator.get(A, B) == minutes(11)
+    assert estimator.get(A, B) == minutes(11)
+    assert estimator.get(A, C) == minutes(21)
+
+    assert planner.calls == [('area_1', 'area_2'), ('area_1', 'area_3')]
+    assert (estimator.hits, estimator.misses) == (1, 2)
+    assert len(estimator) == 2
+
+
+def test_estimates_expire(planner, clock):
+    estimator = TravelDurationEstimator(planner, ttl=datetime.timedelta(seconds=60), clock=clock)
+    estimator.get(A, B)
+
+    clock.time = 59.
+    estimator.get(A, B)
+    assert len(planner.calls) == 1
+
+    clock.time = 60.
+    estimator.get(A, B)
+    assert len(planner.calls) == 2
+
+
+def test_least_recently_used_estimates_are_evicted(planner):
+    estimator = TravelDurationEstimator(planner, max_size=2)
+    estimator.get(A, B)
+    estimator.get(A, C)
+    estimator.get(A, B)
+    estimator.get(B, C)
+
+    assert len(estimator) == 2
+    planner.calls.clear()
+    estimator.get(A, B)
+    estimator.get(A, C)
+    assert planner.calls == [('area_1', 'area_3')]
+
+
+def test_areas_without_ids_are_keyed_by_their_names(planner):
+    estimator = TravelDurationEstimator(planner)
+    pickup = make_area(None, 'pickup')
+    other_pickup = make_area(None, 'other_pickup', floor_number=2)
+
+    assert area_pair_key(pickup, B) == ('pickup', 0, 2, 1)
+    assert estimator.get(pickup, B) == minutes(11)
+    assert estimator.get(other_pickup, B) == minutes(11)
+    assert len(planner.calls) == 2
+
+    estimator.invalidate('pickup')
+    assert len(estimator) == 1
+    estimator.get(other_pickup, B)
+    assert len(planner.calls) == 2
+
+
+def test_invalidation_removes_the_estimates_of_an_area(planner):
+    estimator = TravelDurationEstimator(planner)
+    invalidated = list()
+    estimator.add_invalidation_listener(invalidated.append)
+    for pair in ((A, B), (B, C), (A, C)):
+        estimator.get(*pair)
+
+    estimator.invalidate(2)
+
+    assert sorted(invalidated[0]) == sorted([area_pair_key(A, B), area_pair_key(B, C)])
+    assert len(estimator) == 1
+    estimator.invalidate()
+    assert invalidated[1] == [area_pair_key(A, C)]
+    assert len(estimator) == 0
+
+
+def test_observed_durations_replace_the_estimate(planner):
+    estimator = TravelDurationEstimator(planner, min_samples=2, alpha=0.5)
+    assert estimator.get(A, B) == minutes(11)
+
+    estimator.observe(make_task(A, B, 20))
+    assert estimator.get(A, B) == minutes(11)
+    estimator.observe(make_task(A, B, 30))
+    assert estimator.get(A, B) == minutes(25)
+
+    # learned estimates are used for pairs that are not cached
+    estimator.invalidate(3)
+    estimator.observe(make_task(B, C, 4))
+    estimator.observe(make_task(B, C, 4))
+    assert estimator.get(B, C) == minutes(4)
+    assert len(planner.calls) == 1
+
+
+def test_incomplete_tasks_are_not_observed(planner):
+    estimator = TravelDurationEstimator(planner, min_samples=1)
+    task = make_task(A, B, 20)
+    task.finish_time = None
+    estimator.observe(task)
+
+    assert estimator.get(A, B) == minutes(11)
+
+
+def test_observations_are_bounded(planner):
+    estimator = TravelDurationEstimator(planner, max_size=2, min_samples=1)
+    for pickup_area, delivery_area in ((A, B), (A, C), (B, C), (B, A), (C, A)):
+        estimator.observe(make_task(pickup_area, delivery_area, 5))
+
+    # only the last two observed pairs are kept
+    assert estimator.get(B, C) == minutes(11)
+    assert estimator.get(B, A) == minutes(5)
+    assert estimator.get(C, A) == minutes(5)
+    assert estimator.get(A, B) == minutes(11)
+    assert len(planner.calls) == 2
+
+
+def test_get_many_estimates_distinct_pairs_once(planner):
+    batches = list()
+
+    def estimate_many(pairs):
+        batches.append([(pickup_area.name, delivery_area.name) for pickup_area, delivery_area in pairs])
+        return [planner(*pair) for pair in pairs]
+
+    estimator = TravelDurationEstimator(planner, estimate_many=estimate_many)
+    estimator.get(A, C)
+    planner.calls.clear()
+
+    assert estimator.get_many([(A, B), (A, C), (A, B), (C, A)]) == \
+        [minutes(11), minutes(21), minutes(11), minutes(21)]
+    assert batches == [[('area_1', 'area_2'), ('area_3', 'area_1')]]
+    assert len(estimator) == 3
+
+    without_batches = TravelDurationEstimator(planner)
+    assert without_batches.get_many([(A, B), (A, B)]) == [minutes(11), minutes(11)]
+
+
+def test_tasks_are_updated_with_the_estimate(planner):
+    estimator = TravelDurationEstimator(planner)
+    task = Task(id='task_1', robot_actions={}, team_robot_ids=[], earliest_start_time=START,
+                latest_start_time=START + minutes(5), estimated_duration=minutes(0))
+    task.pickup_pose = A
+    task.delivery_pose = C
+
+    estimator.update_task(task)
+
+    assert task.estimated_duration == minutes(21)
+    assert task.earliest_finish_time == START + minutes(21)
+
+
+def test_the_lock_is_not_held_while_estimating(planner):
+    estimator = TravelDurationEstimator(planner)
+    estimator.get(A, B)
+    results = list()
+
+    def estimate(pickup_area, delivery_area):
+        thread = threading.Thread(target=lambda: results.append(estimator.get(A, B)))
+        thread.start()
+        thread.join(timeout=2.)
+        return minutes(1)
+
+    estimator.estimate = estimate
+    assert estimator.get(B, C) == minutes(1)
+    assert results == [minutes(11)]
+
+
+def test_estimates_computed_during_an_invalidation_are_not_cached(planner):
+    estimator = TravelDurationEstimator(planner)
+
+    def estimate(pickup_area, delivery_area):
+        thread = threading.Thread(target=estimator.invalidate)
+        thread.start()
+        thread.join()
+        return planner(pickup_area, delivery_area)
+
+    estimator.estimate = estimate
+    assert estimator.get(A, B) == minutes(11)
+    assert len(estimator) == 0